@@ -0,0 +1,194 @@
+from collections import OrderedDict
+import gzip
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import Request, urlopen
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.detail_table import DETAIL_COLUMNS, EXPORT_CHUNK_ROWS
+from backend.figure_data import HISTOGRAM_BINS
+
+# Base URL of the aggregate API started with `python backend/aggregate_server.py`
+API_URL = os.getenv('AGGREGATE_API_URL', 'http://127.0.0.1:8765')
+
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+
+
+def _canonical_filters(filters):
+    """
+    Filters as compact JSON with sorted keys and members, so equal filters make equal URLs (and ETags)
+    """
+    if not filters:
+        return None
+    canonical = {}
+    for dimension in sorted(filters):
+        members = filters[dimension]
+        if members is not None:
+            members = sorted((m.item() if hasattr(m, 'item') else m for m in members), key=str)
+        canonical[dimension] = members
+    return json.dumps(canonical, separators=(',', ':'))
+
+
+class AggregateClient:
+    """
+    Client of the aggregate API with the same query methods as the cube and the database
+
+    It can stand in for either as the dashboard's data source. Every
+    response is remembered with its ETag and revalidated with If-None-Match,
+    so an unchanged aggregate costs a 304 and no transfer.
+    """
+
+    detail_columns = list(DETAIL_COLUMNS)
+
+    def __init__(self, base_url=API_URL, timeout=60, cache_size=256):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.not_modified = 0
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+
+    def available(self, timeout=1.0):
+        """
+        Whether the service answers its health check
+        """
+        try:
+            with urlopen(f'{self.base_url}/health', timeout=timeout) as response:
+                return json.loads(response.read()).get('status') == 'ok'
+        except (OSError, ValueError):
+            return False
+
+    def health(self):
+        return self._get('/health')
+
+    def _get(self, path, params=None, fmt='json'):
+        """
+        Decoded response of an endpoint: a frame for Arrow, otherwise parsed JSON
+        """
+        params = {name: value for name, value in (params or {}).items() if value is not None}
+        params['format'] = fmt
+        url = f'{self.base_url}{path}?{urlencode(sorted(params.items()))}'
+
+        with self._lock:
+            cached = self._responses.get(url)
+        headers = {'Accept': ARROW_MIME if fmt == 'arrow' else 'application/json', 'Accept-Encoding': 'gzip'}
+        if cached is not None:
+            headers['If-None-Match'] = cached[0]
+
+        try:
+            with urlopen(Request(url, headers=headers), timeout=self.timeout) as response:
+                body = response.read()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                etag = response.headers.get('ETag')
+        except HTTPError as exc:
+            if exc.code == 304 and cached is not None:
+                self.not_modified += 1
+                with self._lock:
+                    self._responses.move_to_end(url)
+                return cached[1]
+            try:
+                message = json.loads(exc.read()).get('error', exc.reason)
+            except ValueError:
+                message = exc.reason
+            raise RuntimeError(f"Aggregate API {path} failed ({exc.code}): {message}") from None
+        except URLError as exc:
+            raise ConnectionError(f"Aggregate API at {self.base_url} is not reachable: {exc.reason}") from None
+
+        if fmt == 'arrow':
+            # pyarrow is only needed once frames are fetched
+            import pyarrow as pa
+            value = pa.ipc.open_stream(body).read_all().to_pandas()
+        else:
+            value = json.loads(body)
+        if etag:
+            with self._lock:
+                self._responses[url] = (etag, value)
+                while len(self._responses) > self.cache_size:
+                    self._responses.popitem(last=False)
+        return value
+
+    def _frame(self, path, params=None):
+        # Callers get their own copy, never the remembered frame
+        return self._get(path, params, fmt='arrow').copy()
+
+    def values(self, dimension):
+        """
+        Distinct members of a dimension
+        """
+        return self._get(f'/values/{dimension}')
+
+    def rollup(self, by, filters=None):
+        """
+        Sum of every measure by the given dimensions, within a filtered slice
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        return self._frame('/rollup', {'by': ','.join(by), 'filters': _canonical_filters(filters)})
+
+    def totals(self, filters=None):
+        """
+        Grand totals of every measure within a filtered slice
+        """
+        return self._get('/totals', {'filters': _canonical_filters(filters)})
+
+    def rate_histogram(self, filters=None, bins=HISTOGRAM_BINS):
+        """
+        Section counts per equal-width enrollment-rate bin
+        """
+        return self._frame('/histogram', {'filters': _canonical_filters(filters), 'bins': bins})
+
+    def detail_count(self, filters=None, search=None):
+        """
+        Number of fact rows matching the filters and search text
+        """
+        return self._get('/detail/count', {'filters': _canonical_filters(filters), 'search': search})['rows']
+
+    def detail_page(self, filters=None, columns=None, sort_by=None, ascending=True, search=None, offset=0, limit=50):
+        """
+        One sorted, searched page of fact rows
+        """
+        return self._frame('/detail/page', {
+            'filters': _canonical_filters(filters),
+            'columns': ','.join(columns) if columns else None,
+            'sort_by': sort_by,
+            'ascending': 'true' if ascending else 'false',
+            'search': search,
+            'offset': offset,
+            'limit': limit,
+        })
+
+    def detail_chunks(self, filters=None, columns=None, sort_by=None, ascending=True, search=None,
+                      chunk_size=EXPORT_CHUNK_ROWS):
+        """
+        Every matching row in order, fetched a page of chunk_size rows at a time
+        """
+        total = self.detail_count(filters, search)
+        for offset in range(0, total, chunk_size):
+            yield self.detail_page(filters, columns, sort_by, ascending, search, offset, chunk_size)
+
+    def dashboard_aggregates(self):
+        """
+        The aggregates the exported figures draw from, as visualizations.export.dashboard_aggregates returns them
+
+        Frames travel as Arrow, so their dtypes and therefore the exporters'
+        input digests match the ones computed locally.
+        """
+        summary = self._get('/dashboard')
+        aggregates = {'totals': summary['totals']}
+        for name in summary['frames']:
+            aggregates[name] = self._frame(f'/dashboard/{name}')
+        return aggregates
+
+
+def connect(base_url=API_URL):
+    """
+    A client of the aggregate API, or None if it is not running
+    """
+    client = AggregateClient(base_url)
+    return client if client.available() else None
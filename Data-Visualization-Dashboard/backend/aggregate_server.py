@@ -0,0 +1,506 @@
+import argparse
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.cube import DIMENSIONS, EnrollmentCube
+from backend.detail_table import DetailTable
+from backend.figure_data import HISTOGRAM_BINS, histogram_bins
+from backend.filter_index import FilterIndex
+from backend.instrumentation import span
+from backend.process_data import DASHBOARD_TABLES, load_data, process_enrollment_data
+from backend.shared_dataset import SharedDataset, dataset_version
+from backend.star_schema import section_rows
+
+# Where the service listens; it is meant for local tools, so only loopback by default
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# How often the source files are checked for a refreshed extract, in seconds
+VERSION_CHECK_SECONDS = 5
+
+# Encoded responses kept per data version, most recently used last
+RESPONSE_CACHE_SIZE = 256
+
+# JSON bodies smaller than this are sent uncompressed
+GZIP_MIN_BYTES = 1024
+
+# Requests larger than this (request line plus headers) are refused
+MAX_HEADER_BYTES = 16384
+
+JSON_MIME = 'application/json'
+ARROW_MIME = 'application/vnd.apache.arrow.stream'
+
+STATUS_TEXT = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error',
+}
+
+
+class NotFoundError(LookupError):
+    """
+    A request for something the dataset does not have, answered with 404
+    """
+
+
+def _json_default(value):
+    """
+    JSON form of the NumPy scalars and arrays aggregates are made of
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def encode(value, fmt='json'):
+    """
+    Encode an aggregate as compact JSON or an Arrow IPC stream
+
+    Frames become {"columns": [...], "data": [[...], ...]} in JSON, or an
+    Arrow stream that keeps their dtypes (categoricals included); anything
+    else is plain JSON. Returns the body and its content type.
+    """
+    if hasattr(value, 'to_json'):
+        if fmt == 'arrow':
+            # pyarrow is only needed once a client asks for Arrow
+            import pyarrow as pa
+            table = pa.Table.from_pandas(value, preserve_index=False)
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes(), ARROW_MIME
+        return value.to_json(orient='split', index=False, date_format='iso').encode('utf-8'), JSON_MIME
+    return json.dumps(value, separators=(',', ':'), default=_json_default).encode('utf-8'), JSON_MIME
+
+
+def _param(params, name, default=None):
+    """
+    Last value of a query parameter, or the default
+    """
+    values = params.get(name)
+    return values[-1] if values else default
+
+
+def _list_param(params, name):
+    """
+    Comma-separated query parameter as a list, or None if absent
+    """
+    value = _param(params, name)
+    if value is None:
+        return None
+    return [item for item in value.split(',') if item]
+
+
+def _int_param(params, name, default, minimum=0):
+    """
+    Integer query parameter, at least minimum
+    """
+    value = int(_param(params, name, default))
+    if value < minimum:
+        raise ValueError(f"{name} must be at least {minimum}")
+    return value
+
+
+def _filters(params):
+    """
+    Filters from the JSON `filters` parameter, e.g. {"term": ["Fall 2019"]}
+    """
+    value = _param(params, 'filters')
+    if not value:
+        return None
+    filters = json.loads(value)
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be a JSON object of dimension to values")
+    for dimension, members in filters.items():
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}'; expected one of {DIMENSIONS}")
+        if members is not None and not isinstance(members, list):
+            filters[dimension] = [members]
+    return filters
+
+
+def _dimensions(by):
+    """
+    Validate grouping dimensions
+    """
+    for dimension in by:
+        if dimension not in DIMENSIONS:
+            raise ValueError(f"Unknown dimension '{dimension}'; expected one of {DIMENSIONS}")
+    return by
+
+
+class AggregateDataset:
+    """
+    One version of the enrollment facts with the indexes every endpoint answers from
+
+    The fact table is the memory-mapped shared dataset the dashboard uses,
+    so the server, the Streamlit app and other workers share its pages. The
+    row index covers every cube dimension, so the fact-level endpoints take
+    the same filters as /rollup and /totals; a dimension's bitmaps are only
+    built once a filter uses it.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        dataset = SharedDataset('enrollment', version, lambda: process_enrollment_data(load_data()))
+        self.frame = dataset.frame
+        self.cube = EnrollmentCube.from_facts(self.frame)
+        self.row_index = FilterIndex(self.frame, DIMENSIONS)
+        self.detail_table = DetailTable(self.frame, self.row_index)
+        self._dashboard = None
+        self._dashboard_lock = threading.Lock()
+
+    def health(self, params):
+        return {'status': 'ok', 'version': self.version, 'rows': len(self.frame)}
+
+    def values(self, params, dimension):
+        return self.row_index.values(_dimensions([dimension])[0])
+
+    def rollup(self, params):
+        by = _dimensions(_list_param(params, 'by') or [])
+        if not by:
+            raise ValueError("by needs at least one dimension, e.g. by=term")
+        return self.cube.rollup(by, _filters(params))
+
+    def totals(self, params):
+        return self.cube.totals(_filters(params))
+
+    def histogram(self, params):
+        sections = section_rows(self.frame.iloc[self.row_index.select(_filters(params))])
+        return histogram_bins(
+            sections['enrollment_rate'],
+            bins=_int_param(params, 'bins', HISTOGRAM_BINS, minimum=1),
+            value_name='enrollment_rate',
+            count_name='sections'
+        )
+
+    def detail_count(self, params):
+        return {'rows': self.detail_table.detail_count(_filters(params), _param(params, 'search'))}
+
+    def detail_page(self, params):
+        return self.detail_table.detail_page(
+            _filters(params),
+            _list_param(params, 'columns'),
+            _param(params, 'sort_by'),
+            _param(params, 'ascending', 'true').lower() != 'false',
+            _param(params, 'search'),
+            _int_param(params, 'offset', 0),
+            _int_param(params, 'limit', 50, minimum=1)
+        )
+
+    def dashboard_aggregates(self):
+        """
+        The exported figures' aggregates, computed once per version
+        """
+        with self._dashboard_lock:
+            if self._dashboard is None:
+                # The exporters' aggregation lives with them; plotly is only loaded when it is first asked for
+                from visualizations.export import dashboard_aggregates
+                self._dashboard = dashboard_aggregates(self.frame)
+        return self._dashboard
+
+    def dashboard(self, params, name=None):
+        aggregates = self.dashboard_aggregates()
+        if name is None:
+            return {'totals': aggregates['totals'], 'frames': [key for key in aggregates if key != 'totals']}
+        if name == 'totals' or name not in aggregates:
+            raise NotFoundError(f"No dashboard aggregate '{name}'")
+        return aggregates[name]
+
+
+# Endpoints: path (with {} for one path argument) and the AggregateDataset method answering it
+ROUTES = {
+    ('health',): 'health',
+    ('values', '{}'): 'values',
+    ('rollup',): 'rollup',
+    ('totals',): 'totals',
+    ('histogram',): 'histogram',
+    ('detail', 'count'): 'detail_count',
+    ('detail', 'page'): 'detail_page',
+    ('dashboard',): 'dashboard',
+    ('dashboard', '{}'): 'dashboard',
+}
+
+
+def route(path):
+    """
+    Method name and path arguments of a request path, or None if nothing matches
+    """
+    parts = [part for part in path.split('/') if part]
+    for pattern, method in ROUTES.items():
+        if len(pattern) == len(parts) and all(p == '{}' or p == part for p, part in zip(pattern, parts)):
+            return method, [part for p, part in zip(pattern, parts) if p == '{}']
+    return None
+
+
+def _etag_matches(if_none_match, etag):
+    """
+    Whether an If-None-Match header names the current entity tag
+    """
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in tags or f'W/{etag}' in tags
+
+
+class AggregateServer:
+    """
+    Asyncio HTTP service answering aggregate queries from one in-memory dataset
+
+    Responses are tagged with the data version and a digest of the request,
+    so a client revalidating with If-None-Match gets a 304 without anything
+    being recomputed. Identical requests in flight at the same time share one
+    computation, encoded responses are kept in an LRU cache for the current
+    version, and the pandas work runs on a thread pool so the event loop
+    keeps accepting connections meanwhile.
+    """
+
+    def __init__(self, workers=None, cache_size=RESPONSE_CACHE_SIZE):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers or min(4, (os.cpu_count() or 1) + 1),
+            thread_name_prefix='aggregate'
+        )
+        self.cache_size = cache_size
+        self.dataset = None
+        self.requests = 0
+        self.not_modified = 0
+        self.coalesced = 0
+        self.cache_hits = 0
+        self._responses = OrderedDict()
+        self._inflight = {}
+        self._checked = 0.0
+        self._loading = None
+
+    async def refresh(self, force=False):
+        """
+        Start loading the dataset if the source files changed since it was built
+
+        Checked at most every VERSION_CHECK_SECONDS. The new version is
+        built in the background and swapped in when it is ready; until then
+        requests keep being answered from the previous one. Only the very
+        first load is waited for.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked < VERSION_CHECK_SECONDS:
+            return
+        self._checked = now
+        loop = asyncio.get_running_loop()
+        version = await loop.run_in_executor(self.executor, dataset_version, DASHBOARD_TABLES)
+        if self.dataset is not None and version == self.dataset.version:
+            return
+        # One build at a time; a version that changes again meanwhile is picked up by the next check
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load(version))
+        if self.dataset is None:
+            await asyncio.shield(self._loading)
+
+    async def _load(self, version):
+        """
+        Build one version of the dataset on the pool and swap it in
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            print(f"Loading enrollment data version {version}...")
+            dataset = await loop.run_in_executor(self.executor, AggregateDataset, version)
+        except Exception as exc:
+            if self.dataset is None:
+                raise
+            print(f"Could not load version {version}, still serving {self.dataset.version}: {exc}")
+        else:
+            self.dataset = dataset
+            self._responses.clear()
+            print(f"Serving {len(dataset.frame):,} rows of version {version}")
+        finally:
+            self._loading = None
+
+    async def _compute(self, key, compute):
+        """
+        Encoded response for a request key: cached, joined if in flight, or computed on the pool
+        """
+        if key in self._responses:
+            self._responses.move_to_end(key)
+            self.cache_hits += 1
+            return self._responses[key]
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = self._inflight[key] = loop.create_future()
+        try:
+            result = await loop.run_in_executor(self.executor, compute)
+        except Exception as exc:
+            future.set_exception(exc)
+            # Mark it retrieved, so a failure nobody else waited for is not reported twice
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+        future.set_result(result)
+        if key[0] == self.dataset.version:
+            self._responses[key] = result
+            while len(self._responses) > self.cache_size:
+                self._responses.popitem(last=False)
+        return result
+
+    async def respond(self, method, target, headers):
+        """
+        Status, headers and body answering one request
+        """
+        if method not in ('GET', 'HEAD'):
+            return self._error(405, f"{method} is not supported", {'Allow': 'GET, HEAD'})
+        url = urlsplit(target)
+        matched = route(url.path)
+        if matched is None:
+            return self._error(404, f"No endpoint {url.path}")
+        name, args = matched
+        params = parse_qs(url.query, keep_blank_values=True)
+        accept = headers.get('accept', '')
+        fmt = _param(params, 'format') or ('arrow' if ARROW_MIME in accept else 'json')
+        if fmt not in ('json', 'arrow'):
+            return self._error(400, "format must be json or arrow")
+
+        if name != 'health':
+            await self.refresh()
+        dataset = self.dataset
+        query = sorted((key, values) for key, values in params.items() if key != 'format')
+        key = (dataset.version, url.path, repr(query), fmt)
+        etag = f'"{dataset.version}-{hashlib.sha1(repr(key[1:]).encode()).hexdigest()[:16]}"'
+        response_headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept, Accept-Encoding'}
+        if _etag_matches(headers.get('if-none-match'), etag):
+            self.not_modified += 1
+            return 304, response_headers, b''
+
+        def compute():
+            with span(f'api.{name}', version=dataset.version, query=url.query):
+                body, content_type = encode(getattr(dataset, name)(params, *args), fmt)
+            gzipped = None
+            if content_type == JSON_MIME and len(body) >= GZIP_MIN_BYTES:
+                gzipped = gzip.compress(body, compresslevel=5)
+            return body, gzipped, content_type
+
+        try:
+            body, gzipped, content_type = await self._compute(key, compute)
+        except NotFoundError as exc:
+            return self._error(404, str(exc))
+        except (ValueError, TypeError, KeyError) as exc:
+            return self._error(400, str(exc))
+        except Exception as exc:
+            return self._error(500, f"{type(exc).__name__}: {exc}")
+
+        response_headers['Content-Type'] = content_type
+        if gzipped is not None and 'gzip' in headers.get('accept-encoding', ''):
+            response_headers['Content-Encoding'] = 'gzip'
+            body = gzipped
+        return 200, response_headers, body
+
+    def _error(self, status, message, headers=None):
+        body, content_type = encode({'error': message, 'status': status})
+        return status, dict(headers or {}, **{'Content-Type': content_type}), body
+
+    async def handle(self, reader, writer):
+        """
+        Serve the requests of one connection, keeping it open between them unless asked not to
+        """
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    status, headers, body = self._error(400, "Request headers too large")
+                    await self._send(writer, status, headers, body, keep_alive=False)
+                    break
+
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    status, headers, body = self._error(400, "Malformed request line")
+                    await self._send(writer, status, headers, body, keep_alive=False)
+                    break
+                request_headers = {}
+                for line in lines[1:]:
+                    if ':' in line:
+                        field, value = line.split(':', 1)
+                        request_headers[field.strip().lower()] = value.strip()
+                # Requests carry no body; drain one if a client sends it anyway
+                length = int(request_headers.get('content-length') or 0)
+                if length:
+                    await reader.readexactly(length)
+
+                connection = request_headers.get('connection', '').lower()
+                keep_alive = connection != 'close' and (version == 'HTTP/1.1' or connection == 'keep-alive')
+                self.requests += 1
+                status, headers, body = await self.respond(method, target, request_headers)
+                await self._send(writer, status, headers, b'' if method == 'HEAD' else body, keep_alive,
+                                 content_length=len(body))
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _send(self, writer, status, headers, body, keep_alive, content_length=None):
+        lines = [f'HTTP/1.1 {status} {STATUS_TEXT[status]}']
+        lines += [f'{field}: {value}' for field, value in headers.items()]
+        lines.append(f'Content-Length: {len(body) if content_length is None else content_length}')
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """
+        Load the dataset, then answer requests until cancelled
+        """
+        await self.refresh(force=True)
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_HEADER_BYTES)
+        print(f"Aggregate API listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    """
+    Run the aggregate API until interrupted
+    """
+    parser = argparse.ArgumentParser(description="Serve enrollment aggregates over HTTP as JSON or Arrow")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="Interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    parser.add_argument('--workers', type=int, default=None, help="Threads running aggregations")
+    args = parser.parse_args()
+
+    server = AggregateServer(workers=args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"Stopped after {server.requests:,} requests ({server.not_modified:,} not modified, "
+              f"{server.cache_hits:,} cached, {server.coalesced:,} coalesced)")
+    finally:
+        server.executor.shutdown(wait=False)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
-import os
 from pathlib import Path
-import pandas as pd
+import sys
 import chardet
 
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.dialect import SAMPLE_SIZE, sniff_dialect, read_table, record_dialect
+
 def detect_file_encoding(file_path):
     """
-    Detect the encoding of a file
+    Detect the encoding of a file from a bounded prefix
     """
     with open(file_path, 'rb') as file:
-        raw_data = file.read()
+        raw_data = file.read(SAMPLE_SIZE)
         result = chardet.detect(raw_data)
         return result['encoding']
 
@@ -32,32 +35,25 @@ def check_data_files():
             # Detect encoding
             try:
                 encoding = detect_file_encoding(file_path)
-                print(f"  Detected encoding: {encoding}")
+                print(f"  Detected encoding (chardet): {encoding}")
             except Exception as e:
                 print(f"  Error detecting encoding: {e}")
             
-            # Try to read with different encodings and delimiters
-            encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-            delimiters = [',', '\t', ';', '|']
+            # Always re-sniff here so the manifest reflects what is on disk
+            dialect = sniff_dialect(file_path)
+            record_dialect(file_path, dialect)
+            print(f"  Sniffed dialect: {dialect['encoding']} encoding, {dialect['delimiter']!r} delimiter, "
+                  f"{dialect['line_terminator'].upper()} line endings")
             
-            for encoding in encodings:
-                for delimiter in delimiters:
-                    try:
-                        df = pd.read_csv(file_path, encoding=encoding, delimiter=delimiter)
-                        print(f"  Successfully read with {encoding} encoding and '{delimiter}' delimiter")
-                        print(f"  Shape: {df.shape}")
-                        print(f"  Columns: {df.columns.tolist()}")
-                        print(f"  First few rows:")
-                        print(df.head(2))
-                        print("-" * 50)
-                        break
-                    except (UnicodeDecodeError, pd.errors.ParserError):
-                        print(f"  Failed to read with {encoding} encoding and '{delimiter}' delimiter")
-                    except Exception as e:
-                        print(f"  Error reading with {encoding} encoding and '{delimiter}' delimiter: {e}")
-                else:
-                    continue
-                break
+            try:
+                df = read_table(file_path)
+                print(f"  Shape: {df.shape}")
+                print(f"  Columns: {df.columns.tolist()}")
+                print(f"  First few rows:")
+                print(df.head(2))
+            except Exception as e:
+                print(f"  Error reading with sniffed dialect: {e}")
+            print("-" * 50)
 
 if __name__ == "__main__":
-    check_data_files() 
\ No newline at end of file
+    check_data_files()
@@ -0,0 +1,166 @@
+import argparse
+import ast
+from functools import lru_cache
+from pathlib import Path
+import re
+import subprocess
+import sys
+
+# Project root, which every entry point below is relative to
+ROOT = Path(__file__).parent.parent
+
+# Entry points and their import-time budgets in milliseconds, measured with
+# `python -X importtime` over each script's top-level imports only. Budgets
+# cover the time beyond BASELINE_MODULES, which every batch script needs and
+# whose import time swings with the machine and disk cache. They leave at
+# least twice the measured time (and 100 ms for scripts that load backend
+# modules) as headroom, so the check does not flake.
+IMPORT_BUDGETS_MS = {
+    'run_app.py': 25,
+    'visualizations/app.py': 300,
+    'visualizations/pages/course_prerequisites.py': 300,
+    'visualizations/pages/international_students.py': 300,
+    'visualizations/pages/schedule_conflicts.py': 300,
+    'visualizations/export.py': 100,
+    'visualizations/enrollment_dashboard.py': 100,
+    'visualizations/student_demographics.py': 350,
+    'backend/process_data.py': 100,
+    'backend/aggregate_server.py': 250,
+    'backend/database_connection.py': 550,
+    'backend/check_data.py': 100,
+}
+
+# Libraries whose import time is reported beside each script but not charged
+# to it, wherever in the import tree they are first loaded
+BASELINE_MODULES = {'pandas', 'numpy'}
+
+# Modules the Streamlit server has already imported before it runs an app or
+# page script; a script that uses them is not charged for them
+SERVER_MODULES = ['streamlit']
+
+# One `-X importtime` line: self and cumulative microseconds, then the indented module name
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+def import_statements(script_path):
+    """
+    Source of a script's top-level imports, including its sys.path set-up
+    """
+    source = Path(script_path).read_text(encoding='utf-8')
+    statements = []
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            statements.append(ast.get_source_segment(source, node))
+        elif isinstance(node, ast.Expr) and 'sys.path' in ast.get_source_segment(source, node):
+            statements.append(ast.get_source_segment(source, node))
+    return statements
+
+@lru_cache(maxsize=None)
+def startup_modules():
+    """
+    Modules a bare interpreter imports at start-up, which no script is charged for
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'pass'],
+        capture_output=True,
+        text=True
+    )
+    return frozenset(m.group(4) for m in map(IMPORT_LINE.match, result.stderr.splitlines()) if m)
+
+def _baseline_ms(lines, charged):
+    """
+    Cumulative ms of the outermost BASELINE_MODULES imports under the charged top-level modules
+
+    The output lists a module after everything it imported, so read in
+    reverse every import follows its parent. A baseline module nested in
+    another (numpy under pandas) is already part of the outer one's time, and
+    one loaded by an uncharged module (streamlit, say) was never counted.
+    """
+    total = 0
+    in_charged = False
+    outer_depth = None
+    for match in reversed(lines):
+        depth = len(match.group(3))
+        if not depth:
+            in_charged = match.group(4) in charged
+        if outer_depth is not None and depth > outer_depth:
+            continue
+        outer_depth = None
+        if in_charged and match.group(4) in BASELINE_MODULES:
+            total += int(match.group(2)) / 1000
+            outer_depth = depth
+    return total
+
+def measure_imports(script_path):
+    """
+    Cumulative import time in ms of a script's top-level imports, per top-level module
+
+    Returns the per-module times and the time of the BASELINE_MODULES they
+    include, which is not charged to the script.
+    """
+    script_path = Path(script_path).resolve()
+    statements = import_statements(script_path)
+    preloaded = [m for m in SERVER_MODULES if any(f'import {m}' in s for s in statements)]
+    code = '\n'.join(
+        [f'import {m}' for m in preloaded] + [f'__file__ = {str(script_path)!r}'] + statements
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=script_path.parent,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {script_path.name} failed:\n{result.stderr[-2000:]}")
+
+    # Interpreter start-up imports are reported first and not counted
+    startup = startup_modules()
+    lines = [m for m in map(IMPORT_LINE.match, result.stderr.splitlines()) if m]
+    modules = {}
+    for match in lines:
+        if not match.group(3) and match.group(4) not in startup and match.group(4) not in preloaded:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return modules, _baseline_ms(lines, modules)
+
+def check_import_times(scripts=None, repeat=3, top=5):
+    """
+    Measure every entry point's import time and compare it with its budget
+
+    Each script is measured `repeat` times and the fastest run is kept, so
+    a busy machine does not fail the check on its own. Only the time beyond
+    the BASELINE_MODULES measured in the same run counts against a budget.
+    Returns the scripts over budget.
+    """
+    over_budget = []
+    for script in scripts or IMPORT_BUDGETS_MS:
+        runs = [measure_imports(ROOT / script) for _ in range(repeat)]
+        modules, baseline = min(runs, key=lambda run: sum(run[0].values()) - run[1])
+        charged = sum(modules.values()) - baseline
+        budget = IMPORT_BUDGETS_MS.get(script)
+        status = 'ok' if budget is None or charged <= budget else 'OVER BUDGET'
+        if status != 'ok':
+            over_budget.append(script)
+
+        print(f"{script}: {charged:.0f} ms beyond {' and '.join(sorted(BASELINE_MODULES))} "
+              f"({baseline:.0f} ms) (budget {budget} ms) {status}")
+        heaviest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+        for name, ms in heaviest:
+            print(f"    {name}: {ms:.0f} ms")
+    return over_budget
+
+def main():
+    """
+    Check import-time budgets of the entry points
+    """
+    parser = argparse.ArgumentParser(description="Check the import time of each entry point against its budget")
+    parser.add_argument('scripts', nargs='*', help="Entry points relative to the project root (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per script; the fastest is kept")
+    args = parser.parse_args()
+
+    over_budget = check_import_times(args.scripts, args.repeat)
+    if over_budget:
+        print(f"{len(over_budget)} entry point(s) over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+    print("All entry points within their import-time budgets")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Tokens of a free-text prerequisite, e.g. 'MATH 250 and (MATH 310 or ...)': course
+# codes (not '300-level'), the and/or connectives and parentheses; other words are skipped
+PREREQUISITE_TOKEN_PATTERN = re.compile(
+    r'(?P<code>\b[A-Z]{4}\s+\d{3}[A-Z]?\b(?!-))|(?P<op>\b(?i:and|or)\b)|(?P<paren>[()])'
+)
+
+# Phrases whose 'or' qualifies a grade rather than offering an alternative
+GRADE_QUALIFIER_PATTERN = re.compile(r'\bor\s+(?:better|higher|above)\b', re.IGNORECASE)
+
+# Edge kinds stored alongside the adjacency. Alternatives (one of several
+# courses that satisfy a prerequisite) are kept for display but are not
+# required, so they take no part in reachability
+PREREQUISITE = 1
+COREQUISITE = 2
+ALTERNATIVE = 3
+KIND_NAMES = {PREREQUISITE: 'prerequisite', COREQUISITE: 'corequisite', ALTERNATIVE: 'alternative'}
+
+
+def _required(tokens, pos):
+    """
+    Codes every way of satisfying an or-expression requires, and the position after it
+
+    An 'or' keeps only the codes common to all its alternatives, so an
+    alternative that is text alone ('or equivalent') leaves nothing
+    required; 'and' and plain juxtaposition take the union.
+    """
+    required = None
+    while True:
+        term = set()
+        while pos < len(tokens) and tokens[pos] not in ('or', ')'):
+            token = tokens[pos]
+            if token == '(':
+                inner, pos = _required(tokens, pos + 1)
+                term |= inner
+                pos += 1
+            else:
+                if token != 'and':
+                    term.add(token)
+                pos += 1
+        required = term if required is None else required & term
+        if pos < len(tokens) and tokens[pos] == 'or':
+            pos += 1
+        else:
+            return required, pos
+
+
+def parse_prerequisites(text):
+    """
+    Course codes a free-text prerequisite requires, and those it only offers as alternatives
+
+    'MATH 250 and (MATH 310 or MATH 360)' requires MATH 250 and offers
+    MATH 310 and MATH 360 as alternatives. Both lists keep the text's order.
+    """
+    if not isinstance(text, str):
+        return [], []
+    tokens = []
+    for match in PREREQUISITE_TOKEN_PATTERN.finditer(GRADE_QUALIFIER_PATTERN.sub('', text)):
+        if match.group('code'):
+            tokens.append(' '.join(match.group('code').split()))
+        else:
+            tokens.append((match.group('op') or match.group('paren')).lower())
+
+    required, pos = set(), 0
+    while pos < len(tokens):
+        found, pos = _required(tokens, pos)
+        required |= found
+        # Step over an unbalanced closing parenthesis
+        pos += 1
+    codes = list(dict.fromkeys(token for token in tokens if token not in ('and', 'or', '(', ')')))
+    return [code for code in codes if code in required], [code for code in codes if code not in required]
+
+
+def _pack(positions, n):
+    """
+    Packed bit row with the given positions set
+    """
+    row = np.zeros(n, dtype=bool)
+    row[positions] = True
+    return np.packbits(row)
+
+
+class CourseGraph:
+    def __init__(self, course_codes, indptr, indices, kinds):
+        """
+        Course dependency graph in CSR form over integer course ids
+
+        An edge u -> v means u must be taken before (or with) v, so the
+        successors of a course are the courses it unlocks. reach holds one
+        packed bit row per course with every course reachable downstream
+        through required edges (alternatives are skipped). partners holds each
+        course's corequisite partners in CSR form (partner_indptr).
+        """
+        self.course_codes = pd.Index(course_codes, name='course_code')
+        self.indptr = indptr
+        self.indices = indices
+        self.kinds = kinds
+        self.partner_indptr, self.partners = self._partners()
+        self.reach = self._closure()
+
+    @classmethod
+    def from_tables(cls, course, corequisite):
+        """
+        Build the graph from course prerequisites and the corequisite table
+        """
+        codes = pd.Index(course['course_code'].astype(object))
+
+        # Prerequisite text -> (prerequisite, course) pairs, required and
+        # alternative; unknown codes are dropped
+        parsed = course['pre_reqs'].astype(object).map(parse_prerequisites)
+        pairs = {}
+        for kind, part in [(PREREQUISITE, 0), (ALTERNATIVE, 1)]:
+            mentions = parsed.map(lambda p: p[part])
+            target = np.repeat(np.arange(len(codes)), mentions.map(len).to_numpy())
+            source = codes.get_indexer([code for names in mentions for code in names])
+            pairs[kind] = np.column_stack([source, target]).reshape(-1, 2)
+
+        # A corequisite is needed alongside the course
+        corequisite = np.column_stack([
+            codes.get_indexer(corequisite['coreq_code'].astype(object)),
+            codes.get_indexer(corequisite['course_code'].astype(object)),
+        ])
+
+        pairs[COREQUISITE] = corequisite
+        edges = np.concatenate(list(pairs.values()))
+        kinds = np.concatenate([np.full(len(edges), kind, dtype=np.uint8) for kind, edges in pairs.items()])
+        valid = (edges >= 0).all(axis=1) & (edges[:, 0] != edges[:, 1])
+        edges, kinds = edges[valid], kinds[valid]
+
+        # Drop repeated edges, keeping the lowest kind, then sort by source for CSR
+        order = np.lexsort((kinds, edges[:, 1], edges[:, 0]))
+        edges, kinds = edges[order], kinds[order]
+        first = np.ones(len(edges), dtype=bool)
+        first[1:] = (np.diff(edges, axis=0) != 0).any(axis=1)
+        edges, kinds = edges[first], kinds[first]
+
+        indptr = np.zeros(len(codes) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(edges[:, 0], minlength=len(codes)), out=indptr[1:])
+        return cls(codes, indptr, edges[:, 1].astype(np.int32), kinds)
+
+    def __len__(self):
+        """
+        Number of courses
+        """
+        return len(self.course_codes)
+
+    def _sources(self):
+        """
+        Source id of every edge, expanded from the CSR row pointers
+        """
+        return np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.indptr))
+
+    def _partners(self):
+        """
+        Corequisite partners of every course, in both directions, as CSR row pointers and ids
+        """
+        coreq = self.kinds == COREQUISITE
+        sources, targets = self._sources()[coreq], self.indices[coreq]
+        pairs = np.unique(np.column_stack([
+            np.concatenate([sources, targets]), np.concatenate([targets, sources])
+        ]).reshape(-1, 2), axis=0)
+        indptr = np.zeros(len(self) + 1, dtype=np.int32)
+        np.cumsum(np.bincount(pairs[:, 0], minlength=len(self)), out=indptr[1:])
+        return indptr, pairs[:, 1].astype(np.int32)
+
+    def _closure(self):
+        """
+        Transitive closure over required edges as packed bitsets, one row per course
+
+        The rows are set bit by bit from the edges, never as a dense n x n
+        matrix. Each pass ORs every successor's row into its source's row;
+        the rows stop changing after as many passes as the longest dependency
+        chain. Cycles (corequisites point both ways) simply converge.
+        """
+        required = self.kinds != ALTERNATIVE
+        sources, targets = self._sources()[required], self.indices[required]
+        reach = np.zeros((len(self), (len(self) + 7) // 8), dtype=np.uint8)
+        np.bitwise_or.at(reach, (sources, targets // 8), (0x80 >> (targets % 8)).astype(np.uint8))
+
+        while True:
+            updated = reach.copy()
+            np.bitwise_or.at(updated, sources, reach[targets])
+            if np.array_equal(updated, reach):
+                return reach
+            reach = updated
+
+    def ids(self, codes):
+        """
+        Integer ids of course codes, skipping codes not in the catalog
+        """
+        ids = self.course_codes.get_indexer(pd.Index(codes).astype(object))
+        return ids[ids >= 0]
+
+    def successors(self, code):
+        """
+        Courses a course directly unlocks, with the kind of each edge
+        """
+        i = self.course_codes.get_loc(code)
+        start, stop = self.indptr[i], self.indptr[i + 1]
+        return pd.DataFrame({
+            'course_code': self.course_codes[self.indices[start:stop]],
+            'kind': [KIND_NAMES[kind] for kind in self.kinds[start:stop]],
+        })
+
+    def _downstream_rows(self, ids):
+        """
+        Unpacked reach row of each course, without the course itself and its corequisite partners
+
+        A course reaches itself through its corequisite cycle, but its own
+        demand (and its lab's) is not demand held back downstream of it.
+        """
+        rows = np.unpackbits(self.reach[ids], axis=1, count=len(self)).astype(bool)
+        starts = self.partner_indptr[ids]
+        counts = self.partner_indptr[ids + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        rows[np.arange(len(ids)), ids] = False
+        rows[np.repeat(np.arange(len(ids)), counts), self.partners[offsets]] = False
+        return rows
+
+    def downstream_mask(self, codes):
+        """
+        Boolean mask of every course downstream of any of the given courses
+
+        A given course only counts when it is downstream of another one.
+        """
+        ids = self.ids(codes)
+        if not len(ids):
+            return np.zeros(len(self), dtype=bool)
+        return self._downstream_rows(ids).any(axis=0)
+
+    def upstream_mask(self, code):
+        """
+        Boolean mask of every course a course depends on, directly or not, other than itself
+        """
+        i = self.course_codes.get_loc(code)
+        mask = ((self.reach[:, i // 8] >> (7 - i % 8)) & 1).astype(bool)
+        mask[i] = False
+        return mask
+
+    def downstream(self, codes):
+        """
+        Course codes downstream of any of the given courses
+        """
+        return self.course_codes[self.downstream_mask(codes)].tolist()
+
+    def upstream(self, code):
+        """
+        Course codes a course depends on, directly or not
+        """
+        return self.course_codes[self.upstream_mask(code)].tolist()
+
+    def demand_vector(self, course_demand):
+        """
+        Demand per course id from a Series indexed by course code
+        """
+        return course_demand.reindex(self.course_codes).fillna(0).to_numpy(dtype=np.float64)
+
+    def blocked_demand(self, codes, demand):
+        """
+        Total demand of the courses downstream of the given ones, each counted once
+        """
+        return float(demand[self.downstream_mask(codes)].sum())
+
+    def bottlenecks(self, codes, demand):
+        """
+        Downstream reach and demand of each given course
+
+        Counts and demand (a matrix-vector product) come from the unpacked
+        rows, so ranking every blocked course costs one pass over their
+        bitsets. A course's own demand and its corequisite partners' are not
+        counted as downstream of it.
+        """
+        ids = self.ids(codes)
+        rows = self._downstream_rows(ids)
+        return pd.DataFrame({
+            'course_code': self.course_codes[ids],
+            'downstream_courses': rows.sum(axis=1),
+            'downstream_demand': rows @ demand,
+        }).sort_values('downstream_demand', ascending=False, ignore_index=True)
+
+
+def closed_courses(section, term_code=None):
+    """
+    Courses with at least one Closed section, with the number of closed sections
+    """
+    if term_code is not None:
+        section = section[section['term_code'] == term_code]
+    closed = section[section['status'] == 'Closed']
+    return closed.groupby(closed['course_code'].astype(object)).size().rename('closed_sections')
+
+
+def course_demand(section, student_cap, term_code=None):
+    """
+    Enrolled seats per course code, optionally within one term
+    """
+    if term_code is not None:
+        section = section[section['term_code'] == term_code]
+    enrolled = student_cap.groupby('section_id')['enrolled'].sum()
+    enrolled = enrolled.reindex(section['section_id']).fillna(0).to_numpy()
+    return pd.Series(enrolled, index=section['course_code'].astype(object).to_numpy()).groupby(level=0).sum()
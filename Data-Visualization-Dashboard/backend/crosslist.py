@@ -0,0 +1,149 @@
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.instrumentation import traced
+
+# Derived table holding the offering of every section, and its column types
+OFFERING_TABLE = 'section_offering'
+OFFERING_DTYPES = {
+    'section_id': 'int32',
+    'offering_id': 'int32',
+    'is_canonical': 'bool',
+    'offering_capacity': 'int32',
+    'listing_share': 'float64',
+    'seat_share': 'float64',
+}
+
+# Registrar tables the offerings are derived from
+OFFERING_SOURCES = ['section', 'crosslist', 'meeting', 'instruction', 'student_cap']
+
+
+def crosslist_components(crosslist):
+    """
+    Connected component of every crosslisted course code
+
+    A course can sit in several crosslist groups, so groups that share a
+    course are merged. Every course starts with its own label and each pass
+    gives all members of a group the smallest label among them; labels stop
+    changing once every component carries its minimum.
+    """
+    courses, course_codes = np.unique(crosslist['course_code'].astype(object).to_numpy(), return_inverse=True)
+    groups, group_codes = np.unique(crosslist['group'].to_numpy(), return_inverse=True)
+
+    labels = np.arange(len(courses))
+    while True:
+        group_min = np.full(len(groups), len(courses))
+        np.minimum.at(group_min, group_codes, labels[course_codes])
+        course_min = labels.copy()
+        np.minimum.at(course_min, course_codes, group_min[group_codes])
+        # Jump each label to its own label's label so chains collapse quickly
+        course_min = course_min[course_min]
+        if np.array_equal(course_min, labels):
+            break
+        labels = course_min
+
+    return pd.Series(labels, index=pd.Index(courses, name='course_code'), name='component')
+
+
+def _set_hash(keys, values):
+    """
+    Order-independent hash of the set of values attached to each key
+    """
+    hashes = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return pd.Series(hashes, index=keys.to_numpy()).groupby(level=0).sum()
+
+
+def _shared_capacity(cap, offering_id):
+    """
+    Seats of every offering: the cap its listings repeat, otherwise the sum of their caps
+    """
+    caps = cap.groupby(offering_id).agg(['min', 'max', 'sum'])
+    return pd.Series(np.where(caps['min'] == caps['max'], caps['max'], caps['sum']), index=caps.index)
+
+
+@traced()
+def section_offerings(section, crosslist, meeting, instruction, student_cap):
+    """
+    Map every section to the physical offering it is taught as
+
+    Sections of crosslisted courses are candidates for one offering when
+    they run in the same term, belong to the same crosslist component and
+    share their meetings and instructors (compared as order-independent
+    hashes). Listings that repeat one cap share that many seats, listings
+    with different caps split the room and their caps add up; the
+    candidates only form an offering if their enrollment fits those seats,
+    otherwise every listing keeps its own seats and stays on its own. The
+    offering id is the smallest section id of the offering, its canonical
+    listing.
+
+    Each listing is credited with a share of its offering in proportion to
+    its enrollment (equal shares when nobody enrolled): listing_share of
+    the offering's seats and section count, and seat_share scales its own
+    cap and seat group caps to the seats it is credited with.
+    """
+    components = crosslist_components(crosslist)
+    component = components.reindex(section['course_code'].astype(object)).to_numpy()
+
+    meeting_hash = _set_hash(
+        meeting['section_id'],
+        meeting[['day_mask', 'start_minute', 'building_code', 'room']]
+    ).reindex(section['section_id'], fill_value=0).to_numpy(dtype=np.uint64)
+    teaching_hash = _set_hash(
+        instruction['section_id'],
+        instruction['instructor_code']
+    ).reindex(section['section_id'], fill_value=0).to_numpy(dtype=np.uint64)
+    enrolled = student_cap.groupby('section_id')['enrolled'].sum().reindex(
+        section['section_id'], fill_value=0
+    ).to_numpy()
+
+    section_ids = section['section_id'].to_numpy()
+    sections = pd.DataFrame({
+        'section_id': section_ids,
+        'course_code': section['course_code'].astype(object).to_numpy(),
+        'cap': section['cap'].to_numpy(dtype=np.int32),
+        'enrolled': enrolled,
+        'term_code': section['term_code'].to_numpy(),
+        'component': component,
+        'meeting_hash': meeting_hash,
+        'teaching_hash': teaching_hash,
+    })
+    mergeable = ~np.isnan(component) & ((meeting_hash != 0) | (teaching_hash != 0))
+
+    # Two sections of the same course are never one offering, so the n-th
+    # section of each course in a slot pairs with the n-th of the others
+    key = ['term_code', 'component', 'meeting_hash', 'teaching_hash']
+    candidates = sections[mergeable]
+    candidates = candidates.assign(listing=candidates.groupby(key + ['course_code']).cumcount())
+    offering = candidates.groupby(key + ['listing'])['section_id'].transform('min')
+
+    offering_id = section_ids.copy()
+    offering_id[mergeable] = offering.to_numpy()
+
+    # Candidates whose enrollment overflows the seats they would share hold
+    # separate seats after all
+    shared = _shared_capacity(sections['cap'], offering_id)
+    overflow = sections.groupby(offering_id)['enrolled'].sum().to_numpy() > shared.to_numpy()
+    offering_id = np.where(overflow[shared.index.get_indexer(offering_id)], section_ids, offering_id)
+    offering_capacity = _shared_capacity(sections['cap'], offering_id).reindex(offering_id).to_numpy()
+
+    grouped = sections.groupby(offering_id)
+    offering_enrolled = grouped['enrolled'].transform('sum').to_numpy()
+    listings = grouped['section_id'].transform('size').to_numpy()
+    listing_share = np.divide(enrolled, offering_enrolled, out=1 / listings, where=offering_enrolled > 0)
+
+    cap = sections['cap'].to_numpy()
+    seat_share = np.divide(offering_capacity * listing_share, cap, out=np.ones(len(cap)), where=cap > 0)
+
+    return pd.DataFrame({
+        'section_id': section_ids,
+        'offering_id': offering_id.astype(np.int32),
+        'is_canonical': offering_id == section_ids,
+        'offering_capacity': offering_capacity.astype(np.int32),
+        'listing_share': listing_share,
+        'seat_share': seat_share,
+    })
+
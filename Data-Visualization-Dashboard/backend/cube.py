@@ -0,0 +1,145 @@
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.filter_index import FilterIndex
+from backend.instrumentation import traced
+from backend.seat_fill import SEAT_GROUPS, SEAT_MEASURES
+
+# Dimensions of the cube; delivery mode and section status are kept so the
+# sidebar can filter on them without falling back to the fact rows
+DIMENSIONS = ['term', 'department_name', 'course_code', 'instructor_name', 'delivery_code', 'status']
+
+# Display labels carried alongside a dimension. Course titles are not unique,
+# so courses are grouped and filtered by code and only labelled with the title
+LABELS = {'course_code': 'course_label'}
+
+# Additive measures answered by every roll-up, including seats reserved and
+# taken per class year (see backend/seat_fill.py)
+MEASURES = ['enrolled', 'capacity', 'sections'] + SEAT_MEASURES
+
+# Each measure is stored twice: attributed once per section, and once per
+# teaching assignment so instructor roll-ups credit every co-instructor
+_SECTION_MEASURES = {m: m for m in MEASURES}
+_TEACHING_MEASURES = {f'taught_{m}': m for m in MEASURES}
+
+# Seat group caps of a crosslisted listing, scaled to the share of the
+# offering's seats it is credited with (see backend/crosslist.py)
+_SHARED_SEAT_MEASURES = [f'cap_{group.lower()}' for group in SEAT_GROUPS]
+
+
+class EnrollmentCube:
+    def __init__(self, cells):
+        """
+        Wrap pre-aggregated cube cells (one row per populated dimension combination)
+        """
+        self.cells = cells
+        self._index = None
+
+    def __getstate__(self):
+        """
+        Pickle only the cells; the filter index is rebuilt on demand
+        """
+        return {'cells': self.cells}
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled cube
+        """
+        self.__init__(state['cells'])
+
+    @property
+    def index(self):
+        """
+        Bitmap index over the cube cells
+        """
+        if self._index is None:
+            self._index = FilterIndex(self.cells, DIMENSIONS)
+        return self._index
+
+    @classmethod
+    @traced()
+    def from_facts(cls, facts):
+        """
+        Materialize the cube at the finest grain from the enrollment fact table
+        """
+        section_row = facts['is_section_row'].to_numpy()
+        listing_share = facts['listing_share'].to_numpy()
+        seat_share = facts['seat_share'].to_numpy()
+        measures = {}
+        for name in MEASURES:
+            # A crosslisted listing counts its share of the offering's seats and sections
+            if name == 'capacity':
+                values = facts['offering_capacity'].to_numpy() * listing_share
+            elif name == 'sections':
+                values = listing_share
+            elif name in _SHARED_SEAT_MEASURES:
+                values = facts[name].to_numpy() * seat_share
+            else:
+                values = facts[name].to_numpy()
+            measures[name] = np.where(section_row, values, 0)
+            measures[f'taught_{name}'] = values
+        measures = pd.DataFrame(measures, index=facts.index)
+
+        # A label depends on its dimension alone, so grouping by it adds no cells
+        keys = DIMENSIONS + list(LABELS.values())
+        cells = (
+            pd.concat([facts[keys], measures], axis=1)
+            .groupby(keys, observed=True, sort=False, dropna=False)
+            .sum()
+            .reset_index()
+        )
+        return cls(cells)
+
+    def _slice(self, filters):
+        """
+        Cells matching every {dimension: allowed values} filter
+        """
+        if not filters:
+            return self.cells
+        return self.cells.iloc[self.index.select(filters)]
+
+    def _measure_columns(self, by, filters):
+        """
+        Teaching-attributed measures whenever instructors are grouped or filtered on
+        """
+        if 'instructor_name' in by or (filters and filters.get('instructor_name') is not None):
+            return _TEACHING_MEASURES
+        return _SECTION_MEASURES
+
+    @traced(record=('by',))
+    def rollup(self, by, filters=None):
+        """
+        Sum cube cells up to the given dimensions, optionally within a filtered slice
+        """
+        by = [by] if isinstance(by, str) else list(by)
+        columns = self._measure_columns(by, filters)
+        cells = self._slice(filters)
+        keys = by + [LABELS[d] for d in by if d in LABELS]
+
+        result = (
+            cells.groupby(keys, observed=True)[list(columns)]
+            .sum()
+            .rename(columns=columns)
+            .reset_index()
+        )
+        return result
+
+    @traced()
+    def totals(self, filters=None):
+        """
+        Grand totals of every measure within a filtered slice
+        """
+        columns = self._measure_columns([], filters)
+        # Summed per column so integer measures stay integers beside the shared ones
+        cells = self._slice(filters)
+        return {columns[name]: cells[name].sum().item() for name in columns}
+
+    def values(self, dimension):
+        """
+        Distinct members of a dimension, in category order
+        """
+        return self.cells[dimension].cat.categories.tolist()
@@ -1,87 +1,512 @@
 import os
 from pathlib import Path
+import argparse
+import sys
+import threading
+import time
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, select, and_, bindparam, MetaData, Table, Column, Index, Boolean, Float, Integer, Text
 from dotenv import load_dotenv
 
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.crosslist import OFFERING_DTYPES, OFFERING_SOURCES, OFFERING_TABLE, section_offerings
+from backend.delta_sync import changed_partitions, diff_keys, parse_keys, row_partitions, summarize_rows
+from backend.detail_table import EXPORT_CHUNK_ROWS
+from backend.dialect import read_table, read_table_chunks, get_dialect
+from backend.instrumentation import span, traced
+from backend.query_cache import QueryCache, referenced_tables
+from backend.sql_pushdown import (
+    DETAIL_COLUMNS, MEASURES, aggregate_query, detail_count_query, detail_rows_query,
+    rate_histogram_query, section_rows_query, values_query
+)
+from backend.registrar import (
+    READ_OPTIONS, REGISTRAR_TABLES, SYNC_KEYS, TABLE_DTYPES, TABLE_KEYS, WORKBOOK_TABLES, find_table_file
+)
+from backend.table_cache import load_table
+
 # Load environment variables
 load_dotenv()
 
+# SQLite settings for the duration of a bulk load; whatever was in effect
+# before (a WAL journal the operator chose, say) is restored after it
+SQLITE_BULK_PRAGMAS = {
+    'synchronous': 'OFF',
+    'journal_mode': 'MEMORY',
+    'temp_store': 'MEMORY',
+    'cache_size': '-65536',
+}
+
+# Bookkeeping for the incremental sync: one hash per natural key, and one
+# digest per (table, term) partition so unchanged terms are skipped outright
+_SYNC_METADATA = MetaData()
+SYNC_KEYS_TABLE = Table(
+    '_sync_keys',
+    _SYNC_METADATA,
+    Column('table_name', Text, primary_key=True),
+    Column('row_key', Text, primary_key=True),
+    Column('partition_key', Integer),
+    Column('row_hash', Integer),
+    Index('ix__sync_keys_partition', 'table_name', 'partition_key')
+)
+SYNC_PARTITIONS_TABLE = Table(
+    '_sync_partitions',
+    _SYNC_METADATA,
+    Column('table_name', Text, primary_key=True),
+    Column('partition_key', Integer, primary_key=True),
+    Column('digest', Integer),
+    Column('rows', Integer)
+)
+
+def _records(df):
+    """
+    Rows as dicts of plain Python values, with None for missing
+    """
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+def _sql_type(dtype):
+    """
+    SQL column type for a declared pandas dtype
+    """
+    dtype = pd.api.types.pandas_dtype(dtype)
+    if pd.api.types.is_bool_dtype(dtype):
+        return Boolean()
+    if pd.api.types.is_integer_dtype(dtype):
+        return Integer()
+    if pd.api.types.is_float_dtype(dtype):
+        return Float()
+    return Text()
+
+# Query results shared by every DatabaseConnection in the process, keyed by
+# database URL, normalized SQL and bound parameters
+QUERY_CACHE = QueryCache(
+    maxsize=int(os.getenv('QUERY_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('QUERY_CACHE_TTL', '300'))
+)
+
+# One pooled engine per database URL, shared by every DatabaseConnection
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+
+def get_engine(connection_string):
+    """
+    Pooled engine for a database URL, created on first use
+    """
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(connection_string)
+        if engine is None:
+            engine = create_engine(connection_string, pool_pre_ping=True)
+            _ENGINES[connection_string] = engine
+        return engine
+
 class DatabaseConnection:
+    # Columns the paginated detail table can show
+    detail_columns = list(DETAIL_COLUMNS)
+    
     def __init__(self):
         """
         Initialize database connection
         """
         self.connection_string = os.getenv('DATABASE_URL', 'sqlite:///data/university.db')
-        self.engine = create_engine(self.connection_string)
+        self.engine = get_engine(self.connection_string)
     
     def load_data_from_csv(self, csv_path, table_name):
         """
         Load data from CSV file into database
         """
-        # Try different encodings and delimiters
-        encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-        delimiters = [',', '\t', ';', '|']
+        try:
+            df = read_table(csv_path)
+        except (UnicodeDecodeError, pd.errors.ParserError) as e:
+            raise ValueError(f"Could not load {table_name} data: {e}")
         
-        for encoding in encodings:
-            for delimiter in delimiters:
-                try:
-                    df = pd.read_csv(csv_path, encoding=encoding, delimiter=delimiter)
-                    print(f"Successfully loaded {table_name} data with {encoding} encoding and '{delimiter}' delimiter")
-                    df.to_sql(table_name, self.engine, if_exists='replace', index=False)
-                    print(f"Data loaded into {table_name} successfully!")
-                    return
-                except (UnicodeDecodeError, pd.errors.ParserError):
-                    continue
+        dialect = get_dialect(csv_path)
+        print(f"Successfully loaded {table_name} data with {dialect['encoding']} encoding and {dialect['delimiter']!r} delimiter")
+        df.to_sql(table_name, self.engine, if_exists='replace', index=False)
+        self.invalidate_cache(table_name)
+        print(f"Data loaded into {table_name} successfully!")
+    
+    def _table_definition(self, table_name, columns, dtypes=None):
+        """
+        Table object with declared column types and no keys
+        """
+        dtypes = dtypes or TABLE_DTYPES.get(table_name) or WORKBOOK_TABLES.get(table_name, {})
+        return Table(
+            table_name,
+            MetaData(),
+            *[Column(column, _sql_type(dtypes.get(column, 'string'))) for column in columns]
+        )
+    
+    def _create_table(self, conn, table_name, columns, dtypes=None):
+        """
+        Drop and recreate a table with declared column types and no keys
+        """
+        table = self._table_definition(table_name, columns, dtypes)
+        table.drop(conn, checkfirst=True)
+        table.create(conn)
+        return table
+    
+    def _create_keys(self, conn, table):
+        """
+        Add the primary key (as a unique index) and join-column indexes to a loaded table
+        """
+        keys = TABLE_KEYS.get(table.name, {})
+        primary_key = keys.get('primary_key')
+        if primary_key:
+            Index(f'{table.name}_pkey', *[table.c[c] for c in primary_key], unique=True).create(conn)
+        for columns in keys.get('indexes', []):
+            Index(f"ix_{table.name}_{'_'.join(columns)}", *[table.c[c] for c in columns]).create(conn)
+    
+    def _source_chunks(self, file_path, table_name, chunksize):
+        """
+        Columns and row chunks of a registrar file
+
+        Workbooks are read through their columnar sidecar (see
+        backend/table_cache.py) rather than parsed again.
+        """
+        if table_name in WORKBOOK_TABLES:
+            df = load_table(file_path, table_name)
+            return df.columns, (df.iloc[offset:offset + chunksize] for offset in range(0, len(df), chunksize))
+        dtypes = TABLE_DTYPES.get(table_name) or None
+        read_options = READ_OPTIONS.get(table_name, {})
+        columns = read_table(file_path, nrows=0, **read_options).columns
+        return columns, read_table_chunks(file_path, chunksize, dtype=dtypes, **read_options)
+    
+    def bulk_load_from_csv(self, csv_path, table_name, chunksize=5000):
+        """
+        Stream a registrar file into a table in chunks, inside one transaction
+        """
+        columns, chunks = self._source_chunks(csv_path, table_name, chunksize)
+        is_sqlite = self.engine.dialect.name == 'sqlite'
+        
+        start = time.perf_counter()
+        rows = 0
+        with self.engine.connect() as conn:
+            if is_sqlite:
+                saved_pragmas = {name: conn.exec_driver_sql(f'PRAGMA {name}').scalar() for name in SQLITE_BULK_PRAGMAS}
+                for name, value in SQLITE_BULK_PRAGMAS.items():
+                    conn.exec_driver_sql(f'PRAGMA {name}={value}')
+                conn.commit()
+            
+            try:
+                with conn.begin():
+                    table = self._create_table(conn, table_name, columns)
+                    insert = table.insert()
+                    for chunk in chunks:
+                        # Plain Python values with None for missing, sent as one executemany
+                        records = _records(chunk)
+                        conn.execute(insert, records)
+                        rows += len(records)
+                    
+                    # Keys and indexes are cheaper to build once over the loaded rows
+                    self._create_keys(conn, table)
+                    
+                    # Any sync state described the old contents
+                    self._clear_sync_state(conn, table_name)
+                    if is_sqlite:
+                        conn.exec_driver_sql(f'ANALYZE "{table_name}"')
+            finally:
+                if is_sqlite:
+                    for name, value in saved_pragmas.items():
+                        conn.exec_driver_sql(f'PRAGMA {name}={value}')
+                    conn.commit()
+                self.invalidate_cache(table_name)
+        
+        seconds = time.perf_counter() - start
+        return {'rows': rows, 'seconds': seconds, 'rows_per_sec': rows / seconds if seconds else float('inf')}
+    
+    def load_offerings(self):
+        """
+        Store the physical offering of every section so aggregates count crosslisted seats once
+        """
+        data = {t: load_table(find_table_file(t), t) for t in OFFERING_SOURCES}
+        offerings = section_offerings(
+            data['section'], data['crosslist'], data['meeting'], data['instruction'], data['student_cap']
+        )
+        
+        with self.engine.begin() as conn:
+            table = self._create_table(conn, OFFERING_TABLE, offerings.columns, OFFERING_DTYPES)
+            conn.execute(table.insert(), _records(offerings))
+            self._create_keys(conn, table)
+        self.invalidate_cache(OFFERING_TABLE)
         
-        raise ValueError(f"Could not load {table_name} data with any encoding or delimiter")
+        print(f"Mapped {len(offerings):,} sections to {offerings['offering_id'].nunique():,} offerings")
+        return offerings
     
-    def query_data(self, query):
+    def bulk_load_registrar(self, tables=None, chunksize=5000):
+        """
+        Bulk load every registrar table and report the throughput
+        """
+        stats = {}
+        for table_name in tables or REGISTRAR_TABLES:
+            stats[table_name] = self.bulk_load_from_csv(find_table_file(table_name), table_name, chunksize)
+            print(f"Loaded {stats[table_name]['rows']:,} rows into {table_name} "
+                  f"in {stats[table_name]['seconds']:.2f}s ({stats[table_name]['rows_per_sec']:,.0f} rows/sec)")
+        
+        self.load_offerings()
+        
+        total_rows = sum(s['rows'] for s in stats.values())
+        total_seconds = sum(s['seconds'] for s in stats.values())
+        if total_seconds:
+            print(f"Bulk load: {total_rows:,} rows in {total_seconds:.2f}s ({total_rows / total_seconds:,.0f} rows/sec)")
+        return stats
+    
+    def _clear_sync_state(self, conn, table_name):
+        """
+        Forget the sync state of a table
+        """
+        _SYNC_METADATA.create_all(conn, checkfirst=True)
+        for state_table in (SYNC_KEYS_TABLE, SYNC_PARTITIONS_TABLE):
+            conn.execute(state_table.delete().where(state_table.c.table_name == table_name))
+    
+    def _write_sync_state(self, conn, table_name, keys, digests):
+        """
+        Insert sync state rows for the given keys and partition digests
+        """
+        if len(keys):
+            conn.execute(SYNC_KEYS_TABLE.insert(), _records(keys.assign(table_name=table_name)))
+        if len(digests):
+            conn.execute(SYNC_PARTITIONS_TABLE.insert(), _records(digests.assign(table_name=table_name)))
+    
+    def sync_from_csv(self, csv_path, table_name, section_terms=None, chunksize=5000):
+        """
+        Apply only the inserted, changed and deleted rows of a file to its table
+        
+        Rows are hashed by natural key and digested per term (section_terms maps
+        section_id to term_code for tables keyed by section). Only terms whose
+        digest changed are compared key by key, and only the differing keys are
+        written, so the cost follows the size of the change.
+        """
+        start = time.perf_counter()
+        df = load_table(csv_path, table_name)
+        key_columns = SYNC_KEYS.get(table_name) or TABLE_KEYS.get(table_name, {}).get('primary_key') or list(df.columns)
+        codes, keys, digests = summarize_rows(df, key_columns, row_partitions(df, section_terms))
+        
+        with self.engine.begin() as conn:
+            _SYNC_METADATA.create_all(conn, checkfirst=True)
+            stored_digests = pd.read_sql(
+                select(SYNC_PARTITIONS_TABLE.c.partition_key, SYNC_PARTITIONS_TABLE.c.digest, SYNC_PARTITIONS_TABLE.c.rows)
+                .where(SYNC_PARTITIONS_TABLE.c.table_name == table_name),
+                conn
+            )
+            has_table = inspect(conn).has_table(table_name)
+        
+        # Without a baseline there is nothing to diff against
+        if not has_table or stored_digests.empty:
+            stats = self.bulk_load_from_csv(csv_path, table_name, chunksize)
+            with self.engine.begin() as conn:
+                self._write_sync_state(conn, table_name, keys, digests)
+            return {'inserted': stats['rows'], 'updated': 0, 'deleted': 0, 'partitions': len(digests),
+                    'seconds': time.perf_counter() - start}
+        
+        partitions = changed_partitions(digests, stored_digests)
+        inserted, updated, deleted = [], [], []
+        if partitions:
+            with self.engine.begin() as conn:
+                stored_keys = pd.read_sql(
+                    select(SYNC_KEYS_TABLE.c.row_key, SYNC_KEYS_TABLE.c.row_hash)
+                    .where(SYNC_KEYS_TABLE.c.table_name == table_name)
+                    .where(SYNC_KEYS_TABLE.c.partition_key.in_(partitions)),
+                    conn
+                )
+                partition_keys = keys[keys['partition_key'].isin(partitions)]
+                inserted, updated, deleted = diff_keys(partition_keys, stored_keys)
+                
+                # Replace every row of a changed or deleted key, then insert new and changed rows
+                table = self._table_definition(table_name, df.columns)
+                stale = deleted + updated
+                if stale:
+                    conn.execute(
+                        # IS rather than =, so a key part that is NULL still matches
+                        table.delete().where(and_(*[
+                            table.c[c].is_not_distinct_from(bindparam(f'key_{c}')) for c in key_columns
+                        ])),
+                        [{f'key_{c}': v for c, v in key.items()} for key in parse_keys(stale, key_columns, df.dtypes)]
+                    )
+                    conn.execute(
+                        SYNC_KEYS_TABLE.delete().where(and_(
+                            SYNC_KEYS_TABLE.c.table_name == table_name,
+                            SYNC_KEYS_TABLE.c.row_key == bindparam('stale_key')
+                        )),
+                        [{'stale_key': key} for key in stale]
+                    )
+                
+                fresh = inserted + updated
+                if fresh:
+                    fresh_codes = np.flatnonzero(keys['row_key'].isin(fresh).to_numpy())
+                    rows = df[np.isin(codes, fresh_codes)]
+                    for offset in range(0, len(rows), chunksize):
+                        conn.execute(table.insert(), _records(rows.iloc[offset:offset + chunksize]))
+                
+                conn.execute(SYNC_PARTITIONS_TABLE.delete().where(and_(
+                    SYNC_PARTITIONS_TABLE.c.table_name == table_name,
+                    SYNC_PARTITIONS_TABLE.c.partition_key.in_(partitions)
+                )))
+                self._write_sync_state(
+                    conn,
+                    table_name,
+                    keys[keys['row_key'].isin(fresh)],
+                    digests[digests['partition_key'].isin(partitions)]
+                )
+            self.invalidate_cache(table_name)
+        
+        return {'inserted': len(inserted), 'updated': len(updated), 'deleted': len(deleted),
+                'partitions': len(partitions), 'seconds': time.perf_counter() - start}
+    
+    def sync_registrar(self, tables=None):
+        """
+        Incrementally refresh every registrar table and report what changed
+
+        The meeting workbook is compared through its columnar sidecar like any
+        other table, so a changed timetable also rebuilds the offerings.
+        """
+        section = load_table(find_table_file('section'), 'section')
+        section_terms = pd.Series(section['term_code'].to_numpy(), index=section['section_id'].to_numpy())
+        
+        stats = {}
+        for table_name in tables or REGISTRAR_TABLES:
+            stats[table_name] = self.sync_from_csv(find_table_file(table_name), table_name, section_terms)
+            print(f"Synced {table_name}: {stats[table_name]['inserted']:,} inserted, "
+                  f"{stats[table_name]['updated']:,} updated, {stats[table_name]['deleted']:,} deleted "
+                  f"across {stats[table_name]['partitions']} changed term(s) in {stats[table_name]['seconds']:.2f}s")
+        
+        # Offerings are derived from several tables, so they are rebuilt whenever one of them changed
+        if any(stats[t]['inserted'] or stats[t]['updated'] or stats[t]['deleted'] for t in OFFERING_SOURCES if t in stats):
+            self.load_offerings()
+        return stats
+    
+    def query_data(self, query, params=None, use_cache=True):
         """
         Execute SQL query and return results as DataFrame
+        
+        Results are served from the shared query cache until they expire or a
+        table they read from is reloaded. Callers get their own copy.
+        """
+        if not use_cache:
+            return self._read_sql(query, params)
+        
+        key = QUERY_CACHE.make_key(self.connection_string, query, params)
+        tables = referenced_tables(query)
+        result = QUERY_CACHE.get_or_compute(
+            key,
+            lambda: self._read_sql(query, params, tables),
+            tables
+        )
+        return result.copy()
+    
+    def _read_sql(self, query, params=None, tables=None):
+        """
+        Run a query in the database inside a span, tagged with the tables it reads
+        """
+        with span('database.read_sql', tables=sorted(tables or [])) as s:
+            result = pd.read_sql(query, self.engine, params=params)
+            s.rows_out = len(result)
+        return result
+    
+    def invalidate_cache(self, table_name=None):
+        """
+        Drop cached results that read from a table (all of them if table_name is None)
+        """
+        return QUERY_CACHE.invalidate(self.connection_string, table_name)
+    
+    def cache_stats(self):
+        """
+        Hit/miss counters of the shared query cache
         """
-        return pd.read_sql(query, self.engine)
+        return QUERY_CACHE.stats()
     
-    def get_enrollment_data(self):
+    @traced(record=('by',))
+    def rollup(self, by, filters=None, measures=None):
         """
-        Get processed enrollment data
+        Aggregate measures by the given dimensions inside the database
+        
+        Same contract as EnrollmentCube.rollup: grouping or filtering on
+        instructors counts a section once per co-instructor.
+        """
+        statement, params = aggregate_query(by, measures or list(MEASURES), filters)
+        return self.query_data(statement, params)
+    
+    def totals(self, filters=None):
+        """
+        Grand totals of every measure within a filtered slice
+        """
+        totals = self.rollup([], filters)
+        return {name: (totals[name].iloc[0].item() if pd.notna(totals[name].iloc[0]) else 0) for name in totals.columns}
+    
+    def values(self, dimension):
+        """
+        Distinct members of a dimension
+        """
+        return self.query_data(values_query(dimension))[dimension].dropna().tolist()
+    
+    def rate_histogram(self, filters=None, bins=30):
+        """
+        Section counts per equal-width enrollment-rate bin, binned in the database
+        """
+        statement, params = rate_histogram_query(filters, bins)
+        histogram = self.query_data(statement, params)
+        if histogram.empty:
+            return pd.DataFrame({'enrollment_rate': [], 'sections': []})
+        
+        low, high = histogram['low'].min(), histogram['high'].max()
+        width = (high - low) / bins if high > low else 1.0
+        return pd.DataFrame({
+            'enrollment_rate': low + (histogram['bin'] + 0.5) * width,
+            'sections': histogram['sections']
+        })
+    
+    def get_enrollment_data(self, filters=None, limit=None):
+        """
+        Get processed enrollment data, one row per section
+        """
+        statement, params = section_rows_query(filters, limit)
+        return self.query_data(statement, params)
+    
+    def detail_count(self, filters=None, search=None):
+        """
+        Number of (section, instructor) rows matching the filters and search text
+        """
+        statement, params = detail_count_query(filters, search)
+        return int(self.query_data(statement, params)['row_count'].iloc[0])
+    
+    def detail_page(self, filters=None, columns=None, sort_by=None, ascending=True, search=None, offset=0, limit=50):
+        """
+        One page of (section, instructor) rows, sorted, searched and paged with LIMIT/OFFSET in the database
+        """
+        columns = list(columns or self.detail_columns)
+        statement, params = detail_rows_query(filters, columns, sort_by, ascending, search, limit, offset)
+        return self.query_data(statement, params)[columns]
+    
+    def detail_chunks(self, filters=None, columns=None, sort_by=None, ascending=True, search=None,
+                      chunk_size=EXPORT_CHUNK_ROWS):
         """
-        query = """
-        SELECT 
-            c.course_name,
-            d.department_name,
-            i.instructor_name,
-            s.enrolled,
-            s.capacity,
-            s.term
-        FROM section s
-        JOIN course c ON s.course_id = c.course_id
-        JOIN department d ON c.department_id = d.department_id
-        JOIN instructor i ON s.instructor_id = i.instructor_id
+        Every matching row in order, streamed from one query in chunks
+        
+        Bypasses the query cache: exports are read once and can be large.
         """
-        return self.query_data(query)
+        columns = list(columns or self.detail_columns)
+        statement, params = detail_rows_query(filters, columns, sort_by, ascending, search)
+        with self.engine.connect().execution_options(stream_results=True) as conn:
+            for chunk in pd.read_sql(statement, conn, params=params, chunksize=chunk_size):
+                yield chunk[columns]
 
 def main():
     """
     Main function to set up database and load initial data
     """
+    parser = argparse.ArgumentParser(description="Load the registrar tables into the database")
+    parser.add_argument('--sync', action='store_true',
+                        help="Apply only changed rows instead of reloading every table")
+    args = parser.parse_args()
+    
     db = DatabaseConnection()
     
-    # Define data directory
-    data_dir = Path(__file__).parent.parent / 'data'
-    
-    # Load initial data
-    tables = {
-        'course': 'course',
-        'section': 'section',
-        'instructor': 'instructor',
-        'department': 'department'
-    }
-    
-    for table_name, file_name in tables.items():
-        file_path = data_dir / file_name
-        if file_path.exists():
-            db.load_data_from_csv(file_path, table_name)
+    if args.sync:
+        # Upsert changed sections, seat counts and teaching assignments in place
+        db.sync_registrar()
+    else:
+        # Load every registrar table with keys and join indexes
+        db.bulk_load_registrar()
     
     print("Database setup completed successfully!")
 
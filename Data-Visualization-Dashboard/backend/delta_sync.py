@@ -0,0 +1,122 @@
+from functools import reduce
+import numpy as np
+import pandas as pd
+
+# Separator between the parts of a composite row key, and the part standing
+# for a missing value (which str() would turn into an unparseable 'nan')
+KEY_SEPARATOR = '\x1f'
+NULL_KEY = '\x1e'
+
+# Partition used for tables that cannot be tied to a term
+DEFAULT_PARTITION = 0
+
+
+def row_keys(df, key_columns):
+    """
+    Natural key of every row as a single string
+    """
+    parts = [
+        np.where(df[column].isna().to_numpy(), NULL_KEY, np.asarray(df[column].astype(object)).astype(str))
+        for column in key_columns
+    ]
+    return reduce(lambda left, right: np.char.add(np.char.add(left, KEY_SEPARATOR), right), parts)
+
+
+def parse_keys(keys, key_columns, dtypes):
+    """
+    Turn row key strings back into typed key values, one dict per key
+    """
+    records = []
+    for key in keys:
+        record = {}
+        for column, value in zip(key_columns, key.split(KEY_SEPARATOR)):
+            if value == NULL_KEY:
+                record[column] = None
+            else:
+                record[column] = int(value) if pd.api.types.is_integer_dtype(dtypes[column]) else value
+        records.append(record)
+    return records
+
+
+def row_partitions(df, section_terms=None):
+    """
+    Term each row belongs to, so a refresh only compares the terms that changed
+    """
+    if 'term_code' in df.columns:
+        return df['term_code'].to_numpy(dtype=np.int64)
+    if 'section_id' in df.columns and section_terms is not None:
+        terms = section_terms.reindex(df['section_id'].to_numpy())
+        return terms.fillna(DEFAULT_PARTITION).to_numpy(dtype=np.int64)
+    return np.full(len(df), DEFAULT_PARTITION, dtype=np.int64)
+
+
+def summarize_rows(df, key_columns, partitions):
+    """
+    Hash every natural key of a table and digest the hashes per partition
+
+    Returns the key code of every row, a frame of keys (row_key, partition_key,
+    row_hash) and a frame of partition digests (partition_key, digest, rows).
+    Hashes are summed with uint64 wrap-around, so the result does not depend
+    on row order and rows repeating a key still contribute once each.
+    """
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    codes, uniques = pd.factorize(row_keys(df, key_columns))
+
+    key_hash = np.zeros(len(uniques), dtype=np.uint64)
+    np.add.at(key_hash, codes, row_hash)
+    key_partition = np.empty(len(uniques), dtype=np.int64)
+    key_partition[codes] = partitions
+
+    partition_codes, partition_values = pd.factorize(key_partition)
+    digest = np.zeros(len(partition_values), dtype=np.uint64)
+    np.add.at(digest, partition_codes, key_hash)
+
+    # Stored as signed 64-bit integers, which is what SQL INTEGER columns hold
+    keys = pd.DataFrame({
+        'row_key': uniques,
+        'partition_key': key_partition,
+        'row_hash': key_hash.view(np.int64),
+    })
+    digests = pd.DataFrame({
+        'partition_key': np.asarray(partition_values, dtype=np.int64),
+        'digest': digest.view(np.int64),
+        'rows': np.bincount(partition_codes, minlength=len(partition_values)),
+    })
+    return codes, keys, digests
+
+
+def changed_partitions(digests, stored_digests):
+    """
+    Partitions whose digest or row count differs from the stored state
+    """
+    # Nullable integers keep 64-bit digests exact through the outer join
+    nullable = {'digest': 'Int64', 'rows': 'Int64'}
+    merged = digests.astype(nullable).merge(
+        stored_digests.astype(nullable),
+        on='partition_key',
+        how='outer',
+        suffixes=('', '_stored')
+    )
+    changed = (
+        (merged['digest'] != merged['digest_stored']).fillna(True) |
+        (merged['rows'] != merged['rows_stored']).fillna(True)
+    )
+    return merged.loc[changed, 'partition_key'].astype(np.int64).tolist()
+
+
+def diff_keys(keys, stored_keys):
+    """
+    Split keys into inserted, updated and deleted relative to the stored state
+    """
+    merged = keys[['row_key', 'row_hash']].astype({'row_hash': 'Int64'}).merge(
+        stored_keys[['row_key', 'row_hash']].astype({'row_hash': 'Int64'}),
+        on='row_key',
+        how='outer',
+        suffixes=('', '_stored'),
+        indicator=True
+    )
+    inserted = merged.loc[merged['_merge'] == 'left_only', 'row_key']
+    deleted = merged.loc[merged['_merge'] == 'right_only', 'row_key']
+    both = merged[merged['_merge'] == 'both']
+    updated = both.loc[both['row_hash'] != both['row_hash_stored'], 'row_key']
+    return inserted.tolist(), updated.tolist(), deleted.tolist()
@@ -0,0 +1,179 @@
+from collections import OrderedDict
+import io
+from pathlib import Path
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.instrumentation import traced
+
+# Fact columns shown by the detail table, and the text columns its search box matches
+DETAIL_COLUMNS = [
+    'section_id', 'term', 'course_code', 'course_name', 'department_name', 'instructor_name',
+    'status', 'delivery_code', 'capacity', 'enrolled', 'enrollment_rate'
+]
+SEARCH_COLUMNS = ['course_code', 'course_name', 'department_name', 'instructor_name']
+
+# Rows per chunk when streaming an export
+EXPORT_CHUNK_ROWS = 10000
+
+
+class DetailTable:
+    def __init__(self, frame, row_index, columns=None, cache_size=64):
+        """
+        Paginated, sortable and searchable view over the rows of a fact frame
+
+        Filters are answered by the frame's FilterIndex and search by matching
+        category labels, so a page costs one selection plus one sort of the
+        selected row ids; the ordered ids are kept in an LRU cache, so paging
+        through the same selection only slices them. Only the visible page
+        and columns are materialized.
+        """
+        self.frame = frame
+        self.row_index = row_index
+        self.detail_columns = [c for c in (columns or DETAIL_COLUMNS) if c in frame.columns]
+        self.cache_size = cache_size
+        self._sort_keys = {}
+        self._orders = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sort_key(self, column):
+        """
+        Float sort key of a column: category rank, or the value itself
+
+        Ordered categoricals (terms, chronologically) rank by their category
+        order, unordered ones by label.
+        """
+        key = self._sort_keys.get(column)
+        if key is None:
+            values = self.frame[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes = values.cat.codes.to_numpy()
+                if values.cat.ordered:
+                    rank = np.arange(len(values.cat.categories))
+                else:
+                    rank = np.argsort(np.argsort(values.cat.categories.astype(str), kind='stable'))
+                key = np.where(codes >= 0, rank[codes], np.nan)
+            else:
+                key = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            self._sort_keys[column] = key
+        return key
+
+    def _search_mask(self, search):
+        """
+        Rows whose search columns contain the text, case-insensitively
+        """
+        mask = np.zeros(len(self.frame), dtype=bool)
+        for column in SEARCH_COLUMNS:
+            if column not in self.frame.columns:
+                continue
+            values = self.frame[column]
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype('category')
+            # Match each distinct label once, then map the hits through the codes
+            hits = values.cat.categories.astype(str).str.contains(search, case=False, regex=False)
+            codes = values.cat.codes.to_numpy()
+            mask |= np.append(hits, False)[codes]
+        return mask
+
+    def _order(self, filters, search, sort_by, ascending):
+        """
+        Ordered row ids of a filtered, searched selection, cached per combination
+        """
+        key = (
+            tuple(sorted((d, frozenset(v)) for d, v in (filters or {}).items() if v is not None)),
+            search, sort_by, ascending
+        )
+        with self._lock:
+            rows = self._orders.get(key)
+            if rows is not None:
+                self._orders.move_to_end(key)
+                return rows
+
+        rows = self.row_index.select(filters)
+        if search:
+            rows = rows[self._search_mask(search)[rows]]
+        if sort_by is not None:
+            values = self._sort_key(sort_by)[rows]
+            rows = rows[np.lexsort((rows, values if ascending else -values))]
+
+        with self._lock:
+            self._orders[key] = rows
+            if len(self._orders) > self.cache_size:
+                self._orders.popitem(last=False)
+        return rows
+
+    def _columns(self, columns):
+        """
+        Requested columns, checked against the detail columns
+        """
+        columns = list(columns or self.detail_columns)
+        unknown = set(columns) - set(self.detail_columns)
+        if unknown:
+            raise ValueError(f"Unknown detail columns: {sorted(unknown)}")
+        return columns
+
+    @traced()
+    def detail_count(self, filters=None, search=None):
+        """
+        Number of rows matching the filters and search text
+        """
+        return len(self._order(filters, search, None, True))
+
+    @traced(record=('sort_by', 'search', 'offset', 'limit'))
+    def detail_page(self, filters=None, columns=None, sort_by=None, ascending=True, search=None, offset=0, limit=50):
+        """
+        One page of rows, with only the requested columns
+        """
+        columns = self._columns(columns)
+        rows = self._order(filters, search, sort_by, ascending)[offset:offset + limit]
+        return self.frame.iloc[rows, self.frame.columns.get_indexer(columns)].reset_index(drop=True)
+
+    def detail_chunks(self, filters=None, columns=None, sort_by=None, ascending=True, search=None,
+                      chunk_size=EXPORT_CHUNK_ROWS):
+        """
+        Every matching row in order, as frames of at most chunk_size rows
+        """
+        columns = self._columns(columns)
+        rows = self._order(filters, search, sort_by, ascending)
+        positions = self.frame.columns.get_indexer(columns)
+        # An empty selection still yields one (empty) chunk carrying the columns
+        for start in range(0, max(len(rows), 1), chunk_size):
+            yield self.frame.iloc[rows[start:start + chunk_size], positions].reset_index(drop=True)
+
+
+def write_csv(chunks):
+    """
+    CSV bytes written chunk by chunk, with the header once
+    """
+    buffer = io.StringIO()
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(buffer, index=False, header=header)
+        header = False
+    return buffer.getvalue().encode('utf-8')
+
+
+def write_parquet(chunks):
+    """
+    Parquet bytes written one row group per chunk
+    """
+    # Only exports need the Parquet writer
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    buffer = io.BytesIO()
+    writer = None
+    for chunk in chunks:
+        # Plain strings rather than dictionaries, so every chunk has the same schema
+        chunk = chunk.apply(lambda c: c.astype('string') if isinstance(c.dtype, pd.CategoricalDtype) else c)
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(buffer, table.schema)
+        writer.write_table(table.cast(writer.schema))
+    if writer is not None:
+        writer.close()
+    return buffer.getvalue()
@@ -0,0 +1,237 @@
+import csv
+import io
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.registrar import CACHE_DIR
+
+# Number of bytes inspected when sniffing a file
+SAMPLE_SIZE = 64 * 1024
+
+# Candidate delimiters, in order of preference when scores tie
+DELIMITERS = ['\t', ',', ';', '|']
+
+# Encoding to retry with when a file turns out not to match its sniffed encoding
+FALLBACK_ENCODINGS = {
+    'utf-8': 'cp1252',
+    'utf-8-sig': 'cp1252',
+    'cp1252': 'latin1',
+}
+
+# Location of the dialect manifest shared by all loaders
+MANIFEST_PATH = CACHE_DIR / 'dialect_manifest.json'
+
+# Serializes read-modify-write cycles on the manifest when tables load in parallel
+_MANIFEST_LOCK = threading.RLock()
+
+
+def _read_sample(file_path, sample_size=SAMPLE_SIZE):
+    """
+    Read a bounded prefix of a file
+    """
+    with open(file_path, 'rb') as file:
+        return file.read(sample_size)
+
+
+def _detect_encoding(sample):
+    """
+    Pick an encoding from a byte sample
+    """
+    if sample.startswith(b'\xef\xbb\xbf'):
+        return 'utf-8-sig'
+
+    # Pure ASCII prefixes decode the same under every candidate, so start with utf-8
+    # and let read_table fall back if a later byte disagrees
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte sequence cut off by the sample boundary is still utf-8
+        if e.start >= len(sample) - 3 and e.reason == 'unexpected end of data':
+            return 'utf-8'
+
+    try:
+        sample.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin1'
+
+
+def _detect_delimiter(text):
+    """
+    Pick the delimiter that splits the sample into the most consistent columns
+    """
+    # Drop the last line, it is most likely truncated by the sample boundary
+    lines = text.splitlines(keepends=True)
+    if len(lines) > 1:
+        lines = lines[:-1]
+    sample = ''.join(lines)
+
+    best_delimiter = DELIMITERS[0]
+    best_score = (-1.0, 0)
+    for delimiter in DELIMITERS:
+        try:
+            rows = list(csv.reader(io.StringIO(sample), delimiter=delimiter))
+        except csv.Error:
+            continue
+        widths = [len(row) for row in rows if row]
+        if not widths:
+            continue
+
+        # Share of rows agreeing with the most common width, then the width itself
+        common_width = max(set(widths), key=widths.count)
+        if common_width < 2:
+            continue
+        score = (widths.count(common_width) / len(widths), common_width)
+        if score > best_score:
+            best_delimiter, best_score = delimiter, score
+
+    return best_delimiter
+
+
+def sniff_dialect(file_path, sample_size=SAMPLE_SIZE):
+    """
+    Detect encoding, delimiter and line endings from a bounded prefix of a file
+    """
+    sample = _read_sample(file_path, sample_size)
+    encoding = _detect_encoding(sample)
+    text = sample.decode(encoding, errors='ignore')
+
+    return {
+        'encoding': encoding,
+        'delimiter': _detect_delimiter(text),
+        'line_terminator': 'crlf' if b'\r\n' in sample else 'lf'
+    }
+
+
+def _load_manifest():
+    """
+    Load the dialect manifest, or an empty one if it is missing or unreadable
+    """
+    try:
+        with open(MANIFEST_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(manifest):
+    """
+    Write the dialect manifest atomically
+    """
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = MANIFEST_PATH.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_PATH)
+
+
+def _file_signature(file_path):
+    """
+    Size and modification time used to validate manifest entries
+    """
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def get_dialect(file_path):
+    """
+    Return the dialect of a file, sniffing it only when the manifest is stale
+    """
+    key = str(Path(file_path).resolve())
+    signature = _file_signature(file_path)
+    with _MANIFEST_LOCK:
+        manifest = _load_manifest()
+
+        entry = manifest.get(key)
+        if entry is not None and all(entry.get(k) == v for k, v in signature.items()):
+            return {k: entry[k] for k in ('encoding', 'delimiter', 'line_terminator')}
+
+        dialect = sniff_dialect(file_path)
+        record_dialect(file_path, dialect, manifest)
+        return dialect
+
+
+def record_dialect(file_path, dialect, manifest=None):
+    """
+    Store the dialect of a file in the manifest
+    """
+    with _MANIFEST_LOCK:
+        if manifest is None:
+            manifest = _load_manifest()
+        manifest[str(Path(file_path).resolve())] = dict(dialect, **_file_signature(file_path))
+        try:
+            _save_manifest(manifest)
+        except OSError as e:
+            print(f"Could not update dialect manifest: {e}")
+
+
+def _fall_back(file_path, dialect):
+    """
+    Switch a dialect to its fallback encoding and correct the manifest
+    """
+    fallback = FALLBACK_ENCODINGS.get(dialect['encoding'])
+    if fallback is None:
+        return False
+    dialect['encoding'] = fallback
+    record_dialect(file_path, dialect)
+    return True
+
+
+def read_table(file_path, **kwargs):
+    """
+    Parse a delimited file once using its detected dialect
+    """
+    # pandas is only needed once a file is parsed, so sniffing stays cheap to import
+    import pandas as pd
+    dialect = get_dialect(file_path)
+    while True:
+        try:
+            return pd.read_csv(
+                file_path,
+                encoding=dialect['encoding'],
+                delimiter=dialect['delimiter'],
+                **kwargs
+            )
+        except UnicodeDecodeError:
+            # The sniffed prefix was plain ASCII but the file is not utf-8 further in;
+            # correct the manifest so this only ever happens once per file version
+            if not _fall_back(file_path, dialect):
+                raise
+
+
+def read_table_chunks(file_path, chunksize, **kwargs):
+    """
+    Stream a delimited file in chunks of rows using its detected dialect
+    """
+    import pandas as pd
+    dialect = get_dialect(file_path)
+    emitted = 0
+    while True:
+        try:
+            position = 0
+            with pd.read_csv(
+                file_path,
+                encoding=dialect['encoding'],
+                delimiter=dialect['delimiter'],
+                chunksize=chunksize,
+                **kwargs
+            ) as reader:
+                for chunk in reader:
+                    # After an encoding fallback, skip rows that were already yielded
+                    start = max(emitted - position, 0)
+                    position += len(chunk)
+                    if start >= len(chunk):
+                        continue
+                    chunk = chunk.iloc[start:]
+                    emitted += len(chunk)
+                    yield chunk
+            return
+        except UnicodeDecodeError:
+            if not _fall_back(file_path, dialect):
+                raise
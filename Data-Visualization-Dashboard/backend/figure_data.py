@@ -0,0 +1,164 @@
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.instrumentation import traced
+
+# Point budgets: a chart carries at most this many points whatever the input size
+HISTOGRAM_BINS = 30
+MAX_LINE_POINTS = 500
+MAX_BOX_OUTLIERS = 20
+
+
+@traced()
+def histogram_bins(values, bins=HISTOGRAM_BINS, value_name='value', count_name='count'):
+    """
+    Counts per equal-width bin, labelled by bin center
+
+    Bins span the minimum to the maximum value with the last bin closed,
+    the same bins the database computes for its rate histogram, so both
+    backends hand the chart `bins` rows instead of every value.
+    """
+    values = pd.Series(values, dtype='float64').dropna().to_numpy()
+    if not len(values):
+        return pd.DataFrame({value_name: [], count_name: []})
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({
+        value_name: (edges[:-1] + edges[1:]) / 2,
+        count_name: counts,
+    })
+
+
+@traced(record=('value', 'by'))
+def box_stats(frame, value, by, max_outliers=MAX_BOX_OUTLIERS):
+    """
+    Box-plot statistics per group, and the most extreme outliers of each
+
+    Quartiles use linear interpolation and whiskers reach the furthest
+    values within 1.5 IQR of the box, as plotly computes them from raw
+    points. Values are sorted once by (group, value) and every quantile is
+    read off the sorted array, so the cost is one sort for all groups.
+    Returns (stats, outliers); outliers keeps at most `max_outliers` points
+    per group, those furthest outside the whiskers.
+    """
+    values = frame[[by, value]].dropna()
+    codes, groups = pd.factorize(values[by].astype(object), sort=True)
+    x = values[value].to_numpy(dtype=np.float64)
+    order = np.lexsort((x, codes))
+    x, codes = x[order], codes[order]
+
+    counts = np.bincount(codes, minlength=len(groups))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    def quantile(q):
+        position = starts + q * (counts - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, starts + counts - 1)
+        return x[low] + (x[high] - x[low]) * (position - low)
+
+    q1, median, q3 = quantile(0.25), quantile(0.5), quantile(0.75)
+    iqr = q3 - q1
+    inside = (x >= (q1 - 1.5 * iqr)[codes]) & (x <= (q3 + 1.5 * iqr)[codes])
+
+    # Whiskers end at the smallest and largest values inside the fences
+    lowerfence = np.full(len(groups), np.inf)
+    upperfence = np.full(len(groups), -np.inf)
+    np.minimum.at(lowerfence, codes[inside], x[inside])
+    np.maximum.at(upperfence, codes[inside], x[inside])
+
+    stats = pd.DataFrame({
+        by: groups,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': lowerfence,
+        'upperfence': upperfence,
+        'mean': np.bincount(codes, weights=x, minlength=len(groups)) / counts,
+        'count': counts,
+    })
+
+    outside = ~inside
+    distance = np.maximum(q1[codes] - 1.5 * iqr[codes] - x, x - q3[codes] - 1.5 * iqr[codes])
+    outliers = pd.DataFrame({by: groups[codes[outside]], value: x[outside], 'distance': distance[outside]})
+    outliers = (
+        outliers.sort_values('distance', ascending=False, kind='stable')
+        .groupby(by, sort=False).head(max_outliers)
+        .drop(columns='distance')
+        .sort_values(by, kind='stable', ignore_index=True)
+    )
+    return stats, outliers
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Positions of the points Largest-Triangle-Three-Buckets keeps
+
+    The first and last points are always kept. The rest are split into
+    threshold - 2 equal buckets, and from each bucket the point forming the
+    largest triangle with the previously kept point and the average of the
+    next bucket is kept, which preserves peaks and troughs of the series.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket i covers [edges[i], edges[i + 1]); bucket averages come from prefix sums
+    edges = np.floor(np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(np.int64) + 1
+    sum_x = np.concatenate([[0.0], np.cumsum(x)])
+    sum_y = np.concatenate([[0.0], np.cumsum(y)])
+    sizes = np.diff(edges)
+    average_x = (sum_x[edges[1:]] - sum_x[edges[:-1]]) / sizes
+    average_y = (sum_y[edges[1:]] - sum_y[edges[:-1]]) / sizes
+    # The last bucket looks ahead to the final point
+    next_x = np.append(average_x[1:], x[-1])
+    next_y = np.append(average_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        area = np.abs(
+            (x[a] - next_x[i]) * (y[start:stop] - y[a])
+            - (x[a] - x[start:stop]) * (next_y[i] - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+@traced(record=('y',))
+def downsample(frame, x, y, max_points=MAX_LINE_POINTS, by=None):
+    """
+    Rows of a line series reduced to at most max_points per line with LTTB
+
+    Numeric and datetime x values keep their spacing; any other x (such as
+    term labels) is treated as evenly spaced in its current order. With
+    `by`, each line (e.g. each class year) is reduced on its own.
+    """
+    if by is not None:
+        parts = [
+            downsample(part, x, y, max_points)
+            for _, part in frame.groupby(by, sort=False, observed=True)
+        ]
+        return pd.concat(parts, ignore_index=True) if parts else frame.iloc[:0]
+
+    frame = frame[frame[y].notna()]
+    if len(frame) <= max_points:
+        return frame.reset_index(drop=True)
+
+    if pd.api.types.is_datetime64_any_dtype(frame[x]) or pd.api.types.is_numeric_dtype(frame[x]):
+        frame = frame.sort_values(x, kind='stable')
+    if pd.api.types.is_datetime64_any_dtype(frame[x]):
+        positions = frame[x].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    elif pd.api.types.is_numeric_dtype(frame[x]):
+        positions = frame[x].to_numpy(dtype=np.float64)
+    else:
+        positions = np.arange(len(frame))
+    keep = lttb_indices(positions, frame[y].to_numpy(dtype=np.float64), max_points)
+    return frame.iloc[keep].reset_index(drop=True)
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from pathlib import Path
+import sys
+import threading
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.instrumentation import traced
+
+# Dimensions the dashboard filters on, indexed over the fact rows
+FILTER_DIMENSIONS = ['department_name', 'term', 'delivery_code', 'status']
+
+
+class FilterIndex:
+    def __init__(self, frame, dimensions, cache_size=256):
+        """
+        Index the rows of a frame by the members of each filter dimension
+
+        Every member of a dimension gets a packed bitmap (one bit per row), built
+        on the first filter that touches the dimension. Filters are OR-ed within a
+        dimension and AND-ed across dimensions, and the resulting row selections
+        are kept in an LRU cache keyed by the filter combination.
+        """
+        self.frame = frame
+        self.size = len(frame)
+        self.dimensions = list(dimensions)
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._bitmaps = {}
+        self._complete = {}
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _build(self, dimension):
+        """
+        Packed bitmap per member of a dimension
+        """
+        categorical = pd.Categorical(self.frame[dimension])
+        codes = categorical.codes
+
+        # Group row ids by code with one sort instead of one scan per member
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(categorical.categories) + 1))
+
+        bitmaps = {}
+        bits = np.zeros(self.size, dtype=bool)
+        for i, value in enumerate(categorical.categories):
+            rows = order[bounds[i]:bounds[i + 1]]
+            if len(rows):
+                bits[rows] = True
+                bitmaps[value] = np.packbits(bits)
+                bits[rows] = False
+
+        self._bitmaps[dimension] = bitmaps
+        # Selecting every member only equals "no filter" when no row is missing a value
+        self._complete[dimension] = bool((codes >= 0).all())
+        return bitmaps
+
+    def _dimension_bitmaps(self, dimension):
+        """
+        Bitmaps of a dimension, building them on first use
+        """
+        if dimension not in self.dimensions:
+            raise KeyError(f"'{dimension}' is not an indexed dimension")
+        bitmaps = self._bitmaps.get(dimension)
+        if bitmaps is None:
+            bitmaps = self._build(dimension)
+        return bitmaps
+
+    def _key(self, filters):
+        """
+        Canonical cache key for a filter combination, dropping no-op filters
+        """
+        key = []
+        for dimension, values in sorted((filters or {}).items()):
+            if values is None:
+                continue
+            bitmaps = self._dimension_bitmaps(dimension)
+            values = frozenset(value for value in values if value in bitmaps)
+            if self._complete[dimension] and len(values) == len(bitmaps):
+                continue
+            key.append((dimension, values))
+        return tuple(key)
+
+    def _evaluate(self, key):
+        """
+        Row ids matching a canonical filter combination
+        """
+        if not key:
+            return np.arange(self.size)
+
+        combined = None
+        for dimension, values in key:
+            bitmaps = self._bitmaps[dimension]
+            if values:
+                selected = np.bitwise_or.reduce([bitmaps[value] for value in values])
+            else:
+                selected = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+            combined = selected if combined is None else combined & selected
+
+        return np.flatnonzero(np.unpackbits(combined, count=self.size))
+
+    @traced()
+    def select(self, filters=None):
+        """
+        Row ids of the frame matching {dimension: allowed values}, cached per combination
+        """
+        with self._lock:
+            key = self._key(filters)
+            rows = self._selections.get(key)
+            if rows is not None:
+                self._selections.move_to_end(key)
+                self.hits += 1
+                return rows
+
+            self.misses += 1
+            rows = self._evaluate(key)
+            rows.setflags(write=False)
+            self._selections[key] = rows
+            if len(self._selections) > self.cache_size:
+                self._selections.popitem(last=False)
+            return rows
+
+    def values(self, dimension):
+        """
+        Members of a dimension that occur in the frame, in category order
+        """
+        return list(self._dimension_bitmaps(dimension))
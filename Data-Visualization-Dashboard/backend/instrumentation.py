@@ -0,0 +1,283 @@
+import contextvars
+import datetime
+import functools
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+import tracemalloc
+
+# Tracing is off unless DASHBOARD_TRACE is set: '1' logs the wall and CPU
+# time and row counts of every span, 'memory' also traces peak allocations
+# (several times slower, so only for investigations)
+TRACE_MODE = os.getenv('DASHBOARD_TRACE', '').strip().lower()
+LOG_SPANS = TRACE_MODE not in ('', '0', 'false', 'off')
+TRACE_MEMORY = TRACE_MODE == 'memory'
+
+# Span log (one JSON object per line) and cProfile dumps
+LOG_DIR = Path(os.getenv('DASHBOARD_LOG_DIR', Path(__file__).parent.parent / 'data' / 'logs'))
+SPAN_LOG = LOG_DIR / 'spans.jsonl'
+PROFILE_DIR = LOG_DIR / 'profiles'
+
+_logger = logging.getLogger('dashboard.spans')
+_logger_lock = threading.Lock()
+
+
+class _Collector:
+    """
+    Spans collected for one Streamlit session rerun or one script, wherever they ran
+    """
+
+    def __init__(self, memory):
+        self.spans = []
+        self.memory = memory
+        self.started = time.perf_counter()
+
+
+# The collector and the innermost open span are context variables rather than
+# thread-locals, so work handed to a pool with carry_context() reports its
+# spans to the same collector, nested under the span that submitted it
+_collector = contextvars.ContextVar('dashboard_span_collector', default=None)
+_current_span = contextvars.ContextVar('dashboard_current_span', default=None)
+
+
+def count_rows(value):
+    """
+    Rows in a frame, array or dict of frames, or None for anything else
+    """
+    if hasattr(value, 'shape') and hasattr(value, '__len__'):
+        return len(value)
+    if isinstance(value, dict):
+        counts = [count_rows(v) for v in value.values()]
+        counts = [c for c in counts if c is not None]
+        return sum(counts) if counts else None
+    if isinstance(value, tuple) and value:
+        return count_rows(value[0])
+    return None
+
+
+def _log(record):
+    """
+    Append a span to the structured log
+    """
+    if not _logger.handlers:
+        with _logger_lock:
+            if not _logger.handlers:
+                LOG_DIR.mkdir(parents=True, exist_ok=True)
+                handler = logging.FileHandler(SPAN_LOG, encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                _logger.addHandler(handler)
+                _logger.setLevel(logging.INFO)
+                _logger.propagate = False
+    _logger.info(json.dumps(record, default=str))
+
+
+class Span:
+    """
+    Timing, row counts and (optionally) peak memory of one stage
+
+    Spans nest within a thread and across carry_context() hand-offs to
+    pool workers. Peak memory is what the stage allocated above the level it
+    started at; tracemalloc is process-wide, so concurrent threads'
+    allocations are included.
+    """
+
+    def __init__(self, name, rows_in=None, fields=None):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.fields = dict(fields or {})
+
+    def set(self, **fields):
+        """
+        Attach extra fields to the span's record
+        """
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self.depth = self.parent.depth + 1 if self.parent is not None else 0
+        self._token = _current_span.set(self)
+        self.collector = _collector.get()
+
+        self.memory = TRACE_MEMORY or (self.collector is not None and self.collector.memory)
+        if self.memory:
+            self._started_tracing = not tracemalloc.is_tracing()
+            if self._started_tracing:
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak so far to the enclosing span before restarting the count
+            if self.parent is not None and self.parent.memory:
+                self.parent._peak = max(self.parent._peak, peak)
+            tracemalloc.reset_peak()
+            self._base = self._peak = current
+
+        self.started = datetime.datetime.now()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        record = {
+            'ts': self.started.isoformat(timespec='milliseconds'),
+            'span': self.name,
+            'parent': self.parent.name if self.parent is not None else None,
+            'depth': self.depth,
+            'thread': threading.current_thread().name,
+            'wall_ms': round(wall * 1000, 3),
+            'cpu_ms': round(cpu * 1000, 3),
+            'rows_in': self.rows_in,
+            'rows_out': self.rows_out,
+        }
+        if self.memory:
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            record['peak_mb'] = round((self._peak - self._base) / 2 ** 20, 3)
+            if self.parent is not None and self.parent.memory:
+                self.parent._peak = max(self.parent._peak, self._peak)
+            if self._started_tracing:
+                tracemalloc.stop()
+        if exc_type is not None:
+            record['error'] = exc_type.__name__
+        record.update(self.fields)
+
+        _current_span.reset(self._token)
+        if LOG_SPANS:
+            _log(record)
+        if self.collector is not None:
+            # list.append is atomic, so pool workers can report concurrently
+            self.collector.spans.append((self._wall, record))
+        return False
+
+
+class _NullSpan:
+    """
+    Stand-in returned while tracing is off; every operation does nothing
+    """
+    rows_out = None
+
+    def set(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, rows_in=None, **fields):
+    """
+    Context manager timing a stage, e.g. `with span('export.render', file=name) as s:`
+
+    Costs one flag check when tracing is off.
+    """
+    if not LOG_SPANS and _collector.get() is None:
+        return _NULL_SPAN
+    return Span(name, rows_in, fields)
+
+
+def traced(name=None, record=()):
+    """
+    Decorator wrapping every call of a function in a span
+
+    Rows in are counted over the frame arguments and rows out over the
+    result; record names arguments to copy into the span, e.g. record=('by',).
+    """
+    def decorator(function):
+        # Named after the defining file, which stays meaningful when it runs as __main__
+        span_name = name or f"{Path(function.__code__.co_filename).stem}.{function.__qualname__}"
+        signature = inspect.signature(function) if record else None
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not LOG_SPANS and _collector.get() is None:
+                return function(*args, **kwargs)
+
+            counts = [c for c in map(count_rows, list(args) + list(kwargs.values())) if c is not None]
+            fields = {}
+            if signature is not None:
+                bound = signature.bind_partial(*args, **kwargs).arguments
+                fields = {arg: bound[arg] for arg in record if arg in bound}
+            with Span(span_name, sum(counts) if counts else None, fields) as s:
+                result = function(*args, **kwargs)
+                s.rows_out = count_rows(result)
+                return result
+        return wrapper
+    return decorator
+
+
+def carry_context(function):
+    """
+    Wrap a function so it runs in a copy of the caller's context, e.g. `pool.submit(carry_context(load), path)`
+
+    Spans it records on a worker thread then reach the caller's collector
+    and name the caller's open span as their parent. Each call gets its own
+    copy, so the wrapper can be submitted many times at once.
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(function, *args, **kwargs)
+    return wrapper
+
+
+def start_collecting(memory=False):
+    """
+    Collect every span recorded from now on in this thread, and in pool work it hands off with carry_context()
+
+    Works whether or not DASHBOARD_TRACE is set; memory turns on peak
+    memory tracing for these spans only.
+    """
+    _collector.set(_Collector(memory))
+    _current_span.set(None)
+
+
+def stop_collecting():
+    """
+    Stop collecting and return the spans recorded (in the order they started), with the total wall time in ms
+    """
+    collector = _collector.get()
+    if collector is None:
+        return [], 0.0
+    spans = [record for _, record in sorted(collector.spans, key=lambda item: item[0])]
+    elapsed = time.perf_counter() - collector.started
+    _collector.set(None)
+    return spans, round(elapsed * 1000, 3)
+
+
+def start_profile():
+    """
+    Start a cProfile profile of the current thread
+    """
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profile(profiler, name='profile', top=30):
+    """
+    Stop a profile, dump it for snakeviz/pstats and return the path and a text summary
+
+    The summary lists the top functions by cumulative time.
+    """
+    import io
+    import pstats
+
+    profiler.disable()
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / f"{name}-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.prof"
+    profiler.dump_stats(path)
+
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(top)
+    return path, report.getvalue()
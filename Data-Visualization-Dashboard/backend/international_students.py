@@ -0,0 +1,251 @@
+import os
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.dialect import read_table
+
+# International student archive (comma-separated, one file per breakdown)
+ARCHIVE_DIR = Path(os.getenv('ARCHIVE_DIR', Path(__file__).parent.parent.parent / 'archive (1)'))
+
+# Breakdowns with a hierarchy, from its coarsest to its finest level, and the
+# flat dimensions that cut across it
+ARCHIVE_HIERARCHIES = {
+    'origin': {'levels': ['origin_region', 'origin'], 'dimensions': ['academic_type']},
+    'field_of_study': {'levels': ['field_of_study', 'major'], 'dimensions': []},
+    'source_of_fund': {'levels': ['source_type', 'source_of_fund'], 'dimensions': ['academic_type']},
+    'academic_detail': {'levels': ['academic_type', 'academic_level'], 'dimensions': []},
+}
+
+# Tables with one row per year and one column per measure
+ARCHIVE_SERIES = ['academic', 'status']
+
+# Measure of the hierarchical breakdowns
+MEASURE = 'students'
+
+
+def parse_academic_years(labels):
+    """
+    Starting calendar year of academic year labels such as '1948/49' or '1999/00'
+    """
+    labels = pd.Series(labels, dtype=object).astype(str).str.strip()
+    parts = labels.str.extract(r'^(\d{4})/(\d{2})$')
+    bad = parts[0].isna()
+    if not bad.any():
+        start = parts[0].astype(np.int16)
+        # The second half must be the following year, e.g. not '1999/01'
+        bad = (start + 1) % 100 != parts[1].astype(np.int16)
+    if bad.any():
+        raise ValueError(f"Unrecognized academic year label '{labels[bad].iloc[0]}'")
+    return start.to_numpy()
+
+
+def academic_year_label(year):
+    """
+    Academic year label of a starting year, the inverse of parse_academic_years
+    """
+    return f'{year}/{(year + 1) % 100:02d}'
+
+
+def read_archive_table(name):
+    """
+    Read an archive table with integer year keys and stripped labels
+
+    The files differ in dialect (one has a BOM and CRLF line endings), which
+    the shared sniffing in backend/dialect.py takes care of.
+    """
+    df = read_table(ARCHIVE_DIR / f'{name}.csv')
+    for column in df.columns:
+        if df[column].dtype == object and column != 'year':
+            df[column] = df[column].str.strip()
+    df['year'] = parse_academic_years(df['year'])
+    return df
+
+
+def _year_over_year(rollup, keys):
+    """
+    Add the previous year's value, the change and the relative change to a roll-up
+
+    Rows are sorted by group and year, so each row's predecessor is the same
+    group's previous row; it only counts when it is exactly one year earlier.
+    """
+    rollup = rollup.sort_values(keys + ['year'], kind='stable').reset_index(drop=True)
+    same_group = np.ones(len(rollup), dtype=bool)
+    for key in keys:
+        values = rollup[key].to_numpy()
+        same_group[1:] &= values[1:] == values[:-1]
+    same_group[0] = False
+    year = rollup['year'].to_numpy()
+    consecutive = same_group & (year - np.roll(year, 1) == 1)
+
+    students = rollup[MEASURE].to_numpy(dtype=np.float64)
+    previous = np.where(consecutive, np.roll(students, 1), np.nan)
+    rollup['previous'] = previous
+    rollup['delta'] = students - previous
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rollup['pct_change'] = np.where(previous > 0, students / previous - 1, np.nan)
+    return rollup
+
+
+class TimeSeriesCube:
+    def __init__(self, levels, dimensions, labels, parents, dimension_labels, rollups):
+        """
+        Pre-aggregated yearly roll-ups of a hierarchical breakdown
+
+        Every member of every level is an integer code (labels[level][code] is
+        its name and parents[level][code] the code of its parent), and each
+        roll-up holds one row per year and member with its year-over-year
+        change, so drilling down or across years never rescans the raw rows.
+        """
+        self.levels = levels
+        self.dimensions = dimensions
+        self.labels = labels
+        self.parents = parents
+        self.dimension_labels = dimension_labels
+        self.rollups = rollups
+
+    @classmethod
+    def from_frame(cls, df, levels, dimensions=()):
+        """
+        Encode the hierarchy and precompute the roll-up of every level, with and without the flat dimensions
+
+        Members are coded by their full path, so a name repeated under two
+        parents stays two members.
+        """
+        levels, dimensions = list(levels), list(dimensions)
+        codes = pd.DataFrame({'year': df['year'].to_numpy()})
+        labels, parents = {}, {}
+        for depth, level in enumerate(levels):
+            path = levels[:depth + 1]
+            code = df.groupby(path, sort=True).ngroup().to_numpy(dtype=np.int32)
+            codes[level] = code
+            members = np.empty(code.max() + 1 if len(code) else 0, dtype=object)
+            members[code] = df[level].to_numpy()
+            labels[level] = members
+            if depth:
+                parent = np.empty(len(members), dtype=np.int32)
+                parent[code] = codes[levels[depth - 1]].to_numpy()
+                parents[level] = parent
+
+        dimension_labels = {}
+        for dimension in dimensions:
+            code, uniques = pd.factorize(df[dimension], sort=True)
+            codes[dimension] = code.astype(np.int16)
+            dimension_labels[dimension] = np.asarray(uniques, dtype=object)
+        codes[MEASURE] = df[MEASURE].to_numpy(dtype=np.float64)
+
+        # A total (depth 0) plus one roll-up per level, each with and without the dimensions
+        rollups = {}
+        for depth in range(len(levels) + 1):
+            level_keys = levels[depth - 1:depth] if depth else []
+            for dimension_keys in ([[], dimensions] if dimensions else [[]]):
+                keys = level_keys + dimension_keys
+                rollup = (
+                    codes.groupby(['year'] + keys, sort=False)[MEASURE]
+                    # A year with only unreported rows stays unreported rather than zero
+                    .sum(min_count=1)
+                    .reset_index()
+                )
+                rollups[(depth, bool(dimension_keys))] = _year_over_year(rollup, keys)
+        return cls(levels, dimensions, labels, parents, dimension_labels, rollups)
+
+    def members(self, depth, parent=None):
+        """
+        Names of the members at a depth (1 is the coarsest level), optionally under one parent
+        """
+        level = self.levels[depth - 1]
+        members = self.labels[level]
+        if parent is not None and depth > 1:
+            parent_code = self._code(depth - 1, parent)
+            members = members[self.parents[level] == parent_code]
+        return members.tolist()
+
+    def _code(self, depth, name, parent_code=None):
+        """
+        Code of a member by name, within a parent when the name repeats
+        """
+        level = self.levels[depth - 1]
+        matches = np.flatnonzero(self.labels[level] == name)
+        if parent_code is not None and depth > 1:
+            matches = matches[self.parents[level][matches] == parent_code]
+        if not len(matches):
+            raise KeyError(f"No {level} named '{name}'")
+        return matches[0]
+
+    def series(self, depth=0, parent=None, dimension_values=None):
+        """
+        Yearly values and year-over-year changes of every member at a depth
+
+        depth 0 is the overall total. parent restricts the members to the
+        children of one member of the level above, and dimension_values
+        restricts the rows to one value per flat dimension, e.g.
+        {'academic_type': 'Graduate'}.
+        """
+        dimension_values = {k: v for k, v in (dimension_values or {}).items() if v is not None}
+        rollup = self.rollups[(depth, bool(dimension_values))]
+
+        mask = np.ones(len(rollup), dtype=bool)
+        if dimension_values:
+            for dimension in self.dimensions:
+                if dimension in dimension_values:
+                    code = np.flatnonzero(self.dimension_labels[dimension] == dimension_values[dimension])
+                    mask &= rollup[dimension].to_numpy() == (code[0] if len(code) else -1)
+                else:
+                    raise ValueError(f"A value is needed for every dimension: {self.dimensions}")
+        if depth:
+            level = self.levels[depth - 1]
+            member_codes = rollup[level].to_numpy()
+            if parent is not None and depth > 1:
+                parent_code = self._code(depth - 1, parent)
+                mask &= self.parents[level][member_codes] == parent_code
+        rollup = rollup[mask]
+
+        result = pd.DataFrame({'year': rollup['year'].to_numpy()})
+        result['academic_year'] = [academic_year_label(year) for year in result['year']]
+        if depth:
+            level = self.levels[depth - 1]
+            member_codes = rollup[level].to_numpy()
+            result[level] = self.labels[level][member_codes]
+            if depth > 1:
+                parent_level = self.levels[depth - 2]
+                result[parent_level] = self.labels[parent_level][self.parents[level][member_codes]]
+        for column in [MEASURE, 'previous', 'delta', 'pct_change']:
+            result[column] = rollup[column].to_numpy()
+        return result
+
+    def years(self):
+        """
+        Years covered by the breakdown, in order
+        """
+        return np.unique(self.rollups[(0, False)]['year']).tolist()
+
+
+def yearly_series(df):
+    """
+    A one-row-per-year table with the year-over-year change of each measure
+    """
+    df = df.sort_values('year').reset_index(drop=True)
+    year = df['year'].to_numpy()
+    consecutive = np.r_[False, np.diff(year) == 1]
+    for column in [c for c in df.columns if c != 'year']:
+        values = df[column].to_numpy(dtype=np.float64)
+        df[f'{column}_delta'] = np.where(consecutive, values - np.roll(values, 1), np.nan)
+    df.insert(1, 'academic_year', [academic_year_label(y) for y in year])
+    return df
+
+
+def load_archive():
+    """
+    Read every archive table and precompute its roll-ups
+
+    Returns a TimeSeriesCube per hierarchical breakdown and a yearly frame
+    per one-row-per-year table.
+    """
+    cubes = {}
+    for name, spec in ARCHIVE_HIERARCHIES.items():
+        cubes[name] = TimeSeriesCube.from_frame(read_archive_table(name), spec['levels'], spec['dimensions'])
+    series = {name: yearly_series(read_archive_table(name)) for name in ARCHIVE_SERIES}
+    return cubes, series
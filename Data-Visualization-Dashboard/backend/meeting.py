@@ -0,0 +1,133 @@
+from array import array
+import datetime
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.registrar import WORKBOOK_TABLES
+
+# Bit of each weekday letter used by the registrar (R is Thursday, U Sunday)
+DAY_BITS = {'M': 1, 'T': 2, 'W': 4, 'R': 8, 'F': 16, 'S': 32, 'U': 64}
+
+# Sentinel for a missing start time while rows are streamed into int16 arrays
+NO_TIME = -1
+
+
+def encode_days(days):
+    """
+    Weekday bitmask of a day pattern such as 'MWF'
+    """
+    mask = 0
+    for letter in days or '':
+        try:
+            mask |= DAY_BITS[letter]
+        except KeyError:
+            raise ValueError(f"Unknown meeting day '{letter}' in '{days}'")
+    return mask
+
+
+def decode_days(mask):
+    """
+    Day pattern of a weekday bitmask
+    """
+    return ''.join(letter for letter, bit in DAY_BITS.items() if mask & bit)
+
+
+def encode_time(value):
+    """
+    Minutes since midnight of a cell holding a time or a fraction of a day
+    """
+    if value is None:
+        return NO_TIME
+    if isinstance(value, datetime.datetime):
+        value = value.time()
+    if isinstance(value, datetime.time):
+        return value.hour * 60 + value.minute + round(value.second / 60)
+    # Excel stores times as fractions of a day when the cell is not formatted
+    return round(float(value) * 24 * 60)
+
+
+def encode_minutes(value):
+    """
+    Whole minutes of a duration cell, whose floats carry rounding noise
+    """
+    return round(float(value)) if value is not None else 0
+
+
+def _stream_rows(file_path):
+    """
+    Yield the header and then every row of the workbook without loading it
+
+    A sheet holds at most 1,048,576 rows, so longer tables continue on
+    further sheets, each repeating the header; those repeats are skipped.
+    """
+    # openpyxl is only needed when the cached copy is stale, so it is imported
+    # here rather than on every start-up
+    from openpyxl import load_workbook
+
+    # openpyxl picks its reader from the file name, so hand it a file object;
+    # read-only mode parses the sheet XML lazily, one row at a time
+    with open(file_path, 'rb') as file:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        try:
+            for i, worksheet in enumerate(workbook.worksheets):
+                rows = worksheet.iter_rows(values_only=True)
+                if i:
+                    next(rows, None)
+                yield from rows
+        finally:
+            workbook.close()
+
+
+def read_meetings(file_path):
+    """
+    Stream the meeting workbook into a typed frame with integer time and day encodings
+
+    Rows go straight into compact typed arrays, so memory tracks the encoded
+    columns rather than the workbook.
+    """
+    rows = _stream_rows(file_path)
+    header = [str(name).strip() for name in next(rows)]
+    position = {name: header.index(name) for name in ('section_id', 'days', 'start', 'duration', 'room', 'building_code')}
+
+    section_ids = array('i')
+    day_masks = array('B')
+    starts = array('h')
+    durations = array('h')
+    rooms = []
+    buildings = []
+    padding = (None,) * len(header)
+    for row in rows:
+        # Sheets written without their dimensions come back with trailing empty cells cut off
+        if len(row) < len(header):
+            row = row + padding[len(row):]
+        if row[position['section_id']] is None:
+            continue
+        section_ids.append(int(row[position['section_id']]))
+        day_masks.append(encode_days(row[position['days']]))
+        starts.append(encode_time(row[position['start']]))
+        durations.append(encode_minutes(row[position['duration']]))
+        room = row[position['room']]
+        rooms.append(str(room) if room is not None else None)
+        buildings.append(row[position['building_code']])
+
+    start = np.frombuffer(starts, dtype=np.int16)
+    duration = np.frombuffer(durations, dtype=np.int16)
+    missing = start == NO_TIME
+    day_mask = np.frombuffer(day_masks, dtype=np.uint8)
+    patterns, pattern_codes = np.unique(day_mask, return_inverse=True)
+
+    df = pd.DataFrame({
+        'section_id': np.frombuffer(section_ids, dtype=np.int32),
+        'day_mask': day_mask,
+        'days': pd.Categorical.from_codes(pattern_codes, [decode_days(mask) for mask in patterns]),
+        'start_minute': pd.arrays.IntegerArray(start.copy(), missing),
+        'duration': duration.copy(),
+        'end_minute': pd.arrays.IntegerArray((start + duration).astype(np.int16), missing),
+        'room': pd.array(rooms, dtype='string'),
+        'building_code': pd.Categorical(buildings),
+    })
+    return df.astype(WORKBOOK_TABLES['meeting'])
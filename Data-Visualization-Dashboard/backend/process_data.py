@@ -1,121 +1,70 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+import argparse
+import sys
+import time
 
-def load_data():
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.registrar import REGISTRAR_TABLES
+from backend.cube import EnrollmentCube
+from backend.instrumentation import traced
+from backend.processed_store import PROCESSED_DIR, write_partitions
+from backend.seat_fill import CLASS_YEARS, fill_rates
+from backend.star_schema import build_enrollment_facts
+from backend.table_cache import load_tables
+
+# Tables the enrollment pipeline is built from
+DASHBOARD_TABLES = [
+    'course', 'section', 'instructor', 'department', 'instruction', 'student_cap', 'term', 'crosslist', 'meeting'
+]
+
+@traced(record=('rebuild_cache',))
+def load_data(rebuild_cache=False, tables=None, workers=None):
     """
     Load and combine all relevant data files
     """
-    data_dir = Path(__file__).parent.parent / 'data'
-    
-    # Try different encodings and delimiters
-    encodings = ['utf-8', 'latin1', 'iso-8859-1', 'cp1252']
-    delimiters = [',', '\t', ';', '|']
-    
-    # Load course data
-    course_data = None
-    for encoding in encodings:
-        for delimiter in delimiters:
-            try:
-                course_data = pd.read_csv(data_dir / 'course', encoding=encoding, delimiter=delimiter)
-                print(f"Successfully loaded course data with {encoding} encoding and '{delimiter}' delimiter")
-                break
-            except (UnicodeDecodeError, pd.errors.ParserError):
-                continue
-        if course_data is not None:
-            break
-    
-    if course_data is None:
-        raise ValueError("Could not load course data with any encoding or delimiter")
-    
-    # Load enrollment data
-    section_data = None
-    for encoding in encodings:
-        for delimiter in delimiters:
-            try:
-                section_data = pd.read_csv(data_dir / 'section', encoding=encoding, delimiter=delimiter)
-                print(f"Successfully loaded section data with {encoding} encoding and '{delimiter}' delimiter")
-                break
-            except (UnicodeDecodeError, pd.errors.ParserError):
-                continue
-        if section_data is not None:
-            break
-    
-    if section_data is None:
-        raise ValueError("Could not load section data with any encoding or delimiter")
-    
-    # Load instructor data
-    instructor_data = None
-    for encoding in encodings:
-        for delimiter in delimiters:
-            try:
-                instructor_data = pd.read_csv(data_dir / 'instructor', encoding=encoding, delimiter=delimiter)
-                print(f"Successfully loaded instructor data with {encoding} encoding and '{delimiter}' delimiter")
-                break
-            except (UnicodeDecodeError, pd.errors.ParserError):
-                continue
-        if instructor_data is not None:
-            break
-    
-    if instructor_data is None:
-        raise ValueError("Could not load instructor data with any encoding or delimiter")
-    
-    # Load department data
-    department_data = None
-    for encoding in encodings:
-        for delimiter in delimiters:
-            try:
-                department_data = pd.read_csv(data_dir / 'department', encoding=encoding, delimiter=delimiter)
-                print(f"Successfully loaded department data with {encoding} encoding and '{delimiter}' delimiter")
-                break
-            except (UnicodeDecodeError, pd.errors.ParserError):
-                continue
-        if department_data is not None:
-            break
-    
-    if department_data is None:
-        raise ValueError("Could not load department data with any encoding or delimiter")
-    
-    return {
-        'course': course_data,
-        'section': section_data,
-        'instructor': instructor_data,
-        'department': department_data
-    }
+    # Tables are read from the columnar cache; raw files are only parsed
+    # (once, with their sniffed dialect) when the cache is missing or stale.
+    # They are independent, so all of them load at once on a worker pool.
+    start = time.perf_counter()
+    data, timings = load_tables(tables or DASHBOARD_TABLES, rebuild=rebuild_cache, workers=workers)
+    elapsed = time.perf_counter() - start
+    
+    for table_name, df in data.items():
+        print(f"Successfully loaded {table_name} data ({len(df):,} rows) in {timings[table_name]:.3f}s")
+    print(f"Loaded {len(data)} tables in {elapsed:.3f}s (sum of per-table times {sum(timings.values()):.3f}s)")
+    
+    return data
 
+@traced()
 def process_enrollment_data(data):
     """
     Process and clean enrollment data
     """
-    # Merge relevant datasets
-    enrollment = data['section'].merge(
-        data['course'],
-        on='course_id',
-        how='left'
-    ).merge(
-        data['instructor'],
-        on='instructor_id',
-        how='left'
-    ).merge(
-        data['department'],
-        on='department_id',
-        how='left'
-    )
-    
-    # Calculate enrollment metrics
-    enrollment['enrollment_rate'] = enrollment['enrolled'] / enrollment['capacity']
-    
-    return enrollment
+    # Build the (section, instructor) fact table with categorical dimensions
+    return build_enrollment_facts(data)
 
-def generate_summary_statistics(enrollment_data):
+@traced()
+def generate_summary_statistics(enrollment_data, cube=None):
     """
     Generate summary statistics for the dashboard
     """
+    # Every statistic is a roll-up of the pre-aggregated cube
+    if cube is None:
+        cube = EnrollmentCube.from_facts(enrollment_data)
+    
+    totals = cube.totals()
     summary = {
-        'total_enrollments': enrollment_data['enrolled'].sum(),
-        'average_class_size': enrollment_data['enrolled'].mean(),
-        'department_enrollments': enrollment_data.groupby('department_name')['enrolled'].sum(),
-        'instructor_workload': enrollment_data.groupby('instructor_name')['enrolled'].sum()
+        'total_enrollments': totals['enrolled'],
+        'average_class_size': totals['enrolled'] / totals['sections'] if totals['sections'] else float('nan'),
+        'department_enrollments': cube.rollup('department_name').set_index('department_name')['enrolled'],
+        'instructor_workload': cube.rollup('instructor_name').set_index('instructor_name')['enrolled'],
+        'class_year_fill_rates': fill_rates(pd.DataFrame([totals]), CLASS_YEARS).iloc[0],
+        'department_class_year_fill': fill_rates(
+            cube.rollup('department_name').set_index('department_name'), CLASS_YEARS
+        )
     }
     
     return summary
@@ -124,8 +73,21 @@ def main():
     """
     Main function to process all data
     """
+    parser = argparse.ArgumentParser(description="Process registrar data for the dashboard")
+    parser.add_argument('--rebuild-cache', action='store_true',
+                        help="Re-parse the raw files and rewrite the columnar table cache")
+    parser.add_argument('--all-tables', action='store_true',
+                        help="Load every registrar table, not only those the dashboard uses")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of tables to load concurrently (default: CPUs + 4)")
+    args = parser.parse_args()
+    
     # Load data
-    data = load_data()
+    data = load_data(
+        rebuild_cache=args.rebuild_cache,
+        tables=REGISTRAR_TABLES if args.all_tables else None,
+        workers=args.workers
+    )
     
     # Process enrollment data
     enrollment_data = process_enrollment_data(data)
@@ -133,11 +95,11 @@ def main():
     # Generate summary statistics
     summary_stats = generate_summary_statistics(enrollment_data)
     
-    # Save processed data
-    output_dir = Path(__file__).parent.parent / 'data' / 'processed'
-    output_dir.mkdir(exist_ok=True)
-    
-    enrollment_data.to_csv(output_dir / 'processed_enrollment.csv', index=False)
+    # Save processed data, one Parquet file per term; only terms whose rows
+    # changed since the last run are rewritten
+    stats = write_partitions(enrollment_data, PROCESSED_DIR)
+    print(f"Wrote {len(stats['written'])} term partitions to {PROCESSED_DIR} "
+          f"({stats['unchanged']} unchanged, {len(stats['removed'])} removed)")
     
     print("Data processing completed successfully!")
 
@@ -0,0 +1,208 @@
+import json
+import os
+from pathlib import Path
+import shutil
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.delta_sync import changed_partitions
+from backend.registrar import DATA_DIR
+
+# Term-partitioned output of the enrollment pipeline
+PROCESSED_DIR = DATA_DIR / 'processed' / 'enrollment'
+
+# Bump whenever the on-disk layout changes so every partition is rewritten
+STORE_VERSION = 1
+
+# Column the output is partitioned on, one directory per value
+PARTITION_COLUMN = 'term_code'
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def partition_path(output_dir, term_code):
+    """
+    Parquet file of one term, in a Hive-style directory other tools can read
+    """
+    return Path(output_dir) / f'{PARTITION_COLUMN}={term_code}' / 'part-0.parquet'
+
+
+def load_manifest(output_dir=PROCESSED_DIR):
+    """
+    Manifest of a partitioned output, or None if there is none or it is unreadable
+    """
+    try:
+        with open(Path(output_dir) / MANIFEST_NAME, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == STORE_VERSION else None
+
+
+def _write_manifest(output_dir, manifest):
+    """
+    Replace the manifest atomically, so readers never see a partial one
+    """
+    path = Path(output_dir) / MANIFEST_NAME
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def column_types(df):
+    """
+    Column types of a frame in a JSON-friendly form
+
+    Categoricals keep their full category list and order, which a single
+    partition's Parquet dictionary does not carry.
+    """
+    types = {}
+    for column, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            types[column] = {
+                'categories': dtype.categories.tolist(),
+                'categories_dtype': str(dtype.categories.dtype),
+                'ordered': bool(dtype.ordered),
+            }
+        else:
+            types[column] = str(dtype)
+    return types
+
+
+def _pandas_dtype(spec):
+    """
+    pandas dtype of an entry written by column_types()
+    """
+    if isinstance(spec, dict):
+        categories = pd.Index(spec['categories'], dtype=spec['categories_dtype'])
+        return pd.CategoricalDtype(categories, ordered=spec['ordered'])
+    return spec
+
+
+def _schema(types):
+    """
+    Column names and types, ignoring category lists
+
+    A partition only has to be rewritten for a schema change when this
+    changes; new categories are applied from the manifest on read.
+    """
+    return [[column, 'category' if isinstance(spec, dict) else spec] for column, spec in types.items()]
+
+
+def partition_digests(df):
+    """
+    Order-independent digest and row count of every term
+
+    Row hashes are summed with uint64 wrap-around, as in backend/delta_sync.py,
+    so the digest only changes when a term's rows do.
+    """
+    row_hash = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    codes, terms = pd.factorize(df[PARTITION_COLUMN])
+    digest = np.zeros(len(terms), dtype=np.uint64)
+    np.add.at(digest, codes, row_hash)
+    return pd.DataFrame({
+        'partition_key': np.asarray(terms, dtype=np.int64),
+        'digest': digest.view(np.int64),
+        'rows': np.bincount(codes, minlength=len(terms)),
+    })
+
+
+def write_partitions(df, output_dir=PROCESSED_DIR):
+    """
+    Write a frame as one Parquet file per term, rewriting only the terms that changed
+
+    Each term's digest is compared with the manifest; unchanged terms are
+    left alone, terms no longer present are removed and the manifest is
+    replaced last. Returns the term codes written and removed, and the number
+    of partitions left untouched.
+    """
+    # Only the processing script writes Parquet, so the dashboard does not pay for the import
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    types = column_types(df)
+    digests = partition_digests(df)
+
+    manifest = load_manifest(output_dir)
+    if manifest is None or _schema(manifest['columns']) != _schema(types):
+        stored = pd.DataFrame({'partition_key': [], 'digest': [], 'rows': []}, dtype=np.int64)
+    else:
+        stored = pd.DataFrame(
+            [(int(term), p['digest'], p['rows']) for term, p in manifest['partitions'].items()],
+            columns=['partition_key', 'digest', 'rows']
+        ).astype(np.int64)
+    changed = set(changed_partitions(digests, stored))
+    present = set(digests['partition_key'].tolist())
+
+    written = sorted(changed & present)
+    if written:
+        # One pass splits the frame into its terms
+        rows_by_term = pd.Series(np.arange(len(df))).groupby(df[PARTITION_COLUMN].to_numpy()).indices
+        for term_code in written:
+            part = df.iloc[rows_by_term[term_code]]
+            path = partition_path(output_dir, term_code)
+            path.parent.mkdir(exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            pq.write_table(pa.Table.from_pandas(part, preserve_index=False), tmp_path)
+            os.replace(tmp_path, path)
+
+    removed = sorted(changed - present)
+    for term_code in removed:
+        shutil.rmtree(partition_path(output_dir, term_code).parent, ignore_errors=True)
+
+    # Term labels let readers prune by the names the dashboard filters on
+    labels = {}
+    if 'term' in df.columns:
+        labels = df.drop_duplicates(PARTITION_COLUMN).set_index(PARTITION_COLUMN)['term'].astype(object).to_dict()
+    _write_manifest(output_dir, {
+        'version': STORE_VERSION,
+        'partition_column': PARTITION_COLUMN,
+        'columns': types,
+        'partitions': {
+            str(row.partition_key): {
+                'file': str(partition_path(output_dir, row.partition_key).relative_to(output_dir)),
+                'term': labels.get(row.partition_key),
+                'rows': int(row.rows),
+                'digest': int(row.digest),
+            }
+            for row in digests.sort_values('partition_key').itertuples()
+        },
+    })
+    return {'written': written, 'removed': removed, 'unchanged': len(present) - len(written)}
+
+
+def read_partitions(output_dir=PROCESSED_DIR, term_codes=None, terms=None, columns=None):
+    """
+    Read the partitioned output, opening only the files of the requested terms
+
+    Terms can be selected by code or by label (e.g. 'Fall 2019'); with
+    neither, every term is read. Column types, including the full category
+    lists, are restored from the manifest.
+    """
+    # Parquet is only needed by consumers of the processed output
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    manifest = load_manifest(output_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No processed output in {output_dir}; run backend/process_data.py first")
+
+    partitions = manifest['partitions']
+    selected = [
+        term for term, p in partitions.items()
+        if (term_codes is None or int(term) in set(term_codes)) and (terms is None or p['term'] in set(terms))
+    ]
+    columns = list(columns) if columns is not None else list(manifest['columns'])
+    tables = [pq.read_table(Path(output_dir) / partitions[term]['file'], columns=columns) for term in selected]
+
+    dtypes = {column: _pandas_dtype(manifest['columns'][column]) for column in columns}
+    if not tables:
+        return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in dtypes.items()})
+    df = pa.concat_tables(tables).to_pandas()
+    return df.astype(dtypes)
@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from concurrent.futures import Future
+import re
+import threading
+import time
+
+# Table names referenced by a query
+_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+
+
+def normalize_sql(sql):
+    """
+    Collapse whitespace outside string literals so formatting does not split cache entries
+    """
+    parts = str(sql).split("'")
+    for i in range(0, len(parts), 2):
+        parts[i] = ' '.join(parts[i].split())
+    return "'".join(parts).strip()
+
+
+def referenced_tables(sql):
+    """
+    Lower-cased names of the tables a query reads from
+    """
+    return frozenset(name.lower() for name in _TABLE_PATTERN.findall(str(sql)))
+
+
+def _freeze(value):
+    """
+    Hashable form of a bound parameter value
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class QueryCache:
+    def __init__(self, maxsize=256, ttl=300):
+        """
+        LRU cache of query results with a time-to-live and per-table invalidation
+
+        Concurrent requests for the same key are coalesced: the first caller runs
+        the query and the others wait for its result.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def make_key(self, namespace, sql, params=None):
+        """
+        Cache key from a namespace (such as a database URL), normalized SQL and parameters
+        """
+        return (namespace, normalize_sql(sql), _freeze(params or {}))
+
+    def get_or_compute(self, key, compute, tables):
+        """
+        Cached value for key, computing and storing it on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires'] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry['value']
+            if entry is not None:
+                del self._entries[key]
+
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                self.misses += 1
+                future = Future()
+                self._pending[key] = future
+                generation = self._generation
+            else:
+                self.hits += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[key]
+            # A result computed across a reload may describe the old data, so it
+            # is handed to the waiting callers but not kept
+            if generation == self._generation:
+                self._entries[key] = {
+                    'value': value,
+                    'tables': tables,
+                    'expires': time.monotonic() + self.ttl,
+                }
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        future.set_result(value)
+        return value
+
+    def invalidate(self, namespace=None, table_name=None):
+        """
+        Drop entries of a namespace that read from a table (every entry if table_name is None)
+        """
+        table_name = table_name.lower() if table_name else None
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if (namespace is None or key[0] == namespace)
+                and (table_name is None or not entry['tables'] or table_name in entry['tables'])
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+            return len(stale)
+
+    def stats(self):
+        """
+        Hit/miss counters and current size
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
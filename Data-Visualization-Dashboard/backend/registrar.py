@@ -0,0 +1,197 @@
+import os
+from pathlib import Path
+
+# Data locations. Each can be overridden from the environment, e.g. to run
+# the pipeline against a synthetic extract (see benchmarks/) without
+# touching the real files or caches.
+
+# Working copies of the core tables used by the dashboard
+DATA_DIR = Path(os.getenv('DASHBOARD_DATA_DIR', Path(__file__).parent.parent / 'data'))
+
+# Full registrar extract shipped alongside the dashboard
+REGISTRAR_DIR = Path(os.getenv('REGISTRAR_DIR', Path(__file__).parent.parent.parent / 'hudsonu-registrar'))
+
+# Derived files: the columnar table cache and the dialect manifest
+CACHE_DIR = Path(os.getenv('DASHBOARD_CACHE_DIR', Path(__file__).parent.parent / 'data' / 'cache'))
+
+# Extra read_csv arguments for files that deviate from the usual layout
+READ_OPTIONS = {
+    # The first line holds column descriptions; the real header is on the second
+    'building': {'skiprows': 1},
+}
+
+# Explicit column types for every registrar table. Low-cardinality codes are
+# categoricals, free text is the pandas string type and counts use the
+# narrowest integer that fits.
+TABLE_DTYPES = {
+    'approval': {
+        'approval_code': 'string',
+        'description': 'string',
+    },
+    'building': {
+        'building_code': 'string',
+        'name': 'string',
+        'address': 'string',
+    },
+    'corequisite': {
+        'course_code': 'string',
+        'coreq_code': 'string',
+    },
+    'course': {
+        'course_code': 'string',
+        'title': 'string',
+        'description': 'string',
+        'dept_code': 'category',
+        'credits': 'int8',
+        'pre_reqs': 'string',
+        'core_area': 'category',
+        'inquiry_area': 'category',
+        'recommendation': 'string',
+    },
+    'course_emphasis': {
+        'emphasis_code': 'category',
+        'course_code': 'category',
+    },
+    'crosslist': {
+        'course_code': 'category',
+        'group': 'int32',
+    },
+    'delivery': {
+        'delivery_code': 'string',
+        'name': 'string',
+        'description': 'string',
+    },
+    'department': {
+        'dept_code': 'string',
+        'division': 'category',
+        'name': 'string',
+        'office_number': 'int16',
+        'building_code': 'category',
+        'chair_code': 'string',
+        'blurb': 'string',
+    },
+    'emphasis': {
+        'emphasis_code': 'string',
+        'name': 'string',
+        'has_major': 'bool',
+        'has_minor': 'bool',
+        'interdisciplinary': 'bool',
+        'dept_code': 'category',
+        'description': 'string',
+        'director_code': 'string',
+    },
+    'instruction': {
+        'instructor_code': 'category',
+        'section_id': 'int32',
+    },
+    'instructor': {
+        'instructor_code': 'string',
+        'first_name': 'string',
+        'last_name': 'string',
+        'dept_code': 'category',
+        'phone': 'string',
+        'email': 'string',
+        'office_number': 'Int16',
+        'building_code': 'category',
+        'status': 'category',
+        'terminal_degree': 'category',
+        'institution': 'category',
+    },
+    'restriction': {
+        'emphasis_code': 'category',
+        'course_code': 'category',
+        'standing_allowed': 'category',
+    },
+    'section': {
+        'section_id': 'int32',
+        'course_code': 'category',
+        'term_code': 'int32',
+        'crn': 'int32',
+        'sec_num': 'int16',
+        'status': 'category',
+        'delivery_code': 'category',
+        'cap': 'int16',
+        'approval_code': 'category',
+        'note': 'string',
+    },
+    'student_cap': {
+        'section_id': 'int32',
+        'category': 'category',
+        'cap': 'int16',
+        'enrolled': 'int16',
+    },
+    'term': {
+        'term_code': 'int32',
+        'year': 'int16',
+        'semester': 'category',
+        'begin': 'string',
+        'end': 'string',
+    },
+}
+
+# Primary keys (enforced with a unique index) and secondary indexes on the
+# join columns, created by the bulk loader once the rows are in. Tables whose
+# extract repeats a key (course_emphasis has duplicate rows, student_cap
+# repeats one (section_id, category) pair) get a plain index instead.
+TABLE_KEYS = {
+    'approval': {'primary_key': ['approval_code']},
+    'building': {'primary_key': ['building_code']},
+    'corequisite': {'indexes': [['course_code'], ['coreq_code']]},
+    'course': {'primary_key': ['course_code'], 'indexes': [['dept_code']]},
+    'course_emphasis': {'indexes': [['course_code'], ['emphasis_code']]},
+    'crosslist': {'primary_key': ['course_code', 'group'], 'indexes': [['group']]},
+    'delivery': {'primary_key': ['delivery_code']},
+    'department': {'primary_key': ['dept_code']},
+    'emphasis': {'primary_key': ['emphasis_code'], 'indexes': [['dept_code']]},
+    'instruction': {'primary_key': ['instructor_code', 'section_id'], 'indexes': [['section_id']]},
+    'instructor': {'primary_key': ['instructor_code'], 'indexes': [['dept_code']]},
+    'restriction': {'indexes': [['course_code'], ['emphasis_code']]},
+    'section': {'primary_key': ['section_id'], 'indexes': [['course_code'], ['term_code']]},
+    'student_cap': {'indexes': [['section_id', 'category']]},
+    'term': {'primary_key': ['term_code']},
+    'meeting': {'indexes': [['section_id'], ['building_code', 'room']]},
+    # Derived from section, crosslist, meeting, instruction and student_cap (see backend/crosslist.py)
+    'section_offering': {'primary_key': ['section_id'], 'indexes': [['offering_id']]},
+}
+
+# Natural keys compared by the incremental sync; other tables fall back to
+# their primary key, or to the whole row when they have none
+SYNC_KEYS = {
+    'section': ['section_id'],
+    'student_cap': ['section_id', 'category'],
+    'instruction': ['instructor_code', 'section_id'],
+}
+
+# Delimited text tables in the registrar extract
+DELIMITED_TABLES = list(TABLE_DTYPES)
+
+# Excel workbooks in the registrar extract, with the column types of their
+# converted form. Meeting times are minutes since midnight and meeting days
+# a weekday bitmask (see backend/meeting.py).
+WORKBOOK_TABLES = {
+    'meeting': {
+        'section_id': 'int32',
+        'day_mask': 'uint8',
+        'days': 'category',
+        'start_minute': 'Int16',
+        'duration': 'int16',
+        'end_minute': 'Int16',
+        'room': 'string',
+        'building_code': 'category',
+    },
+}
+
+# Every table in the registrar extract
+REGISTRAR_TABLES = DELIMITED_TABLES + list(WORKBOOK_TABLES)
+
+
+def find_table_file(table_name):
+    """
+    Locate the raw file for a table, preferring the dashboard's data directory
+    """
+    for directory in (DATA_DIR, REGISTRAR_DIR):
+        file_path = directory / table_name
+        if file_path.is_file():
+            return file_path
+
+    raise FileNotFoundError(f"No data file found for table '{table_name}'")
@@ -0,0 +1,201 @@
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.meeting import DAY_BITS
+from backend.star_schema import UNASSIGNED, label_terms
+
+# Weekday names in bitmask order
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+# Minutes in a day; also the stride between days when slots are laid out on one axis
+DAY_MINUTES = 24 * 60
+
+# Bookable teaching week used as the denominator of room utilization
+TEACHING_DAYS = 5
+TEACHING_HOURS = (8, 22)
+
+# Tables the schedule views are built from
+SCHEDULE_TABLES = ['meeting', 'section', 'term', 'instruction', 'instructor', 'building', 'crosslist']
+
+
+def meeting_slots(data):
+    """
+    One row per meeting and weekday, tagged with its term and room
+
+    Meetings without a start time cannot clash and are left out.
+    """
+    meeting = data['meeting']
+    meeting = meeting[meeting['start_minute'].notna() & (meeting['duration'] > 0)]
+
+    # Expand each day bitmask into one slot per set bit
+    masks = meeting['day_mask'].to_numpy()
+    bits = (masks[:, None] >> np.arange(len(DAY_BITS), dtype=np.uint8)) & 1
+    rows, days = np.nonzero(bits)
+
+    section = data['section'].set_index('section_id')
+    slots = pd.DataFrame({
+        'meeting_row': rows,
+        'section_id': meeting['section_id'].to_numpy()[rows],
+        'day': days.astype(np.int8),
+        'start_minute': meeting['start_minute'].to_numpy(dtype=np.int16)[rows],
+        'end_minute': meeting['end_minute'].to_numpy(dtype=np.int16)[rows],
+        'building_code': meeting['building_code'].to_numpy()[rows],
+        'room': meeting['room'].to_numpy()[rows],
+    })
+    slots['term_code'] = section['term_code'].reindex(slots['section_id']).to_numpy()
+    slots['term'] = label_terms(slots['term_code'], data['term'])
+    slots['course_code'] = section['course_code'].reindex(slots['section_id']).to_numpy()
+    slots['sec_num'] = section['sec_num'].reindex(slots['section_id']).to_numpy()
+    return slots
+
+
+def _overlaps(slots, group_columns):
+    """
+    Every pair of slots in the same group and day whose times overlap
+
+    Slots are sorted once by (group, day, start) on a single integer axis.
+    Because starts are sorted, the slots overlapping slot i that start at or
+    after it form the contiguous run from i + 1 up to the first start at or
+    beyond i's end, found by binary search. The cost is O(n log n) plus the
+    number of overlapping pairs reported.
+    """
+    group_codes = slots.groupby(group_columns, sort=False, observed=True, dropna=True).ngroup().to_numpy()
+    slots = slots[group_codes >= 0]
+    group_codes = group_codes[group_codes >= 0]
+
+    day_offset = (group_codes.astype(np.int64) * len(DAY_BITS) + slots['day'].to_numpy()) * DAY_MINUTES
+    starts = day_offset + slots['start_minute'].to_numpy()
+    ends = day_offset + np.minimum(slots['end_minute'].to_numpy(), DAY_MINUTES)
+
+    order = np.argsort(starts, kind='stable')
+    starts, ends = starts[order], ends[order]
+    stops = np.searchsorted(starts, ends, side='left')
+
+    counts = stops - np.arange(len(starts)) - 1
+    first = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    second = first + 1 + offsets
+
+    left = slots.iloc[order[first]].reset_index(drop=True)
+    right = slots.iloc[order[second]].reset_index(drop=True)
+    return left, right, np.minimum(ends[first], ends[second]) - starts[second]
+
+
+def _crosslisted(first_courses, second_courses, crosslist):
+    """
+    Whether each pair of courses belongs to a common crosslist group
+    """
+    pairs = pd.DataFrame({'pair': np.arange(len(first_courses)), 'first': first_courses, 'second': second_courses})
+    groups = crosslist[['course_code', 'group']].astype({'course_code': object})
+    shared = (
+        pairs.merge(groups.rename(columns={'course_code': 'first'}), on='first')
+        .merge(groups.rename(columns={'course_code': 'second'}), on=['second', 'group'])
+    )
+    return np.isin(pairs['pair'].to_numpy(), shared['pair'].to_numpy())
+
+
+def _conflict_frame(slots, group_columns, crosslist=None):
+    """
+    Overlapping slots of different sections, one row per clashing pair and weekday
+
+    Crosslisted courses are scheduled together on purpose; such pairs are
+    flagged so views can leave them out.
+    """
+    left, right, overlap = _overlaps(slots, group_columns)
+    # A section may list the same room twice (a lecture and a lab block)
+    different = left['section_id'].to_numpy() != right['section_id'].to_numpy()
+    left, right, overlap = left[different], right[different], overlap[different]
+
+    conflicts = left[['term'] + group_columns + ['day']].copy()
+    for side, frame in (('first', left), ('second', right)):
+        conflicts[f'{side}_section_id'] = frame['section_id'].to_numpy()
+        conflicts[f'{side}_course'] = frame['course_code'].astype(object).to_numpy()
+        conflicts[f'{side}_start'] = frame['start_minute'].to_numpy()
+        conflicts[f'{side}_end'] = frame['end_minute'].to_numpy()
+    conflicts['overlap_minutes'] = overlap
+    conflicts['crosslisted'] = (
+        _crosslisted(conflicts['first_course'], conflicts['second_course'], crosslist)
+        if crosslist is not None else False
+    )
+    conflicts['day'] = pd.Categorical.from_codes(conflicts['day'].to_numpy(), WEEKDAYS)
+    return conflicts.reset_index(drop=True)
+
+
+def room_conflicts(slots, crosslist=None):
+    """
+    Pairs of sections booked into the same room at overlapping times
+    """
+    slots = slots[slots['building_code'].notna() & slots['room'].notna()]
+    return _conflict_frame(slots, ['term_code', 'building_code', 'room'], crosslist)
+
+
+def instructor_conflicts(slots, instruction, instructor, crosslist=None):
+    """
+    Pairs of sections an instructor teaches at overlapping times
+    """
+    teaching = slots.merge(instruction[['section_id', 'instructor_code']], on='section_id')
+    conflicts = _conflict_frame(teaching, ['term_code', 'instructor_code'], crosslist)
+
+    names = instructor.set_index('instructor_code')
+    names = (names['first_name'] + ' ' + names['last_name']).reindex(conflicts['instructor_code'].astype(object))
+    conflicts.insert(3, 'instructor_name', names.fillna(UNASSIGNED).to_numpy())
+    return conflicts
+
+
+def _room_bookings(slots):
+    """
+    Slots held in a known room, each room and time counted once
+
+    Crosslisted listings taught together each carry the same slot; conflict
+    detection keeps them (and marks them crosslisted), but the room is only
+    booked once.
+    """
+    slots = slots[slots['building_code'].notna() & slots['room'].notna()]
+    return slots.drop_duplicates(['term_code', 'building_code', 'room', 'day', 'start_minute', 'end_minute'])
+
+
+def room_utilization(slots):
+    """
+    Booked minutes per room and term as a share of the teaching week
+    """
+    slots = _room_bookings(slots)
+    minutes = (slots['end_minute'].astype(np.int32) - slots['start_minute'].astype(np.int32)).rename('booked_minutes')
+    usage = minutes.groupby(
+        [slots['term'], slots['building_code'], slots['room']],
+        observed=True
+    ).sum().reset_index()
+    week_minutes = TEACHING_DAYS * (TEACHING_HOURS[1] - TEACHING_HOURS[0]) * 60
+    usage['utilization'] = usage['booked_minutes'] / week_minutes
+    return usage.sort_values('utilization', ascending=False, ignore_index=True)
+
+
+def occupancy_heatmap(slots):
+    """
+    Average share of rooms in use per weekday and hour
+
+    Each slot adds +1 at its start minute and -1 at its end on a per-day
+    minute axis; a cumulative sum gives the rooms in use at every minute.
+    """
+    slots = _room_bookings(slots)
+    rooms = slots.groupby(['building_code', 'room'], observed=True).ngroups
+    days = slots['day'].to_numpy(dtype=np.int64)
+    starts = days * (DAY_MINUTES + 1) + slots['start_minute'].to_numpy(dtype=np.int64)
+    ends = days * (DAY_MINUTES + 1) + np.minimum(slots['end_minute'].to_numpy(dtype=np.int64), DAY_MINUTES)
+
+    delta = np.zeros(len(DAY_BITS) * (DAY_MINUTES + 1), dtype=np.int32)
+    np.add.at(delta, starts, 1)
+    np.add.at(delta, ends, -1)
+    in_use = np.cumsum(delta).reshape(len(DAY_BITS), DAY_MINUTES + 1)[:, :DAY_MINUTES]
+
+    hourly = in_use.reshape(len(DAY_BITS), 24, 60).mean(axis=2) / max(rooms, 1)
+    hours = range(*TEACHING_HOURS)
+    return pd.DataFrame(
+        hourly[:, list(hours)],
+        index=pd.Index(WEEKDAYS, name='day'),
+        columns=pd.Index([f'{h:02d}:00' for h in hours], name='hour')
+    )
+
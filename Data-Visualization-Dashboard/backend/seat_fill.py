@@ -0,0 +1,85 @@
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.instrumentation import traced
+
+# Seat categories reported separately; every other student_cap category
+# reserves seats for particular majors or minors and is pooled as 'Restricted'
+CLASS_YEARS = ['Freshman', 'Sophomore', 'Junior', 'Senior']
+SEAT_GROUPS = CLASS_YEARS + ['General', 'Restricted']
+
+# Additive seat measures, capacity and enrolled per group
+SEAT_MEASURES = [f'{kind}_{group.lower()}' for group in SEAT_GROUPS for kind in ('cap', 'enrolled')]
+
+
+def seat_group_codes(categories):
+    """
+    Position in SEAT_GROUPS of every student_cap category
+    """
+    groups = {group: i for i, group in enumerate(SEAT_GROUPS[:-1])}
+    return np.array([groups.get(category, len(SEAT_GROUPS) - 1) for category in categories], dtype=np.int64)
+
+
+@traced()
+def seat_matrix(student_cap, section_ids):
+    """
+    Pivot student_cap into per-section capacity and enrolled matrices
+
+    Rows follow section_ids and columns follow SEAT_GROUPS. Each student_cap
+    row is placed by (section position, group) on one flat axis and summed
+    with a single bincount, so the cost is linear in the number of rows.
+    """
+    section_pos = pd.Index(section_ids).get_indexer(student_cap['section_id'])
+    category = pd.Categorical(student_cap['category'])
+    group = seat_group_codes(category.categories)[category.codes]
+
+    valid = (section_pos >= 0) & (category.codes >= 0)
+    flat = section_pos[valid] * len(SEAT_GROUPS) + group[valid]
+    shape = (len(section_ids), len(SEAT_GROUPS))
+
+    matrices = []
+    for column in ('cap', 'enrolled'):
+        sums = np.bincount(flat, weights=student_cap[column].to_numpy()[valid], minlength=shape[0] * shape[1])
+        matrices.append(sums.astype(np.int32).reshape(shape))
+    return matrices[0], matrices[1]
+
+
+def seat_columns(student_cap, section_ids):
+    """
+    Seat measures per section as columns named like SEAT_MEASURES
+    """
+    capacity, enrolled = seat_matrix(student_cap, section_ids)
+    columns = {}
+    for i, group in enumerate(SEAT_GROUPS):
+        columns[f'cap_{group.lower()}'] = capacity[:, i]
+        columns[f'enrolled_{group.lower()}'] = enrolled[:, i]
+    return pd.DataFrame(columns)
+
+
+def fill_rates(frame, groups=None):
+    """
+    Seat fill rate (enrolled / capacity) per seat group of aggregated rows
+
+    Works on any roll-up carrying the seat measures; rows without seats
+    reserved for a group get NaN rather than a division by zero.
+    """
+    result = {}
+    for group in groups or SEAT_GROUPS:
+        capacity = np.asarray(frame[f'cap_{group.lower()}'], dtype=np.float64)
+        enrolled = np.asarray(frame[f'enrolled_{group.lower()}'], dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            result[group] = np.where(capacity > 0, enrolled / capacity, np.nan)
+    return pd.DataFrame(result, index=frame.index)
+
+
+def class_year_fill(rollup, by):
+    """
+    Long-form fill rate per class year for each row of a roll-up, for plotting
+    """
+    rates = fill_rates(rollup, CLASS_YEARS)
+    rates[by] = rollup[by].to_numpy()
+    return rates.melt(id_vars=by, var_name='class_year', value_name='fill_rate').dropna(subset=['fill_rate'])
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+import pyarrow as pa
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.registrar import CACHE_DIR as CACHE_ROOT, find_table_file
+
+# Derived datasets shared by every session and process live here
+SHARED_DIR = CACHE_ROOT / 'shared'
+
+# Bump whenever the on-disk layout changes so old datasets are rebuilt
+SHARED_VERSION = 1
+
+# Code the datasets are derived from; editing any of it changes the version
+BACKEND_DIR = Path(__file__).parent
+
+
+def dataset_version(tables):
+    """
+    Short stamp of the source tables and backend code a dataset is built from
+
+    Only file sizes and modification times are read, so it is cheap enough to
+    check on every rerun and notice when the extract has been refreshed.
+    """
+    sources = [find_table_file(table_name) for table_name in tables] + sorted(BACKEND_DIR.glob('*.py'))
+    stamp = [SHARED_VERSION]
+    for path in sources:
+        stat = os.stat(path)
+        stamp.append([str(Path(path).resolve()), stat.st_size, stat.st_mtime_ns])
+    return hashlib.sha1(json.dumps(stamp).encode('utf-8')).hexdigest()[:12]
+
+
+def dataset_path(name, version):
+    """
+    Path of the Arrow file holding one version of a dataset
+    """
+    return SHARED_DIR / f'{name}-{version}.arrow'
+
+
+def _write_dataset(path, df):
+    """
+    Write a frame as an uncompressed Arrow IPC file, atomically
+    """
+    SHARED_DIR.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df)
+    # Several server processes may build the same version at once; each
+    # writes its own temporary file and the last rename wins
+    tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+    with pa.OSFile(str(tmp_path), 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def _remove_stale(name, version):
+    """
+    Delete older versions of a dataset
+
+    Processes still mapping an old file keep their view of it until they
+    reload; where the platform refuses to delete a mapped file it is left for
+    the next refresh.
+    """
+    for path in SHARED_DIR.glob(f'{name}-*.arrow'):
+        if path != dataset_path(name, version):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+class SharedDataset:
+    """
+    A read-only frame built once, stored as Arrow and memory-mapped by every reader
+
+    The first process to ask for a version builds the frame and writes it;
+    every other process maps the same file, so the pages are shared through
+    the OS page cache. Numeric columns without missing values and
+    categorical codes are views onto the mapping rather than copies (booleans
+    and columns with nulls are converted once per process), and are
+    read-only: derive new frames from it instead of assigning into it.
+    """
+
+    def __init__(self, name, version, build):
+        self.name = name
+        self.version = version
+        self.path = dataset_path(name, version)
+
+        if not self.path.exists():
+            _write_dataset(self.path, build())
+            _remove_stale(name, version)
+
+        # The mapping stays alive for as long as any column references it
+        self.table = pa.ipc.open_file(pa.memory_map(str(self.path), 'r')).read_all()
+        # One block per column, so no column is copied into a consolidated block
+        self.frame = self.table.to_pandas(split_blocks=True)
+
+    @property
+    def nbytes(self):
+        """
+        Size of the mapped Arrow buffers
+        """
+        return self.table.nbytes
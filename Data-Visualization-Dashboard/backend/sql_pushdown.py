@@ -0,0 +1,335 @@
+from pathlib import Path
+import sys
+from sqlalchemy import bindparam, text
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.crosslist import OFFERING_TABLE
+from backend.seat_fill import SEAT_GROUPS, SEAT_MEASURES
+from backend.star_schema import UNASSIGNED
+
+# SQL expression for every dimension the dashboard groups or filters on, and
+# the joins it needs beyond the section table
+DIMENSIONS = {
+    'term': ("t.semester || ' ' || t.year", ['term']),
+    'term_code': ('s.term_code', []),
+    'department_name': (f"COALESCE(d.name, '{UNASSIGNED}')", ['course', 'department']),
+    'course_code': ('s.course_code', []),
+    'instructor_name': (f"COALESCE(ins.first_name || ' ' || ins.last_name, '{UNASSIGNED}')", ['instruction', 'instructor']),
+    'delivery_code': ('s.delivery_code', []),
+    'status': ('s.status', []),
+}
+
+# Display labels selected beside a dimension, matching the cube's LABELS:
+# course titles repeat across codes, so they only label the code
+LABELS = {
+    'course_code': ('course_label', f"s.course_code || COALESCE(' – ' || c.title, '')", ['course']),
+}
+
+# Additive measures, matching the in-memory cube
+MEASURES = {
+    'enrolled': ('SUM(COALESCE(e.enrolled, 0))', ['enrollment']),
+    # Crosslisted listings are credited with their share of the offering's
+    # seats and count, and their seat group caps scaled to match
+    'capacity': ('SUM(COALESCE(o.offering_capacity * o.listing_share, 0))', ['offering']),
+    'sections': ('SUM(COALESCE(o.listing_share, 0))', ['offering']),
+}
+MEASURES.update({name: (f'SUM(COALESCE(e.{name}, 0))', ['enrollment']) for name in SEAT_MEASURES})
+MEASURES.update({
+    f'cap_{group.lower()}': (f'SUM(COALESCE(e.cap_{group.lower()} * o.seat_share, 0))', ['enrollment', 'offering'])
+    for group in SEAT_GROUPS
+})
+
+
+def _seat_group_condition(group):
+    """
+    SQL condition selecting the student_cap rows of a seat group
+    """
+    if group == SEAT_GROUPS[-1]:
+        named = ', '.join(f"'{g}'" for g in SEAT_GROUPS[:-1])
+        return f'category NOT IN ({named})'
+    return f"category = '{group}'"
+
+
+# Seats per section, in total and pivoted by seat group in one pass over student_cap
+_SEAT_COLUMNS = ', '.join(
+    f'SUM(CASE WHEN {_seat_group_condition(group)} THEN {kind} ELSE 0 END) AS {kind}_{group.lower()}'
+    for group in SEAT_GROUPS for kind in ('cap', 'enrolled')
+)
+
+# Columns of the paginated detail table and the joins each needs. Like the
+# in-memory DetailTable it lists one row per (section, instructor), so both
+# backends show the same rows and columns and search the same text
+DETAIL_COLUMNS = {
+    'section_id': ('s.section_id', []),
+    'term': DIMENSIONS['term'],
+    'course_code': ('s.course_code', []),
+    'course_name': ('c.title', ['course']),
+    'department_name': DIMENSIONS['department_name'],
+    'instructor_name': DIMENSIONS['instructor_name'],
+    'status': DIMENSIONS['status'],
+    'delivery_code': DIMENSIONS['delivery_code'],
+    'capacity': ('s.cap', []),
+    'enrolled': ('COALESCE(e.enrolled, 0)', ['enrollment']),
+    'enrollment_rate': ('CASE WHEN s.cap > 0 THEN COALESCE(e.enrolled, 0) * 1.0 / s.cap END', ['enrollment']),
+}
+
+# Detail columns sorted by something other than their value: terms
+# chronologically, like the in-memory table's ordered term categorical
+DETAIL_SORT_KEYS = {'term': 's.term_code'}
+
+# Text columns the detail table's search box matches
+DETAIL_SEARCH_COLUMNS = ['course_code', 'course_name', 'department_name', 'instructor_name']
+
+# Joins in dependency order
+JOINS = {
+    'term': 'LEFT JOIN term t ON t.term_code = s.term_code',
+    'course': 'LEFT JOIN course c ON c.course_code = s.course_code',
+    'department': 'LEFT JOIN department d ON d.dept_code = c.dept_code',
+    'instruction': 'LEFT JOIN instruction i ON i.section_id = s.section_id',
+    'offering': f'LEFT JOIN {OFFERING_TABLE} o ON o.section_id = s.section_id',
+    'instructor': 'LEFT JOIN instructor ins ON ins.instructor_code = i.instructor_code',
+    'enrollment': (
+        f'LEFT JOIN (SELECT section_id, SUM(enrolled) AS enrolled, {_SEAT_COLUMNS} FROM student_cap GROUP BY section_id) e '
+        'ON e.section_id = s.section_id'
+    ),
+}
+
+# Compiled statements, keyed by query shape so each is built only once
+_STATEMENTS = {}
+
+
+def _joins(needed):
+    """
+    FROM clause with only the joins a query needs
+    """
+    return '\n'.join(['FROM section s'] + [sql for name, sql in JOINS.items() if name in needed])
+
+
+def _where(filter_dimensions):
+    """
+    WHERE clause with one expanding IN parameter per filtered dimension
+    """
+    if not filter_dimensions:
+        return ''
+    clauses = [f'{DIMENSIONS[d][0]} IN :filter_{d}' for d in filter_dimensions]
+    return 'WHERE ' + ' AND '.join(clauses)
+
+
+def _filter_params(filters):
+    """
+    Canonical filter dimensions and their bound values, skipping unset filters
+    """
+    filters = {d: list(v) for d, v in (filters or {}).items() if v is not None}
+    unknown = set(filters) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown filter dimensions: {sorted(unknown)}")
+    dimensions = tuple(sorted(filters))
+    return dimensions, {f'filter_{d}': filters[d] for d in dimensions}
+
+
+def _statement(key, sql, filter_dimensions):
+    """
+    Cached text() statement for a query shape
+    """
+    statement = _STATEMENTS.get(key)
+    if statement is None:
+        statement = text(sql).bindparams(*[bindparam(f'filter_{d}', expanding=True) for d in filter_dimensions])
+        _STATEMENTS[key] = statement
+    return statement
+
+
+def aggregate_query(by, measures, filters=None):
+    """
+    Parameterized GROUP BY statement and bound values for a roll-up
+    """
+    by = tuple([by] if isinstance(by, str) else by)
+    measures = tuple(measures)
+    filter_dimensions, params = _filter_params(filters)
+
+    key = ('aggregate', by, measures, filter_dimensions)
+    sql = None
+    if key not in _STATEMENTS:
+        needed = set()
+        for name in by + filter_dimensions:
+            needed.update(DIMENSIONS[name][1])
+        for name in measures:
+            needed.update(MEASURES[name][1])
+        labels = [LABELS[d] for d in by if d in LABELS]
+        for _, _, joins in labels:
+            needed.update(joins)
+
+        select = (
+            [f'{DIMENSIONS[d][0]} AS {d}' for d in by]
+            + [f'MIN({expression}) AS {label}' for label, expression, _ in labels]
+            + [f'{MEASURES[m][0]} AS {m}' for m in measures]
+        )
+        sql = f"SELECT {', '.join(select)}\n{_joins(needed)}\n{_where(filter_dimensions)}"
+        if by:
+            sql += f"\nGROUP BY {', '.join(DIMENSIONS[d][0] for d in by)}"
+            # Terms sort chronologically, everything else alphabetically
+            order = ['MIN(s.term_code)' if d == 'term' else DIMENSIONS[d][0] for d in by]
+            sql += f"\nORDER BY {', '.join(order)}"
+
+    return _statement(key, sql, filter_dimensions), params
+
+
+def values_query(dimension):
+    """
+    Statement listing the distinct members of a dimension
+    """
+    key = ('values', dimension)
+    sql = None
+    if key not in _STATEMENTS:
+        expression, needed = DIMENSIONS[dimension]
+        order = 'MIN(s.term_code)' if dimension == 'term' else expression
+        sql = f"SELECT {expression} AS {dimension}\n{_joins(set(needed))}\nGROUP BY {expression}\nORDER BY {order}"
+    return _statement(key, sql, ())
+
+
+def section_rows_query(filters=None, limit=None):
+    """
+    Statement for section-level rows (one per section) within a filtered slice
+    """
+    filter_dimensions, params = _filter_params(filters)
+    key = ('sections', filter_dimensions, limit is not None)
+    sql = None
+    if key not in _STATEMENTS:
+        needed = {'term', 'course', 'department', 'enrollment'}
+        for name in filter_dimensions:
+            needed.update(DIMENSIONS[name][1])
+        columns = ['s.section_id', 's.term_code'] + [
+            f'{DETAIL_COLUMNS[d][0]} AS {d}' for d in ('term', 'course_name', 'department_name', 'status', 'delivery_code')
+        ] + ['s.cap AS capacity', 'COALESCE(e.enrolled, 0) AS enrolled']
+        # Instructor filters can repeat a section once per co-instructor
+        distinct = 'DISTINCT ' if 'instructor_name' in filter_dimensions else ''
+        sql = f"SELECT {distinct}{', '.join(columns)}\n{_joins(needed)}\n{_where(filter_dimensions)}\nORDER BY s.section_id"
+        if limit is not None:
+            sql += '\nLIMIT :limit'
+    if limit is not None:
+        params['limit'] = limit
+    return _statement(key, sql, filter_dimensions), params
+
+
+def rate_histogram_query(filters=None, bins=30):
+    """
+    Statement binning per-section enrollment rates into equal-width bins in the database
+    """
+    filter_dimensions, params = _filter_params(filters)
+    key = ('rate_histogram', filter_dimensions)
+    sql = None
+    if key not in _STATEMENTS:
+        needed = {'enrollment'}
+        for name in filter_dimensions:
+            needed.update(DIMENSIONS[name][1])
+        where = _where(filter_dimensions)
+        where = f"{where} AND s.cap > 0" if where else 'WHERE s.cap > 0'
+        sql = f"""WITH rates AS (
+    SELECT DISTINCT s.section_id, COALESCE(e.enrolled, 0) * 1.0 / s.cap AS rate
+    {_joins(needed)}
+    {where}
+), bounds AS (
+    SELECT MIN(rate) AS low, MAX(rate) AS high FROM rates
+), binned AS (
+    SELECT CAST((rate - low) * :bins / NULLIF(high - low, 0) AS INTEGER) AS bin, low, high FROM rates, bounds
+)
+SELECT CASE WHEN bin IS NULL THEN 0 WHEN bin >= :bins THEN :bins - 1 ELSE bin END AS bin,
+       COUNT(*) AS sections, MIN(low) AS low, MAX(high) AS high
+FROM binned
+GROUP BY 1
+ORDER BY 1"""
+    params['bins'] = bins
+    return _statement(key, sql, filter_dimensions), params
+
+
+def _detail_where(filter_dimensions, search):
+    """
+    WHERE clause of the detail table: the filters plus an optional search over its text columns
+    """
+    where = _where(filter_dimensions)
+    if not search:
+        return where
+    matches = ' OR '.join(
+        f"LOWER({DETAIL_COLUMNS[c][0]}) LIKE :search ESCAPE '\\'" for c in DETAIL_SEARCH_COLUMNS
+    )
+    return f"{where} AND ({matches})" if where else f"WHERE ({matches})"
+
+
+def _detail_params(filters, search):
+    """
+    Filter dimensions and parameters of a detail query, with the search text as a LIKE pattern
+    """
+    filter_dimensions, params = _filter_params(filters)
+    if search:
+        escaped = search.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        params['search'] = f'%{escaped}%'
+    return filter_dimensions, params
+
+
+def _detail_joins(filter_dimensions, columns, search):
+    """
+    FROM clause with the joins the filters, columns and search need
+
+    The instruction join is always made: it sets the (section, instructor) grain.
+    """
+    needed = {'instruction'}
+    for name in filter_dimensions:
+        needed.update(DIMENSIONS[name][1])
+    for name in columns:
+        needed.update(DETAIL_COLUMNS[name][1])
+    if search:
+        for name in DETAIL_SEARCH_COLUMNS:
+            needed.update(DETAIL_COLUMNS[name][1])
+    return _joins(needed)
+
+
+def detail_rows_query(filters=None, columns=None, sort_by=None, ascending=True, search=None, limit=None, offset=0):
+    """
+    Statement for one page of the detail table, sorted and searched in the database
+
+    Only the requested columns are selected, plus section_id and the sort
+    column; callers drop the extras. Rows tie on section and instructor code,
+    which keeps pages stable.
+    """
+    columns = list(columns or DETAIL_COLUMNS)
+    unknown = set(columns + ([sort_by] if sort_by else [])) - set(DETAIL_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown detail columns: {sorted(unknown)}")
+    selected = list(dict.fromkeys(['section_id'] + columns + ([sort_by] if sort_by else [])))
+
+    filter_dimensions, params = _detail_params(filters, search)
+    key = ('detail', filter_dimensions, tuple(selected), sort_by, ascending, bool(search), limit is not None)
+    sql = None
+    if key not in _STATEMENTS:
+        order = 's.section_id, i.instructor_code'
+        if sort_by:
+            sort_key = DETAIL_SORT_KEYS.get(sort_by, DETAIL_COLUMNS[sort_by][0])
+            order = f"{sort_key} {'ASC' if ascending else 'DESC'}, {order}"
+        sql = (
+            f"SELECT {', '.join(f'{DETAIL_COLUMNS[c][0]} AS {c}' for c in selected)}\n"
+            f"{_detail_joins(filter_dimensions, selected, search)}\n"
+            f"{_detail_where(filter_dimensions, search)}\n"
+            f"ORDER BY {order}"
+        )
+        if limit is not None:
+            sql += '\nLIMIT :limit OFFSET :offset'
+    if limit is not None:
+        params['limit'] = limit
+        params['offset'] = offset
+    return _statement(key, sql, filter_dimensions), params
+
+
+def detail_count_query(filters=None, search=None):
+    """
+    Statement counting the (section, instructor) rows the detail table would list
+    """
+    filter_dimensions, params = _detail_params(filters, search)
+    key = ('detail_count', filter_dimensions, bool(search))
+    sql = None
+    if key not in _STATEMENTS:
+        sql = (
+            f"SELECT COUNT(*) AS row_count\n"
+            f"{_detail_joins(filter_dimensions, [], search)}\n"
+            f"{_detail_where(filter_dimensions, search)}"
+        )
+    return _statement(key, sql, filter_dimensions), params
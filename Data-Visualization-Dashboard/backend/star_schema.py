@@ -0,0 +1,189 @@
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.crosslist import section_offerings
+from backend.instrumentation import traced
+from backend.seat_fill import SEAT_GROUPS, seat_matrix
+
+# Label used when a section has no department or no instructor on record
+UNASSIGNED = 'Unassigned'
+
+
+def _lookup(keys, dimension_keys):
+    """
+    Row positions of keys in a dimension table, -1 where a key is missing
+    """
+    index = pd.Index(dimension_keys)
+    if isinstance(keys.dtype, pd.CategoricalDtype):
+        # Resolve each distinct category once, then broadcast through the codes;
+        # the trailing -1 keeps missing keys missing
+        category_positions = np.append(index.get_indexer(keys.cat.categories.astype(index.dtype)), -1)
+        return category_positions[keys.cat.codes.to_numpy()]
+    return index.get_indexer(keys)
+
+
+def _take_categorical(values, positions, fill_value=None):
+    """
+    Gather dimension values by row position as a categorical, -1 giving NA or fill_value
+    """
+    categorical = pd.Categorical(values)
+    categories = categorical.categories
+    codes = categorical.codes
+    if fill_value is not None:
+        if fill_value not in categories:
+            categories = categories.append(pd.Index([fill_value]))
+        fill_code = categories.get_loc(fill_value)
+        codes = np.where(codes == -1, fill_code, codes)
+    else:
+        fill_code = -1
+
+    # Appending the fill code means position -1 maps onto it
+    codes = np.append(codes, fill_code)[positions]
+    return pd.Categorical.from_codes(codes, categories)
+
+
+def _course_labels(course_codes, course):
+    """
+    Display label 'CODE – Title' of every course code, as a categorical aligned to course_codes
+
+    Titles repeat across unrelated courses, so the code stays the key and the
+    title only labels it; a code missing from the catalog is labelled by itself.
+    """
+    codes = pd.Categorical(course_codes)
+    title_pos = _lookup(pd.Series(codes.categories), course['course_code'])
+    titles = np.append(course['title'].astype(object).to_numpy(), None)[title_pos]
+    labels = [code if pd.isna(title) else f'{code} – {title}' for code, title in zip(codes.categories, titles)]
+    return pd.Categorical.from_codes(codes.codes, labels)
+
+
+def _term_dimension(term):
+    """
+    Term labels such as 'Fall 2022', ordered chronologically by term_code
+    """
+    term = term.sort_values('term_code')
+    labels = [f'{semester} {year}' for semester, year in zip(term['semester'], term['year'])]
+    return term['term_code'].to_numpy(), pd.CategoricalDtype(labels, ordered=True)
+
+
+def label_terms(term_codes, term):
+    """
+    Chronologically ordered term labels for an array of term codes
+    """
+    codes, dtype = _term_dimension(term)
+    return pd.Categorical.from_codes(_lookup(term_codes, codes), dtype=dtype)
+
+
+def _teaching_bridge(section_ids, instruction):
+    """
+    Expand sections into one row per (section, instructor) through the instruction table
+
+    Returns the section position and the instruction row of every output row (-1
+    for sections with no instructor on record) plus the instructor count per section.
+    """
+    section_pos = _lookup(instruction['section_id'], section_ids)
+    instruction_rows = np.flatnonzero(section_pos >= 0)
+    section_pos = section_pos[instruction_rows]
+
+    # Group instruction rows by section, keeping file order within a section
+    order = np.argsort(section_pos, kind='stable')
+    counts = np.bincount(section_pos, minlength=len(section_ids))
+    repeats = np.maximum(counts, 1)
+
+    fact_section_pos = np.repeat(np.arange(len(section_ids)), repeats)
+    fact_instruction_row = np.full(len(fact_section_pos), -1)
+    fact_instruction_row[np.repeat(counts > 0, repeats)] = instruction_rows[order]
+
+    return fact_section_pos, fact_instruction_row, counts
+
+
+@traced()
+def build_enrollment_facts(data):
+    """
+    Build the enrollment fact table with index-aligned dimension lookups
+
+    The grain is one row per (section, instructor): team-taught sections appear
+    once per instructor. Section-level measures (capacity, enrolled and the
+    per seat group cap_*/enrolled_* columns) repeat on each of those rows,
+    and is_section_row marks exactly one row per section so totals can be
+    taken without double counting. Crosslisted sections taught together
+    share an offering_id, and each listing carries its share of the
+    offering's seats (offering_capacity) as listing_share and seat_share
+    (see backend/crosslist.py).
+    """
+    section = data['section']
+    course = data['course']
+    department = data['department']
+    instructor = data['instructor']
+    instruction = data['instruction']
+
+    # Section -> course -> department positions
+    course_pos = _lookup(section['course_code'], course['course_code'])
+    dept_pos = np.append(_lookup(course['dept_code'], department['dept_code']), -1)[course_pos]
+
+    # Seats reserved and taken per section and seat group (class years,
+    # general, restricted), aligned to the section rows; enrolled is their sum
+    seat_capacity, seat_enrolled = seat_matrix(data['student_cap'], section['section_id'])
+    enrolled = seat_enrolled.sum(axis=1)
+
+    # Crosslisted listings of one physical offering, so seats and sections
+    # are counted once however many course codes the offering carries
+    offerings = section_offerings(section, data['crosslist'], data['meeting'], instruction, data['student_cap'])
+
+    # Expand to the (section, instructor) grain
+    rows, instruction_row, instructor_count = _teaching_bridge(section['section_id'], instruction)
+    instructor_pos = np.append(_lookup(instruction['instructor_code'], instructor['instructor_code']), -1)[instruction_row]
+    instructor_names = instructor['first_name'].astype(str) + ' ' + instructor['last_name'].astype(str)
+
+    term_codes, term_dtype = _term_dimension(data['term'])
+    term_pos = _lookup(section['term_code'], term_codes)[rows]
+    term = pd.Categorical.from_codes(
+        np.append(np.arange(len(term_codes)), -1)[term_pos],
+        dtype=term_dtype
+    )
+
+    capacity = section['cap'].to_numpy()[rows]
+    facts = pd.DataFrame({
+        'section_id': section['section_id'].to_numpy()[rows],
+        'term_code': section['term_code'].to_numpy()[rows],
+        'term': term,
+        'course_code': _take_categorical(section['course_code'], rows),
+        'course_name': _take_categorical(course['title'], course_pos[rows]),
+        'course_label': _take_categorical(_course_labels(section['course_code'], course), rows),
+        'dept_code': _take_categorical(department['dept_code'], dept_pos[rows]),
+        'department_name': _take_categorical(department['name'], dept_pos[rows], UNASSIGNED),
+        'instructor_code': _take_categorical(instruction['instructor_code'], instruction_row),
+        'instructor_name': _take_categorical(instructor_names, instructor_pos, UNASSIGNED),
+        'status': _take_categorical(section['status'], rows),
+        'delivery_code': _take_categorical(section['delivery_code'], rows),
+        'sec_num': section['sec_num'].to_numpy()[rows],
+        'capacity': capacity,
+        'enrolled': enrolled[rows],
+        'instructor_count': instructor_count[rows].astype(np.int8),
+        'is_section_row': np.diff(rows, prepend=-1) != 0,
+        'offering_id': offerings['offering_id'].to_numpy()[rows],
+        'offering_capacity': offerings['offering_capacity'].to_numpy()[rows],
+        'listing_share': offerings['listing_share'].to_numpy()[rows],
+        'seat_share': offerings['seat_share'].to_numpy()[rows],
+    })
+
+    for i, group in enumerate(SEAT_GROUPS):
+        facts[f'cap_{group.lower()}'] = seat_capacity[rows, i]
+        facts[f'enrolled_{group.lower()}'] = seat_enrolled[rows, i]
+
+    # Calculate enrollment metrics
+    with np.errstate(divide='ignore', invalid='ignore'):
+        facts['enrollment_rate'] = np.where(capacity > 0, facts['enrolled'] / capacity, np.nan)
+
+    return facts
+
+
+@traced()
+def section_rows(facts):
+    """
+    One row per section, for section-level measures that must not be double counted
+    """
+    return facts[facts['is_section_row']]
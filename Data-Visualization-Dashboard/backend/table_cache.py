@@ -0,0 +1,172 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+import time
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.dialect import read_table
+from backend.instrumentation import carry_context, traced
+from backend.meeting import read_meetings
+from backend.registrar import CACHE_DIR as CACHE_ROOT, READ_OPTIONS, REGISTRAR_TABLES, TABLE_DTYPES, WORKBOOK_TABLES, find_table_file
+
+# Columnar copies of the raw tables live here
+CACHE_DIR = CACHE_ROOT / 'tables'
+
+# Bump whenever the on-disk layout changes so old caches are rebuilt
+CACHE_VERSION = 1
+
+# Converters for tables that are not delimited text
+WORKBOOK_READERS = {
+    'meeting': read_meetings,
+}
+
+# Schema metadata key holding the source signature of a cached table
+METADATA_KEY = b'dashboard_cache'
+
+
+def _source_signature(file_path, table_name):
+    """
+    Describe the source file and parse settings a cached table was built from
+    """
+    stat = os.stat(file_path)
+    return {
+        'version': CACHE_VERSION,
+        'source': str(Path(file_path).resolve()),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'dtypes': TABLE_DTYPES.get(table_name) or WORKBOOK_TABLES.get(table_name, {}),
+        'read_options': READ_OPTIONS.get(table_name, {}),
+    }
+
+
+def cache_path(table_name, file_path):
+    """
+    Path of the columnar cache file for a table read from a given source file
+
+    The name carries a digest of the resolved source path, so the same table
+    read from two extracts (e.g. data/ and the registrar directory) gets two
+    cache files instead of overwriting one another's.
+    """
+    source_digest = hashlib.sha1(str(Path(file_path).resolve()).encode('utf-8')).hexdigest()[:12]
+    return CACHE_DIR / f'{table_name}-{source_digest}.feather'
+
+
+def _read_cached(table_name, file_path, signature):
+    """
+    Memory-map a cached table, returning None if it is missing or stale
+    """
+    path = cache_path(table_name, file_path)
+    if not path.exists():
+        return None
+
+    try:
+        # The mapping stays alive for as long as any buffer references it
+        reader = pa.ipc.open_file(pa.memory_map(str(path), 'r'))
+        metadata = reader.schema.metadata or {}
+        if json.loads(metadata.get(METADATA_KEY, b'null')) != signature:
+            return None
+        return reader.read_all().to_pandas()
+    except (OSError, pa.ArrowInvalid, ValueError):
+        return None
+
+
+def _write_cached(table_name, file_path, df, signature):
+    """
+    Write a table to an uncompressed Feather file so it can be memory-mapped
+    """
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps(signature).encode('utf-8')
+    table = table.replace_schema_metadata(metadata)
+
+    path = cache_path(table_name, file_path)
+    tmp_path = path.with_suffix('.tmp')
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+@traced(record=('table_name', 'rebuild'))
+def load_table(file_path, table_name=None, rebuild=False):
+    """
+    Load a raw table through the columnar cache, rebuilding it when the source changes
+    """
+    table_name = table_name or Path(file_path).name
+    signature = _source_signature(file_path, table_name)
+
+    if not rebuild:
+        df = _read_cached(table_name, file_path, signature)
+        if df is not None:
+            return df
+
+    if table_name in WORKBOOK_READERS:
+        # Workbooks are converted once; later loads only map the sidecar
+        df = WORKBOOK_READERS[table_name](file_path)
+    else:
+        df = read_table(
+            file_path,
+            dtype=TABLE_DTYPES.get(table_name),
+            **READ_OPTIONS.get(table_name, {})
+        )
+    try:
+        _write_cached(table_name, file_path, df, signature)
+    except (OSError, pa.ArrowException) as e:
+        print(f"Could not cache {table_name} table: {e}")
+
+    return df
+
+
+def read_plan(tables=None):
+    """
+    Source file of every table to load, largest first
+
+    Tables do not depend on each other, so they can be read in any order;
+    starting with the largest keeps the slowest file off the tail of a
+    parallel load.
+    """
+    plan = [(table_name, find_table_file(table_name)) for table_name in tables or REGISTRAR_TABLES]
+    return sorted(plan, key=lambda item: os.stat(item[1]).st_size, reverse=True)
+
+
+def _timed_load(file_path, table_name, rebuild):
+    """
+    Load one table and measure how long it took
+    """
+    start = time.perf_counter()
+    df = load_table(file_path, table_name, rebuild=rebuild)
+    return df, time.perf_counter() - start
+
+
+@traced(record=('rebuild',))
+def load_tables(tables=None, rebuild=False, workers=None):
+    """
+    Load several tables concurrently on a thread pool
+
+    Parsing and Arrow reads release the GIL, so threads overlap the work and
+    the wall time tends towards that of the largest table. Returns the tables
+    keyed by name, in the order requested, and the seconds each one took.
+    """
+    plan = read_plan(tables)
+    # Reads also wait on disk, so by default run a few more threads than CPUs
+    workers = workers or max(min(len(plan), (os.cpu_count() or 1) + 4), 1)
+    # Workers run in the caller's context, so their load_table spans nest under this one
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            table_name: pool.submit(carry_context(_timed_load), file_path, table_name, rebuild)
+            for table_name, file_path in plan
+        }
+
+    data, timings = {}, {}
+    for table_name in tables or REGISTRAR_TABLES:
+        try:
+            data[table_name], timings[table_name] = futures[table_name].result()
+        except (OSError, UnicodeDecodeError, pd.errors.ParserError) as e:
+            raise ValueError(f"Could not load {table_name} data: {e}")
+    return data, timings
@@ -0,0 +1,375 @@
+import argparse
+import datetime
+import json
+import math
+from pathlib import Path
+import re
+import shutil
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.dialect import read_table
+from backend.registrar import READ_OPTIONS, find_table_file
+
+# Bump whenever the generated data changes so stale extracts are regenerated
+GENERATOR_VERSION = 1
+
+# Reference tables copied unchanged from the real extract
+COPIED_TABLES = ['approval', 'building', 'delivery', 'department', 'emphasis']
+
+# Course-level tables cloned once per copy of the catalog, and their course code columns
+COURSE_TABLES = {
+    'course': ['course_code'],
+    'corequisite': ['course_code', 'coreq_code'],
+    'course_emphasis': ['course_code'],
+    'restriction': ['course_code'],
+    'crosslist': ['course_code'],
+}
+
+# Spread of the per-course growth factor: a lognormal sigma of 0.75 makes a
+# few courses several times as popular as the median one
+COURSE_SKEW = 0.75
+
+# Data rows per worksheet (Excel's limit, less the header row)
+SHEET_ROWS = 1048575
+
+# Leading subject of a course code, e.g. 'BIOL' in 'BIOL 181L'
+SUBJECT_PATTERN = re.compile(r'^([A-Z]{4}) ')
+
+def scale_factors(scale):
+    """
+    Split a scale into catalog copies, term blocks and sections per course and term
+
+    Growth is spread evenly: 1000x is ten copies of the catalog offered over
+    ten times as many years, with ten times the sections per course and term.
+    """
+    copies = max(1, math.ceil(scale ** (1 / 3) - 1e-9))
+    blocks = max(1, math.ceil((scale / copies) ** 0.5 - 1e-9))
+    return copies, blocks, scale / (copies * blocks)
+
+def _read(table_name):
+    """
+    A real registrar table with every value kept as its original text
+    """
+    return read_table(
+        find_table_file(table_name),
+        dtype=str,
+        keep_default_na=False,
+        **READ_OPTIONS.get(table_name, {})
+    )
+
+def _read_meetings():
+    """
+    Raw cell values of the real meeting workbook
+    """
+    from openpyxl import load_workbook
+    with open(find_table_file('meeting'), 'rb') as file:
+        workbook = load_workbook(file, read_only=True, data_only=True)
+        rows = list(workbook.worksheets[0].iter_rows(values_only=True))
+        workbook.close()
+    return pd.DataFrame(rows[1:], columns=[str(name).strip() for name in rows[0]])
+
+def _subject_maps(subjects, copies):
+    """
+    Subject code of every real subject in each catalog copy
+
+    Copy 0 keeps the real subjects; later copies get unused four-letter
+    codes sharing the subject's first two letters, so clones stay unique.
+    """
+    subjects = sorted(subjects)
+    taken = set(subjects)
+    letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+    maps = [{subject: subject for subject in subjects}]
+    candidates = {
+        subject: (subject[:2] + a + b for a in letters for b in letters)
+        for subject in subjects
+    }
+    for _ in range(1, copies):
+        mapping = {}
+        for subject in subjects:
+            code = next(candidates[subject])
+            while code in taken:
+                code = next(candidates[subject])
+            taken.add(code)
+            mapping[subject] = code
+        maps.append(mapping)
+    return maps
+
+def _rename_codes(values, mapping):
+    """
+    Course codes with their subject replaced
+    """
+    return values.str.replace(SUBJECT_PATTERN, lambda m: f'{mapping.get(m.group(1), m.group(1))} ', regex=True)
+
+def _rename_text(values, mapping, pattern):
+    """
+    Free text with every course code mention moved to the copy's subjects
+    """
+    return values.str.replace(pattern, lambda m: mapping[m.group(1)], regex=True)
+
+def _gather(starts, counts):
+    """
+    Positions of the rows in [start, start + count) for every (start, count), and their owner
+    """
+    counts = np.asarray(counts, dtype=np.int64)
+    ends = np.cumsum(counts)
+    positions = np.arange(ends[-1] if len(ends) else 0) - np.repeat(ends - counts, counts) + np.repeat(starts, counts)
+    return positions, np.repeat(np.arange(len(counts)), counts)
+
+def _rows_by_section(frame, section_ids):
+    """
+    Start and count of each section's rows in a frame sorted by section
+    """
+    order = np.argsort(frame['section_id'].astype(np.int64).to_numpy(), kind='stable')
+    frame = frame.iloc[order].reset_index(drop=True)
+    keys = frame['section_id'].astype(np.int64).to_numpy()
+    starts = np.searchsorted(keys, section_ids, side='left')
+    counts = np.searchsorted(keys, section_ids, side='right') - starts
+    return frame, starts, counts
+
+def _shift_years(values, years):
+    """
+    Date strings such as '1/23/2023' moved back by a number of years
+    """
+    return values.str.replace(r'(\d{4})$', lambda m: str(int(m.group(1)) - years), regex=True)
+
+def _write(frame, path, header):
+    """
+    Append a block of rows to a tab-delimited file
+    """
+    frame.to_csv(path, sep='\t', index=False, header=header, mode='w' if header else 'a')
+
+class _MeetingWriter:
+    def __init__(self, path, columns):
+        """
+        Streaming meeting workbook that starts a new sheet at Excel's row limit
+        """
+        from openpyxl import Workbook
+        self.path = path
+        self.columns = columns
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.rows = SHEET_ROWS
+        self.total = 0
+
+    def append(self, frame):
+        """
+        Write a block of meeting rows
+        """
+        for row in frame.itertuples(index=False, name=None):
+            if self.rows == SHEET_ROWS:
+                self.sheet = self.workbook.create_sheet()
+                self.sheet.append(self.columns)
+                self.rows = 0
+            self.sheet.append(row)
+            self.rows += 1
+        self.total += len(frame)
+
+    def close(self):
+        """
+        Save the workbook, under the extract's extensionless table name
+        """
+        if self.sheet is None:
+            self.sheet = self.workbook.create_sheet()
+            self.sheet.append(self.columns)
+        with open(self.path, 'wb') as file:
+            self.workbook.save(file)
+
+def generate_registrar(output_dir, scale, seed=0):
+    """
+    Write a synthetic registrar extract about `scale` times the size of the real one
+
+    Sections are resampled from the real ones, so their caps, statuses,
+    delivery modes, seat groups, instructors and meetings keep their real
+    distributions. The catalog is cloned under new subject codes and the
+    terms repeat further back in time, and each course's section count is
+    scaled by its own lognormal factor for a realistic popularity skew.
+    Returns the row count of every generated table.
+    """
+    start = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    copies, blocks, per_block = scale_factors(scale)
+
+    for table_name in COPIED_TABLES:
+        shutil.copyfile(find_table_file(table_name), output_dir / table_name)
+
+    course_tables = {name: _read(name) for name in COURSE_TABLES}
+    section = _read('section')
+    student_cap = _read('student_cap')
+    instruction = _read('instruction')
+    instructor = _read('instructor')
+    term = _read('term')
+    meeting = _read_meetings()
+
+    subjects = set(course_tables['course']['course_code'].str.extract(SUBJECT_PATTERN)[0].dropna())
+    maps = _subject_maps(subjects, copies)
+    mention = re.compile(r'\b(' + '|'.join(sorted(subjects)) + r')\b(?=\s+[A-Z]?\d)')
+    rows = {}
+
+    # Course-level tables: one clone per copy of the catalog
+    group_offset = int(course_tables['crosslist']['group'].astype(np.int64).max()) + 1
+    for name, columns in COURSE_TABLES.items():
+        clones = []
+        for copy, mapping in enumerate(maps):
+            clone = course_tables[name].copy()
+            for column in columns:
+                clone[column] = _rename_codes(clone[column], mapping)
+            if name == 'course' and copy:
+                clone['pre_reqs'] = _rename_text(clone['pre_reqs'], mapping, mention)
+                clone['title'] = clone['title'] + f' ({copy + 1})'
+            if name == 'crosslist':
+                clone['group'] = (clone['group'].astype(np.int64) + copy * group_offset).astype(str)
+            clones.append(clone)
+        clones = pd.concat(clones, ignore_index=True)
+        _write(clones, output_dir / name, header=True)
+        rows[name] = len(clones)
+
+    # Instructors: one clone of the faculty per copy of the catalog
+    clones = []
+    for copy in range(copies):
+        clone = instructor.copy()
+        if copy:
+            clone['instructor_code'] = clone['instructor_code'] + str(copy + 1)
+            clone['email'] = clone['email'].str.replace('@', f'{copy + 1}@', regex=False)
+        clones.append(clone)
+    clones = pd.concat(clones, ignore_index=True)
+    _write(clones, output_dir / 'instructor', header=True)
+    rows['instructor'] = len(clones)
+
+    # Terms: the real span of years repeated further back for every block
+    term_codes = term['term_code'].astype(np.int64)
+    span = int(term_codes.max() // 100 - term_codes.min() // 100) + 1
+    clones = []
+    for block in range(blocks):
+        clone = term.copy()
+        clone['term_code'] = (term_codes - 100 * span * block).astype(str)
+        clone['year'] = (clone['year'].astype(np.int64) - span * block).astype(str)
+        clone['begin'] = _shift_years(clone['begin'], span * block)
+        clone['end'] = _shift_years(clone['end'], span * block)
+        clones.append(clone)
+    clones = pd.concat(clones, ignore_index=True)
+    _write(clones, output_dir / 'term', header=True)
+    rows['term'] = len(clones)
+
+    # Section-level rows of each real section, looked up by position
+    section_ids = section['section_id'].astype(np.int64).to_numpy()
+    student_cap, cap_starts, cap_counts = _rows_by_section(student_cap, section_ids)
+    instruction, teach_starts, teach_counts = _rows_by_section(instruction, section_ids)
+    meeting, meet_starts, meet_counts = _rows_by_section(meeting, section_ids)
+    seat_cap = student_cap['cap'].astype(np.int64).to_numpy()
+    seat_enrolled = student_cap['enrolled'].astype(np.int64).to_numpy()
+    seat_rate = np.clip(seat_enrolled / np.maximum(seat_cap, 1), 0, 1)
+    course_codes, course_index = np.unique(section['course_code'].to_numpy(), return_inverse=True)
+
+    meetings = _MeetingWriter(output_dir / 'meeting', list(meeting.columns))
+    next_id = int(section_ids.min())
+    next_crn = int(section['crn'].astype(np.int64).min())
+    rows.update(section=0, student_cap=0, instruction=0)
+    for block in range(blocks):
+        for copy, mapping in enumerate(maps):
+            # Each course grows by its own factor, averaging per_block over all sections
+            weights = rng.lognormal(0, COURSE_SKEW, len(course_codes))[course_index]
+            counts = rng.poisson(per_block * weights / weights.mean())
+            base = np.repeat(np.arange(len(section)), counts)
+            new_ids = np.arange(next_id, next_id + len(base))
+            next_id += len(base)
+
+            block_sections = section.iloc[base].reset_index(drop=True)
+            block_sections['section_id'] = new_ids.astype(str)
+            block_sections['course_code'] = _rename_codes(block_sections['course_code'], mapping)
+            block_sections['term_code'] = (block_sections['term_code'].astype(np.int64) - 100 * span * block).astype(str)
+            block_sections['crn'] = np.arange(next_crn, next_crn + len(base)).astype(str)
+            next_crn += len(base)
+            block_sections['sec_num'] = (
+                block_sections.groupby(['course_code', 'term_code']).cumcount() + 1
+            ).astype(str)
+            first = rows['section'] == 0
+            _write(block_sections, output_dir / 'section', header=first)
+            rows['section'] += len(block_sections)
+
+            # Seat groups keep their caps; enrollment is redrawn around the real fill rate
+            positions, owner = _gather(cap_starts[base], cap_counts[base])
+            seats = student_cap.iloc[positions].reset_index(drop=True)
+            seats['section_id'] = new_ids[owner].astype(str)
+            seats['enrolled'] = np.where(
+                seat_cap[positions] > 0,
+                rng.binomial(np.maximum(seat_cap[positions], 0), seat_rate[positions]),
+                seat_enrolled[positions]
+            ).astype(str)
+            _write(seats, output_dir / 'student_cap', header=first)
+            rows['student_cap'] += len(seats)
+
+            positions, owner = _gather(teach_starts[base], teach_counts[base])
+            teaching = instruction.iloc[positions].reset_index(drop=True)
+            teaching['section_id'] = new_ids[owner].astype(str)
+            if copy:
+                teaching['instructor_code'] = teaching['instructor_code'] + str(copy + 1)
+            _write(teaching, output_dir / 'instruction', header=first)
+            rows['instruction'] += len(teaching)
+
+            positions, owner = _gather(meet_starts[base], meet_counts[base])
+            block_meetings = meeting.iloc[positions].reset_index(drop=True)
+            block_meetings['section_id'] = new_ids[owner]
+            meetings.append(block_meetings)
+
+    meetings.close()
+    rows['meeting'] = meetings.total
+
+    manifest = {
+        'version': GENERATOR_VERSION,
+        'scale': scale,
+        'seed': seed,
+        'factors': {'catalog_copies': copies, 'term_blocks': blocks, 'sections_per_block': per_block},
+        'rows': rows,
+        'generated': datetime.datetime.now().isoformat(timespec='seconds'),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    with open(output_dir / 'generator.json', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return rows
+
+def load_manifest(output_dir):
+    """
+    Generator manifest of an extract, or None if there is none
+    """
+    try:
+        with open(Path(output_dir) / 'generator.json', 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def ensure_registrar(output_dir, scale, seed=0):
+    """
+    Generate an extract unless one from this generator version, scale and seed is already there
+    """
+    manifest = load_manifest(output_dir)
+    if manifest and (manifest['version'], manifest['scale'], manifest['seed']) == (GENERATOR_VERSION, scale, seed):
+        return manifest
+    if Path(output_dir).exists():
+        shutil.rmtree(output_dir)
+    generate_registrar(output_dir, scale, seed)
+    return load_manifest(output_dir)
+
+def main():
+    """
+    Generate one synthetic registrar extract
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic registrar extract")
+    parser.add_argument('--scale', type=float, default=10, help="Size relative to the real extract")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    parser.add_argument('--output', type=Path, required=True, help="Directory to write the tables to")
+    args = parser.parse_args()
+
+    rows = generate_registrar(args.output, args.scale, args.seed)
+    for table_name, count in rows.items():
+        print(f"{table_name}: {count:,} rows")
+    print(f"Synthetic registrar extract written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from benchmarks.registrar_generator import GENERATOR_VERSION, ensure_registrar
+
+# Generated extracts (reused while the generator version, scale and seed match) and results
+DATA_ROOT = Path(__file__).parent / 'data'
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+# Pipeline stages in the order they run; each one feeds the next
+STAGES = [
+    'load_data_cold',
+    'load_data_warm',
+    'process_enrollment_data',
+    'generate_summary_statistics',
+    'database_load',
+    'chart_export',
+]
+
+DEFAULT_SCALES = [1, 10]
+
+# A stage regresses when its fastest run is this much slower than the
+# baseline's, and by more than the noise floor
+REGRESSION_THRESHOLD = 0.10
+NOISE_FLOOR_SECONDS = 0.05
+
+# Packages whose versions are recorded with the results
+RECORDED_PACKAGES = ['pandas', 'numpy', 'pyarrow', 'sqlalchemy', 'plotly', 'openpyxl']
+
+def extract_dir(scale, seed):
+    """
+    Directory of the synthetic extract for a scale and seed
+    """
+    return DATA_ROOT / f'scale_{scale:g}_seed_{seed}'
+
+def extract_environment(directory):
+    """
+    Environment pointing the pipeline at a synthetic extract and its own caches and database
+    """
+    env = dict(os.environ)
+    env.update({
+        'DASHBOARD_DATA_DIR': str(directory),
+        'REGISTRAR_DIR': str(directory),
+        'DASHBOARD_CACHE_DIR': str(directory / 'cache'),
+        'DATABASE_URL': f"sqlite:///{directory / 'benchmark.db'}",
+    })
+    return env
+
+def _max_rss_mb():
+    """
+    Peak resident memory of this process so far, in MB
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def measure(stage, repeat):
+    """
+    Time a stage `repeat` times, then run it once more under tracemalloc for its peak memory
+
+    Timed runs are not traced, since tracing slows allocation-heavy code.
+    Returns the stage's measurements and the result of its last run.
+    """
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = stage()
+        seconds.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    result = stage()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'seconds': [round(s, 4) for s in seconds],
+        'min': round(min(seconds), 4),
+        'median': round(statistics.median(seconds), 4),
+        'peak_traced_mb': round(peak / 2 ** 20, 2),
+        'max_rss_mb': round(_max_rss_mb(), 1) if resource is not None else None,
+    }, result
+
+def run_stages(directory, repeat, stages):
+    """
+    Benchmark the pipeline stages against the extract the environment points at
+
+    Runs in a worker process started with extract_environment(), since the
+    backend reads its data locations when it is imported.
+    """
+    from backend.database_connection import DatabaseConnection
+    from backend.process_data import generate_summary_statistics, load_data, process_enrollment_data
+    from visualizations.enrollment_dashboard import create_enrollment_dashboard
+    from visualizations.export import dashboard_aggregates
+    from visualizations.student_demographics import create_demographics_visualizations
+
+    def database_load():
+        # Start from an empty file; pooled connections to the old one must go first
+        connection = DatabaseConnection()
+        connection.engine.dispose()
+        database = Path(directory) / 'benchmark.db'
+        if database.exists():
+            database.unlink()
+        connection.bulk_load_registrar()
+
+    def chart_export(enrollment_data):
+        # A fresh directory each run, so no figure is skipped as unchanged
+        with tempfile.TemporaryDirectory() as output_dir:
+            aggregates = dashboard_aggregates(enrollment_data)
+            create_enrollment_dashboard(enrollment_data, aggregates, output_dir)
+            create_demographics_visualizations(enrollment_data, aggregates, output_dir)
+
+    results = {}
+    state = {}
+    steps = {
+        'load_data_cold': lambda: load_data(rebuild_cache=True),
+        'load_data_warm': lambda: load_data(),
+        'process_enrollment_data': lambda: process_enrollment_data(state['data']),
+        'generate_summary_statistics': lambda: generate_summary_statistics(state['enrollment_data']),
+        'database_load': database_load,
+        'chart_export': lambda: chart_export(state['enrollment_data']),
+    }
+    # Later stages need the output of earlier ones, even when those are not benchmarked
+    needs = {'process_enrollment_data': ['data'], 'generate_summary_statistics': ['data', 'enrollment_data'],
+             'chart_export': ['data', 'enrollment_data']}
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            if 'data' in needs.get(stage, []) and 'data' not in state:
+                state['data'] = load_data()
+            if 'enrollment_data' in needs.get(stage, []) and 'enrollment_data' not in state:
+                state['enrollment_data'] = process_enrollment_data(state['data'])
+
+            results[stage], result = measure(steps[stage], repeat)
+            if stage.startswith('load_data'):
+                state['data'] = result
+            elif stage == 'process_enrollment_data':
+                state['enrollment_data'] = result
+            print(f"{stage}: {results[stage]['min']:.3f}s", file=sys.stderr)
+    return results
+
+def _git(*args):
+    """
+    Output of a git command run in the project, or None outside a repository
+    """
+    try:
+        result = subprocess.run(['git', *args], cwd=Path(__file__).parent.parent, capture_output=True, text=True)
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def _package_versions():
+    """
+    Installed versions of the packages the pipeline depends on
+    """
+    from importlib.metadata import PackageNotFoundError, version
+    versions = {}
+    for package in RECORDED_PACKAGES:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+def run_benchmarks(scales, repeat=3, seed=0, stages=None):
+    """
+    Generate (or reuse) an extract per scale and benchmark every stage on it in a fresh process
+    """
+    stages = stages or STAGES
+    report = {
+        'commit': _git('rev-parse', 'HEAD'),
+        'dirty': bool(_git('status', '--porcelain', '--untracked-files=no')),
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': _package_versions(),
+        'generator': {'version': GENERATOR_VERSION, 'seed': seed},
+        'repeat': repeat,
+        'results': [],
+    }
+
+    for scale in scales:
+        directory = extract_dir(scale, seed)
+        start = time.perf_counter()
+        manifest = ensure_registrar(directory, scale, seed)
+        print(f"Scale {scale:g}x: extract ready in {time.perf_counter() - start:.1f}s "
+              f"({manifest['rows']['section']:,} sections)")
+
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            result_path = Path(f.name)
+        try:
+            subprocess.run(
+                [sys.executable, __file__, '--worker', str(directory), '--result-file', str(result_path),
+                 '--repeat', str(repeat), '--stages', *stages],
+                env=extract_environment(directory),
+                check=True
+            )
+            with open(result_path, 'r') as f:
+                stage_results = json.load(f)
+        finally:
+            result_path.unlink(missing_ok=True)
+
+        report['results'].append({
+            'scale': scale,
+            'rows': manifest['rows'],
+            'stages': stage_results,
+        })
+    return report
+
+def compare_reports(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Stage-by-stage comparison of two reports, returning the regressions found
+
+    Times are compared on the fastest run and memory on the traced peak;
+    only (scale, stage) pairs present in both reports are compared.
+    """
+    baseline_stages = {r['scale']: r['stages'] for r in baseline['results']}
+    regressions = []
+    print(f"Baseline {str(baseline.get('commit'))[:10]} -> current {str(current.get('commit'))[:10]}")
+    for result in current['results']:
+        for stage, measured in result['stages'].items():
+            before = baseline_stages.get(result['scale'], {}).get(stage)
+            if before is None:
+                continue
+            ratio = measured['min'] / before['min'] if before['min'] else float('inf')
+            slower = ratio > 1 + threshold and measured['min'] - before['min'] > NOISE_FLOOR_SECONDS
+            memory_ratio = (measured['peak_traced_mb'] / before['peak_traced_mb']
+                            if before['peak_traced_mb'] else 1.0)
+            larger = memory_ratio > 1 + threshold
+            flag = 'REGRESSION' if slower or larger else ''
+            print(f"  {result['scale']:g}x {stage}: {before['min']:.3f}s -> {measured['min']:.3f}s ({ratio:.2f}x), "
+                  f"{before['peak_traced_mb']:.1f} -> {measured['peak_traced_mb']:.1f} MB {flag}")
+            if flag:
+                regressions.append((result['scale'], stage))
+    return regressions
+
+def _load_report(path):
+    """
+    Read a results file
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def main():
+    """
+    Run the benchmarks, save the results and optionally compare them with a baseline
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline on synthetic registrar extracts")
+    parser.add_argument('--scales', type=float, nargs='+', default=DEFAULT_SCALES,
+                        help="Extract sizes relative to the real one, e.g. 10 100 1000")
+    parser.add_argument('--repeat', type=int, default=3, help="Timed runs per stage")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed of the generator")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES, help="Stages to run")
+    parser.add_argument('--output', type=Path, default=None,
+                        help="Results file (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument('--baseline', type=Path, default=None,
+                        help="Earlier results file to compare with; exits non-zero on a regression")
+    parser.add_argument('--compare', type=Path, nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Only compare two existing results files")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slowdown counted as a regression")
+    parser.add_argument('--worker', type=Path, help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        results = run_stages(args.worker, args.repeat, args.stages)
+        with open(args.result_file, 'w') as f:
+            json.dump(results, f)
+        return
+
+    if args.compare:
+        baseline, current = (_load_report(path) for path in args.compare)
+        sys.exit(1 if compare_reports(baseline, current, args.threshold) else 0)
+
+    report = run_benchmarks(args.scales, args.repeat, args.seed, args.stages)
+    output = args.output
+    if output is None:
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+        output = RESULTS_DIR / f"{(report['commit'] or 'unversioned')[:10]}-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.baseline:
+        sys.exit(1 if compare_reports(_load_report(args.baseline), report, args.threshold) else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from pathlib import Path
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.crosslist import section_offerings
+from backend.seat_fill import SEAT_GROUPS
+
+
+def _offerings(caps, enrolled):
+    """
+    Offerings of crosslisted sections taught in one room, slot and term by one instructor
+    """
+    section_ids = np.arange(30543, 30543 + len(caps))
+    section = pd.DataFrame({
+        'section_id': section_ids,
+        'course_code': [f'MUSI {234 + 100 * i}' for i in range(len(caps))],
+        'cap': caps,
+        'term_code': 202310,
+    })
+    crosslist = pd.DataFrame({'course_code': section['course_code'], 'group': 1})
+    meeting = pd.DataFrame({
+        'section_id': section_ids,
+        'day_mask': 10,
+        'start_minute': 600,
+        'building_code': 'MUS',
+        'room': '101',
+    })
+    instruction = pd.DataFrame({'section_id': section_ids, 'instructor_code': 'I001'})
+    student_cap = pd.DataFrame({'section_id': section_ids, 'category': 'General', 'cap': caps, 'enrolled': enrolled})
+    return section_offerings(section, crosslist, meeting, instruction, student_cap)
+
+
+def test_listings_over_a_shared_cap_hold_their_own_seats():
+    offerings = _offerings([15, 15], [16, 9])
+
+    assert offerings['is_canonical'].all()
+    assert offerings['offering_capacity'].tolist() == [15, 15]
+    assert offerings['listing_share'].tolist() == [1.0, 1.0]
+    assert offerings['seat_share'].tolist() == [1.0, 1.0]
+
+
+def test_shared_cap_is_split_in_proportion_to_enrollment():
+    offerings = _offerings([15, 15], [10, 5])
+
+    assert offerings['offering_id'].tolist() == [30543, 30543]
+    assert offerings['offering_capacity'].tolist() == [15, 15]
+    assert offerings['listing_share'].tolist() == pytest.approx([2 / 3, 1 / 3])
+    # Each listing's own cap is scaled down to the seats it is credited with
+    assert (offerings['seat_share'] * 15).tolist() == pytest.approx([10, 5])
+
+
+def test_different_caps_add_up():
+    offerings = _offerings([20, 5], [12, 4])
+
+    assert offerings['offering_id'].tolist() == [30543, 30543]
+    assert offerings['offering_capacity'].tolist() == [25, 25]
+    assert (offerings['offering_capacity'] * offerings['listing_share']).tolist() == pytest.approx([18.75, 6.25])
+
+
+def test_empty_offering_is_split_equally():
+    offerings = _offerings([15, 15], [0, 0])
+
+    assert offerings['offering_id'].tolist() == [30543, 30543]
+    assert offerings['listing_share'].tolist() == [0.5, 0.5]
+
+
+@pytest.fixture(scope='module')
+def facts():
+    from backend.registrar import find_table_file
+    from backend.table_cache import load_tables
+    from backend.star_schema import build_enrollment_facts
+
+    try:
+        find_table_file('section')
+    except FileNotFoundError:
+        pytest.skip("registrar data is not available")
+    data, _ = load_tables()
+    return build_enrollment_facts(data)
+
+
+def test_registrar_offerings_fit_their_seats(facts):
+    sections = facts[facts['is_section_row']]
+    offerings = sections.groupby('offering_id').agg(
+        listings=('section_id', 'size'),
+        enrolled=('enrolled', 'sum'),
+        capacity=('offering_capacity', 'first'),
+    )
+    merged = offerings[offerings['listings'] > 1]
+
+    assert len(merged) == 242
+    assert (merged['enrolled'] <= merged['capacity']).all()
+
+    # MUSI 234 (16 enrolled) and MUSI 334 (9) repeat a cap of 15, so they are separate classes
+    music = sections[sections['section_id'].isin([30543, 30544])]
+    assert music['offering_id'].tolist() == [30543, 30544]
+
+
+def test_registrar_departments_are_credited_their_share(facts):
+    from backend.cube import EnrollmentCube
+
+    cube = EnrollmentCube.from_facts(facts)
+    departments = cube.rollup('department_name').set_index('department_name')
+    totals = cube.totals()
+
+    assert totals['capacity'] == pytest.approx(170150)
+    assert totals['sections'] == pytest.approx(9062)
+    assert departments.loc['English', 'capacity'] == pytest.approx(6005.87, abs=0.01)
+    assert departments.loc['Environmental Studies', 'capacity'] == pytest.approx(1735.84, abs=0.01)
+    assert departments.loc['Music', 'sections'] == pytest.approx(152)
+
+    # Partner listings keep their share rather than losing it to the canonical one
+    sections = facts[facts['is_section_row']]
+    core = sections[sections['course_code'] == 'CORE 163C']
+    assert (core['offering_capacity'] * core['listing_share']).sum() == pytest.approx(157.44, abs=0.01)
+
+    # Seat group caps are scaled the same way, so they add up to the capacity
+    # (up to a few registrar sections whose seat groups miss their cap by one)
+    seat_caps = sum(totals[f'cap_{group.lower()}'] for group in SEAT_GROUPS)
+    assert seat_caps == pytest.approx(totals['capacity'], abs=2)
@@ -0,0 +1,83 @@
+from pathlib import Path
+import sys
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend import dialect, table_cache
+from backend.delta_sync import parse_keys, row_keys
+
+
+def test_null_key_parts_round_trip():
+    df = pd.DataFrame({
+        'section_id': pd.array([30001, 30002], dtype='int32'),
+        'start_minute': pd.array([600, None], dtype='Int16'),
+        'room': pd.array(['101', None], dtype='string'),
+    })
+    keys = row_keys(df, list(df.columns))
+
+    assert 'nan' not in keys[1] and '<NA>' not in keys[1]
+    assert parse_keys(keys, list(df.columns), df.dtypes) == [
+        {'section_id': 30001, 'start_minute': 600, 'room': '101'},
+        {'section_id': 30002, 'start_minute': None, 'room': None},
+    ]
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """
+    A database and table cache of their own, so the real ones are never touched
+    """
+    monkeypatch.setattr(table_cache, 'CACHE_DIR', tmp_path / 'cache')
+    monkeypatch.setattr(dialect, 'MANIFEST_PATH', tmp_path / 'dialect_manifest.json')
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'university.db'}")
+    from backend.database_connection import DatabaseConnection
+    return DatabaseConnection()
+
+
+def _write(path, rows):
+    path.write_text('\n'.join(rows) + '\n', encoding='utf-8')
+
+
+def test_sync_applies_only_the_changed_rows(database, tmp_path):
+    term = tmp_path / 'term'
+    _write(term, [
+        'term_code,year,semester,begin,end',
+        '201810,2018,Spring,2018-01-15,2018-05-10',
+        '201830,2018,Fall,2018-08-27,2018-12-14',
+        '201910,2019,Spring,2019-01-14,2019-05-09',
+    ])
+    first = database.sync_from_csv(term, 'term')
+    assert (first['inserted'], first['updated'], first['deleted']) == (3, 0, 0)
+
+    # Nothing changed, so no term is compared
+    unchanged = database.sync_from_csv(term, 'term')
+    assert (unchanged['inserted'], unchanged['updated'], unchanged['deleted'], unchanged['partitions']) == (0, 0, 0, 0)
+
+    _write(term, [
+        'term_code,year,semester,begin,end',
+        '201810,2018,Spring,2018-01-16,2018-05-10',
+        '201910,2019,Spring,2019-01-14,2019-05-09',
+        '201930,2019,Fall,2019-08-26,2019-12-13',
+    ])
+    changed = database.sync_from_csv(term, 'term')
+    assert (changed['inserted'], changed['updated'], changed['deleted']) == (1, 1, 1)
+
+    rows = database.query_data('SELECT term_code, "begin" FROM term ORDER BY term_code', use_cache=False)
+    assert rows['term_code'].tolist() == [201810, 201910, 201930]
+    assert rows['begin'].tolist()[0] == '2018-01-16'
+
+
+def test_sync_deletes_rows_keyed_on_a_null(database, tmp_path):
+    # corequisite has no primary key, so the whole row is its key
+    corequisite = tmp_path / 'corequisite'
+    _write(corequisite, ['course_code,coreq_code', 'BIOL 201,BIOL 201L', 'CHEM 101,', 'PHYS 151,PHYS 151L'])
+    database.sync_from_csv(corequisite, 'corequisite')
+
+    _write(corequisite, ['course_code,coreq_code', 'BIOL 201,BIOL 201L', 'PHYS 151,PHYS 151L'])
+    changed = database.sync_from_csv(corequisite, 'corequisite')
+    assert (changed['inserted'], changed['updated'], changed['deleted']) == (0, 0, 1)
+
+    rows = database.query_data('SELECT course_code FROM corequisite ORDER BY course_code', use_cache=False)
+    assert rows['course_code'].tolist() == ['BIOL 201', 'PHYS 151']
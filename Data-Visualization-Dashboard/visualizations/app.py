@@ -1,16 +1,21 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-import seaborn as sns
-import matplotlib.pyplot as plt
 from pathlib import Path
 import sys
 
 # Add parent directory to path to import backend modules
 sys.path.append(str(Path(__file__).parent.parent))
-from backend.process_data import load_data, process_enrollment_data, generate_summary_statistics
-from backend.database_connection import DatabaseConnection
+from backend.process_data import DASHBOARD_TABLES, load_data, process_enrollment_data
+from backend.cube import EnrollmentCube
+from backend.detail_table import DetailTable
+from backend.figure_data import HISTOGRAM_BINS, downsample, histogram_bins
+from backend.filter_index import FILTER_DIMENSIONS, FilterIndex
+from backend.instrumentation import span, start_collecting, start_profile, stop_collecting, stop_profile
+from backend.star_schema import section_rows
+from backend.seat_fill import CLASS_YEARS, class_year_fill, fill_rates
+from backend.shared_dataset import SharedDataset, dataset_version
+from visualizations.paginated_table import paginated_table
 
 # Set page config
 st.set_page_config(
@@ -26,35 +31,126 @@ This dashboard provides insights into university enrollment data, including cour
 department-wise enrollment patterns, and instructor workload analysis.
 """)
 
-# Load data
-@st.cache_data
-def load_dashboard_data():
-    data = load_data()
-    enrollment_data = process_enrollment_data(data)
-    summary_stats = generate_summary_statistics(enrollment_data)
-    return enrollment_data, summary_stats
+# Debug panel (toggled at the bottom of the sidebar): the spans of this rerun
+# and, on request, a cProfile of one whole rerun
+debug_panel = st.session_state.get('debug_panel', False)
+if debug_panel:
+    start_collecting(memory=st.session_state.get('debug_memory', False))
+profiler = start_profile() if st.session_state.pop('profile_rerun', False) else None
 
-enrollment_data, summary_stats = load_dashboard_data()
+def show_chart(fig):
+    # The figure is serialized to JSON for the browser here
+    with span('app.plotly_chart', chart=fig.layout.title.text):
+        st.plotly_chart(fig, use_container_width=True)
+
+# Load data. The fact table is memory-mapped from a shared Arrow file once per
+# server process and handed to every session as the same read-only frame,
+# rather than a pickled copy per session and rerun. It is keyed by a stamp of
+# the source files, so a refreshed extract is picked up on the next rerun and
+# the previous version is dropped.
+@st.cache_resource(max_entries=1)
+def load_dashboard_data(version):
+    dataset = SharedDataset('enrollment', version, lambda: process_enrollment_data(load_data()))
+    return dataset.frame
+
+# The cube and the row index are read-only, so every session shares one
+# instance (and its cache of filter selections) instead of a pickled copy.
+# Every dashboard statistic is a roll-up of this cube, so it is the only one built
+@st.cache_resource(max_entries=1)
+def load_dashboard_indexes(version):
+    enrollment_data = load_dashboard_data(version)
+    cube = EnrollmentCube.from_facts(enrollment_data)
+    row_index = FilterIndex(enrollment_data, FILTER_DIMENSIONS)
+    detail_table = DetailTable(enrollment_data, row_index)
+    return cube, row_index, detail_table
+
+# Aggregate queries run inside the database through one shared, pooled connection
+@st.cache_resource
+def get_database():
+    # SQLAlchemy and the .env settings are only loaded once the database is chosen
+    from backend.database_connection import DatabaseConnection
+    return DatabaseConnection()
+
+# Or from a running aggregate API, which keeps one copy of the data for the
+# dashboard, the exporters and any other local tool
+@st.cache_resource
+def get_aggregate_client():
+    from backend.aggregate_client import AggregateClient
+    return AggregateClient()
+
+# Data backend: the in-memory pandas pipeline, SQL pushdown so memory stays
+# bounded however many years of sections the database holds, or the aggregate API
+st.sidebar.header("Data Source")
+backend = st.sidebar.radio("Backend", ["In-memory (pandas)", "Database (SQL)", "Aggregate API (HTTP)"])
+in_memory = backend == "In-memory (pandas)"
+
+if backend == "Database (SQL)":
+    source = get_database()
+    dimension_values = source.values
+elif backend == "Aggregate API (HTTP)":
+    source = get_aggregate_client()
+    try:
+        st.sidebar.caption(f"Data version {source.health()['version']} from {source.base_url}")
+    except ConnectionError:
+        st.error(f"The aggregate API is not running at {source.base_url}. "
+                 "Start it with `python backend/aggregate_server.py`.")
+        st.stop()
+    dimension_values = source.values
+else:
+    data_version = dataset_version(DASHBOARD_TABLES)
+    enrollment_data = load_dashboard_data(data_version)
+    cube, row_index, detail_table = load_dashboard_indexes(data_version)
+    # Tell a session when the data changed under it since its last rerun
+    if st.session_state.setdefault('data_version', data_version) != data_version:
+        st.session_state['data_version'] = data_version
+        st.sidebar.info("The registrar data was refreshed.")
+    st.sidebar.caption(f"Data version {data_version}")
+    source = cube
+    dimension_values = row_index.values
 
 # Sidebar filters
 st.sidebar.header("Filters")
 department_filter = st.sidebar.multiselect(
     "Select Departments",
-    options=enrollment_data['department_name'].unique(),
-    default=enrollment_data['department_name'].unique()
+    options=dimension_values('department_name'),
+    default=dimension_values('department_name')
 )
 
 term_filter = st.sidebar.multiselect(
     "Select Terms",
-    options=enrollment_data['term'].unique(),
-    default=enrollment_data['term'].unique()
+    options=dimension_values('term'),
+    default=dimension_values('term')
+)
+
+delivery_filter = st.sidebar.multiselect(
+    "Select Delivery Modes",
+    options=dimension_values('delivery_code'),
+    default=dimension_values('delivery_code')
+)
+
+status_filter = st.sidebar.multiselect(
+    "Select Section Statuses",
+    options=dimension_values('status'),
+    default=dimension_values('status')
 )
 
-# Filter data based on sidebar selections
-filtered_data = enrollment_data[
-    (enrollment_data['department_name'].isin(department_filter)) &
-    (enrollment_data['term'].isin(term_filter))
-]
+filters = {
+    'department_name': department_filter,
+    'term': term_filter,
+    'delivery_code': delivery_filter,
+    'status': status_filter
+}
+
+# Aggregates are answered from the cube (or the database or API); only the rate
+# distribution below needs the filtered fact rows, and the detail table pages
+# through them itself
+totals = source.totals(filters)
+
+if in_memory:
+    # Filter data based on sidebar selections
+    filtered_data = enrollment_data.iloc[row_index.select(filters)]
+    # Team-taught sections have one row per instructor; count their seats once
+    filtered_sections = section_rows(filtered_data)
 
 # Dashboard layout
 col1, col2, col3 = st.columns(3)
@@ -63,30 +159,31 @@ col1, col2, col3 = st.columns(3)
 with col1:
     st.metric(
         "Total Enrollments",
-        f"{filtered_data['enrolled'].sum():,}"
+        f"{totals['enrolled']:,}"
     )
 
 with col2:
     st.metric(
         "Average Class Size",
-        f"{filtered_data['enrolled'].mean():.1f}"
+        f"{(totals['enrolled'] / totals['sections'] if totals['sections'] else 0):.1f}"
     )
 
 with col3:
     st.metric(
         "Enrollment Rate",
-        f"{(filtered_data['enrolled'].sum() / filtered_data['capacity'].sum() * 100):.1f}%"
+        f"{(totals['enrolled'] / totals['capacity'] * 100 if totals['capacity'] else 0):.1f}%"
     )
 
 # Enrollment trends
 st.subheader("Enrollment Trends")
+term_rollup = source.rollup('term', filters)
 fig_trends = px.line(
-    filtered_data.groupby('term')['enrolled'].sum().reset_index(),
+    downsample(term_rollup, 'term', 'enrolled'),
     x='term',
     y='enrolled',
     title="Enrollment Trends by Term"
 )
-st.plotly_chart(fig_trends, use_container_width=True)
+show_chart(fig_trends)
 
 # Department-wise enrollment
 col1, col2 = st.columns(2)
@@ -94,28 +191,28 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Department-wise Enrollment")
     fig_dept = px.bar(
-        filtered_data.groupby('department_name')['enrolled'].sum().reset_index(),
+        source.rollup('department_name', filters),
         x='department_name',
         y='enrolled',
         title="Enrollment by Department"
     )
-    st.plotly_chart(fig_dept, use_container_width=True)
+    show_chart(fig_dept)
 
 with col2:
     st.subheader("Top Courses by Enrollment")
-    top_courses = filtered_data.groupby('course_name')['enrolled'].sum().reset_index()
+    top_courses = source.rollup('course_code', filters)
     top_courses = top_courses.sort_values('enrolled', ascending=False).head(10)
     fig_courses = px.bar(
         top_courses,
-        x='course_name',
+        x='course_label',
         y='enrolled',
         title="Top 10 Courses by Enrollment"
     )
-    st.plotly_chart(fig_courses, use_container_width=True)
+    show_chart(fig_courses)
 
 # Instructor workload
 st.subheader("Instructor Workload Analysis")
-instructor_workload = filtered_data.groupby('instructor_name')['enrolled'].sum().reset_index()
+instructor_workload = source.rollup('instructor_name', filters)
 instructor_workload = instructor_workload.sort_values('enrolled', ascending=False).head(15)
 fig_instructor = px.bar(
     instructor_workload,
@@ -123,18 +220,75 @@ fig_instructor = px.bar(
     y='enrolled',
     title="Top 15 Instructors by Student Count"
 )
-st.plotly_chart(fig_instructor, use_container_width=True)
+show_chart(fig_instructor)
+
+# Seat fill per class year, from the seats student_cap reserves for each year
+st.subheader("Seat Fill by Class Year")
+class_year_rates = fill_rates(pd.DataFrame([totals]), CLASS_YEARS).iloc[0]
+for column, class_year in zip(st.columns(len(CLASS_YEARS)), CLASS_YEARS):
+    with column:
+        rate = class_year_rates[class_year]
+        st.metric(f"{class_year} Seats Filled", f"{rate * 100:.1f}%" if pd.notna(rate) else "n/a")
+
+fig_fill = px.line(
+    downsample(class_year_fill(term_rollup, 'term'), 'term', 'fill_rate', by='class_year'),
+    x='term',
+    y='fill_rate',
+    color='class_year',
+    markers=True,
+    title="Reserved Seat Fill Rate by Class Year and Term"
+)
+fig_fill.update_yaxes(tickformat='.0%')
+show_chart(fig_fill)
 
 # Enrollment rate distribution
 st.subheader("Enrollment Rate Distribution")
-fig_dist = px.histogram(
-    filtered_data,
+if not in_memory:
+    # Binned in SQL or by the API; only the bin counts are transferred
+    rate_histogram = source.rate_histogram(filters, bins=HISTOGRAM_BINS)
+else:
+    # Binned with NumPy; the chart gets the bin counts, not one point per section
+    rate_histogram = histogram_bins(
+        filtered_sections['enrollment_rate'],
+        bins=HISTOGRAM_BINS,
+        value_name='enrollment_rate',
+        count_name='sections'
+    )
+fig_dist = px.bar(
+    rate_histogram,
     x='enrollment_rate',
-    title="Distribution of Enrollment Rates",
-    nbins=30
+    y='sections',
+    title="Distribution of Enrollment Rates"
 )
-st.plotly_chart(fig_dist, use_container_width=True)
+fig_dist.update_layout(bargap=0)
+show_chart(fig_dist)
 
 # Data table
 st.subheader("Detailed Enrollment Data")
-st.dataframe(filtered_data) 
\ No newline at end of file
+# Only the visible page is fetched: LIMIT/OFFSET in the database, a slice of
+# the filter index's row ids in memory, or one page from the API
+paginated_table(detail_table if in_memory else source, filters)
+
+# Debug panel
+st.sidebar.header("Debug")
+st.sidebar.checkbox("Show debug panel", key='debug_panel')
+if debug_panel:
+    st.sidebar.checkbox("Trace peak memory (slower)", key='debug_memory')
+    st.sidebar.button("Profile next rerun", on_click=lambda: st.session_state.update(profile_rerun=True))
+
+if profiler is not None:
+    profile_path, profile_report = stop_profile(profiler, 'app')
+    st.session_state['last_profile'] = (str(profile_path), profile_report)
+
+if debug_panel:
+    spans, elapsed_ms = stop_collecting()
+    st.subheader("Debug: Spans of This Rerun")
+    st.caption(f"Rerun took {elapsed_ms:,.0f} ms. Cached loaders only appear on the rerun that computes them.")
+    if spans:
+        span_table = pd.DataFrame(spans)
+        span_table['span'] = ['  ' * depth + name for depth, name in zip(span_table['depth'], span_table['span'])]
+        st.dataframe(span_table.drop(columns=['parent', 'depth', 'thread']), use_container_width=True)
+    if 'last_profile' in st.session_state:
+        profile_path, profile_report = st.session_state['last_profile']
+        with st.expander(f"cProfile of the last profiled rerun ({profile_path})"):
+            st.text(profile_report)
@@ -1,26 +1,24 @@
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
 from pathlib import Path
 import sys
 
 # Add parent directory to path to import backend modules
 sys.path.append(str(Path(__file__).parent.parent))
+from backend.figure_data import downsample
 from backend.process_data import load_data, process_enrollment_data
+from backend.seat_fill import CLASS_YEARS, fill_rates
+from visualizations.export import OUTPUT_DIR, dashboard_aggregates, export_figures
 
-def create_enrollment_dashboard(enrollment_data):
+def enrollment_dashboard_figure(term_enrollment, dept_enrollment):
     """
-    Create a comprehensive enrollment dashboard
+    Combined enrollment trend and department figure
     """
-    # Create a directory for saving visualizations
-    output_dir = Path(__file__).parent.parent / 'data' / 'visualizations'
-    output_dir.mkdir(exist_ok=True)
-    
     # Create a dashboard layout using Plotly
     fig = go.Figure()
+    term_enrollment = downsample(term_enrollment, 'term', 'enrolled')
     
     # Add enrollment trends
-    term_enrollment = enrollment_data.groupby('term')['enrolled'].sum().reset_index()
     fig.add_trace(
         go.Scatter(
             x=term_enrollment['term'],
@@ -31,9 +29,6 @@ def create_enrollment_dashboard(enrollment_data):
     )
     
     # Add department-wise enrollment
-    dept_enrollment = enrollment_data.groupby('department_name')['enrolled'].sum().reset_index()
-    dept_enrollment = dept_enrollment.sort_values('enrolled', ascending=False)
-    
     fig.add_trace(
         go.Bar(
             x=dept_enrollment['department_name'],
@@ -50,21 +45,38 @@ def create_enrollment_dashboard(enrollment_data):
         barmode='group',
         height=800
     )
+    return fig
+
+def create_enrollment_dashboard(enrollment_data, aggregates=None, output_dir=OUTPUT_DIR):
+    """
+    Create a comprehensive enrollment dashboard
+    """
+    # All aggregates are roll-ups of the pre-aggregated cube, computed once
+    if aggregates is None:
+        aggregates = dashboard_aggregates(enrollment_data)
+    dept_enrollment = aggregates['department']
     
-    # Save the dashboard
-    fig.write_html(output_dir / 'enrollment_dashboard.html')
+    # Save the dashboard, unless its aggregates are unchanged since the last export
+    export_figures({
+        'enrollment_dashboard.html': (
+            enrollment_dashboard_figure,
+            [aggregates['term'][['term', 'enrolled']], dept_enrollment[['department_name', 'enrolled']]]
+        )
+    }, output_dir)
     
     # Create a summary report
+    totals = aggregates['totals']
     summary = {
-        'total_enrollments': enrollment_data['enrolled'].sum(),
-        'average_class_size': enrollment_data['enrolled'].mean(),
-        'enrollment_rate': (enrollment_data['enrolled'].sum() / enrollment_data['capacity'].sum() * 100),
+        'total_enrollments': totals['enrolled'],
+        'average_class_size': totals['enrolled'] / totals['sections'],
+        'enrollment_rate': (totals['enrolled'] / totals['capacity'] * 100),
         'top_department': dept_enrollment.iloc[0]['department_name'],
-        'top_department_enrollment': dept_enrollment.iloc[0]['enrolled']
+        'top_department_enrollment': dept_enrollment.iloc[0]['enrolled'],
+        'class_year_fill_rates': fill_rates(pd.DataFrame([totals]), CLASS_YEARS).iloc[0]
     }
     
     # Save summary to a text file
-    with open(output_dir / 'enrollment_summary.txt', 'w') as f:
+    with open(Path(output_dir) / 'enrollment_summary.txt', 'w') as f:
         f.write("Enrollment Summary\n")
         f.write("=================\n\n")
         f.write(f"Total Enrollments: {summary['total_enrollments']:,}\n")
@@ -72,6 +84,10 @@ def create_enrollment_dashboard(enrollment_data):
         f.write(f"Overall Enrollment Rate: {summary['enrollment_rate']:.1f}%\n")
         f.write(f"Top Department: {summary['top_department']}\n")
         f.write(f"Top Department Enrollment: {summary['top_department_enrollment']:,}\n")
+        f.write("\nReserved Seat Fill by Class Year\n")
+        for class_year, rate in summary['class_year_fill_rates'].items():
+            # A class year with no reserved seats has no fill rate
+            f.write(f"  {class_year}: {f'{rate * 100:.1f}%' if pd.notna(rate) else 'n/a'}\n")
     
     print(f"Dashboard and summary saved to {output_dir}")
 
@@ -79,12 +95,20 @@ def main():
     """
     Main function to generate the enrollment dashboard
     """
-    # Load and process data
-    data = load_data()
-    enrollment_data = process_enrollment_data(data)
-    
-    # Create dashboard
-    create_enrollment_dashboard(enrollment_data)
+    # Aggregates come from the aggregate API when it is running, so the
+    # pipeline is not re-run for every export; urllib is only loaded here
+    from backend.aggregate_client import connect
+    client = connect()
+    if client is not None:
+        print(f"Using aggregates from {client.base_url}")
+        create_enrollment_dashboard(None, client.dashboard_aggregates())
+    else:
+        # Load and process data
+        data = load_data()
+        enrollment_data = process_enrollment_data(data)
+        
+        # Create dashboard
+        create_enrollment_dashboard(enrollment_data)
     
     print("Enrollment dashboard generated successfully!")
 
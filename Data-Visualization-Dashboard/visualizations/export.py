@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+import time
+import pandas as pd
+import plotly
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.cube import EnrollmentCube
+from backend.figure_data import box_stats, histogram_bins
+from backend.instrumentation import span
+from backend.star_schema import section_rows
+
+# Default location of exported figures
+OUTPUT_DIR = Path(__file__).parent.parent / 'data' / 'visualizations'
+
+# One copy of plotly.js shared by every exported page
+PLOTLY_JS = 'plotly.min.js'
+
+# Digest of every exported file's inputs, used to skip unchanged figures
+MANIFEST_NAME = 'export_manifest.json'
+
+
+def dashboard_aggregates(enrollment_data):
+    """
+    Every aggregate the exported figures draw from, computed in one pass over the cube
+
+    The enrollment-rate distributions are reduced to histogram bins and box
+    statistics here, so no figure carries one point per section.
+    """
+    cube = EnrollmentCube.from_facts(enrollment_data)
+    sections = section_rows(enrollment_data)
+    rate_box, rate_outliers = box_stats(sections, 'enrollment_rate', 'department_name')
+    return {
+        'totals': cube.totals(),
+        'term': cube.rollup('term'),
+        'department': cube.rollup('department_name').sort_values('enrolled', ascending=False, ignore_index=True),
+        'course': cube.rollup('course_code').sort_values('enrolled', ascending=False, ignore_index=True),
+        'instructor': cube.rollup('instructor_name').sort_values('enrolled', ascending=False, ignore_index=True),
+        'rate_histogram': histogram_bins(sections['enrollment_rate'], value_name='enrollment_rate', count_name='sections'),
+        'rate_box': rate_box,
+        'rate_outliers': rate_outliers,
+    }
+
+
+def _update_code(digest, code):
+    """
+    Feed a code object's bytecode and constants, including nested functions', to a digest
+
+    Nested code objects are hashed by content, since their repr carries a memory address.
+    """
+    digest.update(code.co_code)
+    for const in code.co_consts:
+        if hasattr(const, 'co_code'):
+            _update_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+def _digest(build_figure, inputs):
+    """
+    Fingerprint of a figure's builder and input aggregates
+
+    The builder is identified by its qualified name and code, not its module,
+    which is '__main__' when its script is run directly; running a figure
+    script on its own or through this module then gives the same digest.
+    """
+    digest = hashlib.sha1()
+    digest.update(build_figure.__qualname__.encode())
+    _update_code(digest, build_figure.__code__)
+    digest.update(plotly.__version__.encode())
+    for frame in inputs:
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _load_manifest(output_dir):
+    """
+    Input digests of the files already exported, or an empty manifest
+    """
+    try:
+        with open(output_dir / MANIFEST_NAME, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(output_dir, manifest):
+    """
+    Write the export manifest atomically
+    """
+    tmp_path = output_dir / f'{MANIFEST_NAME}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, output_dir / MANIFEST_NAME)
+
+
+def _write_plotly_js(output_dir):
+    """
+    Write the shared plotly.js bundle unless this plotly version is already there
+    """
+    path = output_dir / PLOTLY_JS
+    version_path = output_dir / f'{PLOTLY_JS}.version'
+    if path.exists() and version_path.exists() and version_path.read_text() == plotly.__version__:
+        return
+    # plotly.offline pulls in plotly.io, so it is only imported when the bundle is rewritten
+    from plotly.offline import get_plotlyjs
+    path.write_text(get_plotlyjs(), encoding='utf-8')
+    version_path.write_text(plotly.__version__)
+
+
+def _render(file_path, build_figure, inputs):
+    """
+    Build one figure and write it as a page that loads the shared plotly.js
+    """
+    with span('export.build_figure', figure=Path(file_path).name):
+        fig = build_figure(*inputs)
+    # Serializing the figure to JSON is usually the larger share
+    with span('export.write_html', figure=Path(file_path).name):
+        fig.write_html(file_path, include_plotlyjs=PLOTLY_JS, full_html=True)
+    return file_path
+
+
+def export_figures(figures, output_dir=OUTPUT_DIR, workers=None):
+    """
+    Render figures to HTML, rewriting only those whose inputs changed
+
+    figures maps a file name to (build_figure, inputs), where build_figure is
+    a module-level function taking the input DataFrames and returning a
+    plotly figure. Stale figures are rendered on a process pool; every page
+    references one plotly.js next to it instead of embedding its own copy.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _write_plotly_js(output_dir)
+
+    start = time.perf_counter()
+    manifest = _load_manifest(output_dir)
+    digests = {name: _digest(build_figure, inputs) for name, (build_figure, inputs) in figures.items()}
+    stale = [
+        name for name in figures
+        if manifest.get(name) != digests[name] or not (output_dir / name).exists()
+    ]
+
+    workers = workers or min(len(stale), os.cpu_count() or 1)
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render, output_dir / name, *figures[name]) for name in stale]
+            for future in futures:
+                future.result()
+    else:
+        for name in stale:
+            _render(output_dir / name, *figures[name])
+
+    for name in stale:
+        manifest[name] = digests[name]
+    _save_manifest(output_dir, manifest)
+
+    print(f"Exported {len(stale)} of {len(figures)} figures to {output_dir} "
+          f"in {time.perf_counter() - start:.2f}s ({len(figures) - len(stale)} unchanged)")
+    return stale
+
+
+def main():
+    """
+    Export every dashboard and demographics figure from one aggregate pass
+
+    The aggregates are fetched from the aggregate API when it is running
+    (backend/aggregate_server.py), and only computed here when it is not.
+    """
+    from backend.aggregate_client import connect
+    from visualizations.enrollment_dashboard import create_enrollment_dashboard
+    from visualizations.student_demographics import create_demographics_visualizations
+
+    client = connect()
+    if client is not None:
+        print(f"Using aggregates from {client.base_url}")
+        enrollment_data = None
+        aggregates = client.dashboard_aggregates()
+    else:
+        from backend.process_data import load_data, process_enrollment_data
+        enrollment_data = process_enrollment_data(load_data())
+        aggregates = dashboard_aggregates(enrollment_data)
+    create_enrollment_dashboard(enrollment_data, aggregates)
+    create_demographics_visualizations(enrollment_data, aggregates)
+
+if __name__ == "__main__":
+    main()
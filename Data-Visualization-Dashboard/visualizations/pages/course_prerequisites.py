@@ -0,0 +1,94 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from pathlib import Path
+import sys
+
+# Add grandparent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.course_graph import CourseGraph, closed_courses, course_demand
+from backend.star_schema import label_terms
+from backend.table_cache import load_tables
+
+# Set page config
+st.set_page_config(
+    page_title="Course Prerequisites",
+    page_icon="🔗",
+    layout="wide"
+)
+
+st.title("Prerequisite Bottlenecks")
+st.markdown("""
+Courses with closed sections hold back every course that requires them as a prerequisite or
+corequisite, directly or further down the chain; a course that is only one of several
+alternatives ("A or B") holds nothing back. Downstream demand is the average number of
+students enrolled per term in those later courses.
+""")
+
+# The graph and its reachability bitsets are built once and shared by every session
+@st.cache_resource
+def load_course_graph():
+    data, _ = load_tables(['course', 'corequisite', 'section', 'student_cap', 'term'])
+    graph = CourseGraph.from_tables(data['course'], data['corequisite'])
+    terms_offered = data['section']['term_code'].nunique()
+    demand = graph.demand_vector(course_demand(data['section'], data['student_cap']) / terms_offered)
+    return graph, demand, data
+
+graph, demand, data = load_course_graph()
+section = data['section']
+
+# Sidebar filters
+st.sidebar.header("Filters")
+term_codes = sorted(section['term_code'].unique())
+term_labels = dict(zip(term_codes, label_terms(pd.Series(term_codes), data['term'])))
+term_code = st.sidebar.selectbox(
+    "Select Term",
+    options=term_codes,
+    index=len(term_codes) - 1,
+    format_func=lambda code: term_labels[code]
+)
+
+closed = closed_courses(section, term_code)
+blocked = graph.downstream_mask(closed.index)
+
+# Key metrics
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Courses with Closed Sections", f"{len(closed):,}")
+with col2:
+    st.metric("Downstream Courses Affected", f"{blocked.sum():,}")
+with col3:
+    st.metric("Downstream Demand Blocked", f"{graph.blocked_demand(closed.index, demand):,.0f}")
+
+# Closed courses ranked by how much later demand depends on them
+st.subheader("Biggest Bottlenecks")
+bottlenecks = graph.bottlenecks(closed.index, demand)
+bottlenecks['closed_sections'] = closed.reindex(bottlenecks['course_code']).to_numpy()
+bottlenecks = bottlenecks[bottlenecks['downstream_courses'] > 0]
+fig_bottlenecks = px.bar(
+    bottlenecks.head(20),
+    x='course_code',
+    y='downstream_demand',
+    hover_data=['downstream_courses', 'closed_sections'],
+    title="Top 20 Closed Courses by Downstream Demand"
+)
+st.plotly_chart(fig_bottlenecks, use_container_width=True)
+st.dataframe(bottlenecks, use_container_width=True)
+
+# Dependencies of a single course
+st.subheader("Course Explorer")
+course_code = st.selectbox(
+    "Select Course",
+    options=graph.course_codes.tolist(),
+    index=graph.course_codes.get_loc(bottlenecks['course_code'].iloc[0]) if len(bottlenecks) else 0
+)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("**Directly unlocks**")
+    st.dataframe(graph.successors(course_code), use_container_width=True)
+    st.markdown("**All downstream courses**")
+    st.write(", ".join(graph.downstream([course_code])) or "None")
+with col2:
+    st.markdown("**Depends on (directly or indirectly)**")
+    st.write(", ".join(graph.upstream(course_code)) or "None")
@@ -0,0 +1,132 @@
+import streamlit as st
+import plotly.express as px
+from pathlib import Path
+import sys
+
+# Add grandparent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.international_students import MEASURE, academic_year_label, load_archive
+
+# Set page config
+st.set_page_config(
+    page_title="International Students",
+    page_icon="🌍",
+    layout="wide"
+)
+
+st.title("International Students")
+st.markdown("""
+National international-student counts by academic year, broken down by place of origin, field of
+study, source of funding and academic level. Pick a breakdown, then drill from its top level into
+the members of one group; every figure comes from roll-ups computed once when the page loads.
+""")
+
+# Number of members drawn as separate lines in the trend chart
+TOP_MEMBERS = 10
+
+def title_case(name):
+    return name.replace('_', ' ').title()
+
+# Every breakdown is rolled up at every level once and shared by every session
+@st.cache_resource
+def load_international_students():
+    return load_archive()
+
+cubes, series = load_international_students()
+
+# Sidebar filters
+st.sidebar.header("Filters")
+breakdown = st.sidebar.selectbox("Breakdown", options=list(cubes), format_func=title_case)
+cube = cubes[breakdown]
+top_level, detail_level = cube.levels
+
+dimension_values = {}
+for dimension in cube.dimensions:
+    choice = st.sidebar.selectbox(
+        title_case(dimension),
+        options=[None] + cube.dimension_labels[dimension].tolist(),
+        format_func=lambda value: "All" if value is None else value
+    )
+    if choice is not None:
+        dimension_values[dimension] = choice
+# A roll-up either keeps every flat dimension or none of them
+if dimension_values and len(dimension_values) < len(cube.dimensions):
+    st.sidebar.warning("Choose a value for every dimension to filter on them.")
+    dimension_values = {}
+
+parent = st.sidebar.selectbox(
+    f"Drill into {title_case(top_level)}",
+    options=[None] + cube.members(1),
+    format_func=lambda value: f"All {title_case(top_level)}s" if value is None else value
+)
+years = cube.years()
+year = st.sidebar.selectbox("Academic Year", options=years, index=len(years) - 1, format_func=academic_year_label)
+
+# Members shown: the top level, or the children of the chosen group
+if parent is None:
+    depth, level = 1, top_level
+    scope = cube.series(0, dimension_values=dimension_values)
+else:
+    depth, level = 2, detail_level
+    scope = cube.series(1, dimension_values=dimension_values)
+    scope = scope[scope[top_level] == parent]
+members = cube.series(depth, parent=parent, dimension_values=dimension_values)
+scope_year = scope[scope['year'] == year]
+members_year = members[members['year'] == year].sort_values(MEASURE, ascending=False)
+
+# Key metrics
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric(
+        f"Students, {academic_year_label(year)}",
+        f"{scope_year[MEASURE].sum():,.0f}",
+        f"{scope_year['delta'].sum():+,.0f}" if scope_year['delta'].notna().any() else None
+    )
+with col2:
+    pct_change = scope_year['pct_change'].iloc[0] if len(scope_year) else float('nan')
+    st.metric("Year-over-Year Change", f"{pct_change:+.1%}" if pct_change == pct_change else "n/a")
+with col3:
+    st.metric(f"{title_case(level)}s Reported", f"{members_year[MEASURE].notna().sum():,}")
+
+# Trend of the largest members
+st.subheader(f"Students by {title_case(level)}")
+top_members = members_year[level].head(TOP_MEMBERS).tolist()
+fig_trend = px.line(
+    members[members[level].isin(top_members)],
+    x='year',
+    y=MEASURE,
+    color=level,
+    category_orders={level: top_members},
+    hover_data=['academic_year'],
+    title=f"Top {len(top_members)} by Students in {academic_year_label(year)}"
+)
+st.plotly_chart(fig_trend, use_container_width=True)
+
+# Year-over-year change of every member
+st.subheader("Year-over-Year Change")
+fig_delta = px.bar(
+    members_year.dropna(subset=['delta']).sort_values('delta'),
+    x='delta',
+    y=level,
+    orientation='h',
+    hover_data=['previous', MEASURE, 'pct_change'],
+    title=f"Change in Students from {academic_year_label(year - 1)} to {academic_year_label(year)}"
+)
+st.plotly_chart(fig_delta, use_container_width=True)
+
+st.dataframe(
+    members_year[[level, MEASURE, 'previous', 'delta', 'pct_change']].reset_index(drop=True),
+    use_container_width=True
+)
+
+# National totals by academic level
+st.subheader("Overall Trends")
+academic = series['academic']
+fig_overall = px.line(
+    academic,
+    x='year',
+    y=['students', 'undergraduate', 'graduate', 'non_degree', 'opt'],
+    hover_data=['academic_year'],
+    title="International Students by Academic Level"
+)
+st.plotly_chart(fig_overall, use_container_width=True)
@@ -0,0 +1,99 @@
+import streamlit as st
+import plotly.express as px
+from pathlib import Path
+import sys
+
+# Add grandparent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent.parent))
+from backend.schedule import (
+    SCHEDULE_TABLES, TEACHING_DAYS, TEACHING_HOURS,
+    meeting_slots, room_conflicts, instructor_conflicts, room_utilization, occupancy_heatmap
+)
+from backend.table_cache import load_tables
+
+# Set page config
+st.set_page_config(
+    page_title="Schedule Conflicts",
+    page_icon="📅",
+    layout="wide"
+)
+
+st.title("Schedule Conflicts and Room Utilization")
+st.markdown("""
+Double-booked rooms and instructors for each term, found by sweeping the meeting times of
+every room and instructor, and how heavily rooms are used across the teaching week.
+""")
+
+# Conflicts are computed once for every term and shared read-only by every
+# session; the page only slices them
+@st.cache_resource
+def load_schedule():
+    data, _ = load_tables(SCHEDULE_TABLES)
+    slots = meeting_slots(data)
+    return (
+        slots,
+        room_conflicts(slots, data['crosslist']),
+        instructor_conflicts(slots, data['instruction'], data['instructor'], data['crosslist']),
+        room_utilization(slots)
+    )
+
+slots, rooms, instructors, utilization = load_schedule()
+
+# Sidebar filters
+st.sidebar.header("Filters")
+terms = list(slots['term'].cat.categories[slots['term'].cat.categories.isin(slots['term'].unique())])
+term = st.sidebar.selectbox("Select Term", options=terms, index=len(terms) - 1)
+include_crosslisted = st.sidebar.checkbox(
+    "Include crosslisted pairs",
+    value=False,
+    help="Crosslisted courses share a room and instructor on purpose"
+)
+
+def for_term(conflicts):
+    conflicts = conflicts[conflicts['term'] == term]
+    if not include_crosslisted:
+        conflicts = conflicts[~conflicts['crosslisted']]
+    return conflicts.drop(columns=['term', 'term_code'])
+
+term_rooms = for_term(rooms)
+term_instructors = for_term(instructors)
+term_slots = slots[slots['term'] == term]
+
+# Key metrics
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Room Conflicts", f"{term_rooms[['first_section_id', 'second_section_id']].drop_duplicates().shape[0]:,}")
+with col2:
+    st.metric("Instructor Conflicts", f"{term_instructors[['first_section_id', 'second_section_id']].drop_duplicates().shape[0]:,}")
+with col3:
+    st.metric("Rooms in Use", f"{term_slots.dropna(subset=['building_code', 'room']).groupby(['building_code', 'room'], observed=True).ngroups:,}")
+
+st.subheader("Double-Booked Rooms")
+st.dataframe(term_rooms, use_container_width=True)
+
+st.subheader("Double-Booked Instructors")
+st.dataframe(term_instructors, use_container_width=True)
+
+# Room occupancy by weekday and hour
+st.subheader("Room Occupancy")
+fig_heatmap = px.imshow(
+    occupancy_heatmap(term_slots),
+    color_continuous_scale='Blues',
+    labels={'color': 'Share of rooms in use'},
+    title=f"Share of Rooms in Use by Weekday and Hour, {term}",
+    aspect='auto'
+)
+st.plotly_chart(fig_heatmap, use_container_width=True)
+
+# Busiest rooms
+st.subheader("Room Utilization")
+term_utilization = utilization[utilization['term'] == term].head(20).copy()
+term_utilization['room_label'] = term_utilization['building_code'].astype(object) + ' ' + term_utilization['room'].astype(object)
+fig_utilization = px.bar(
+    term_utilization,
+    x='room_label',
+    y='utilization',
+    title=f"20 Busiest Rooms (share of a {TEACHING_DAYS}-day, {TEACHING_HOURS[0]}:00-{TEACHING_HOURS[1]}:00 week)"
+)
+fig_utilization.update_yaxes(tickformat='.0%')
+st.plotly_chart(fig_utilization, use_container_width=True)
@@ -0,0 +1,77 @@
+import math
+from pathlib import Path
+import sys
+import streamlit as st
+
+# Add parent directory to path to import backend modules
+sys.path.append(str(Path(__file__).parent.parent))
+from backend.detail_table import write_csv, write_parquet
+
+# Rows per page offered by the table
+PAGE_SIZES = [25, 50, 100, 250]
+
+# Download formats: writer, file extension and MIME type
+EXPORT_FORMATS = {
+    'CSV': (write_csv, 'csv', 'text/csv'),
+    'Parquet': (write_parquet, 'parquet', 'application/octet-stream'),
+}
+
+def paginated_table(source, filters, key='detail'):
+    """
+    Paginated, sortable and searchable table that fetches only the visible page
+
+    source is anything with detail_columns, detail_count, detail_page and
+    detail_chunks: the in-memory DetailTable, the database connection or
+    the aggregate API client. Sorting, search and paging run on the server,
+    so each rerun sends one page of the selected columns to the browser
+    whatever the row count.
+    """
+    columns = st.multiselect(
+        "Columns",
+        options=source.detail_columns,
+        default=source.detail_columns,
+        key=f'{key}_columns'
+    ) or source.detail_columns
+
+    col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
+    with col1:
+        search = st.text_input("Search courses, departments and instructors", key=f'{key}_search').strip()
+    with col2:
+        sort_by = st.selectbox(
+            "Sort by",
+            options=columns,
+            index=columns.index('section_id') if 'section_id' in columns else 0,
+            key=f'{key}_sort'
+        )
+    with col3:
+        ascending = st.selectbox("Order", ["Ascending", "Descending"], key=f'{key}_order') == "Ascending"
+    with col4:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key=f'{key}_page_size')
+
+    total = source.detail_count(filters, search or None)
+    pages = max(1, math.ceil(total / page_size))
+    # Keep the remembered page in range when the filters shrink the result
+    if st.session_state.get(f'{key}_page', 1) > pages:
+        st.session_state[f'{key}_page'] = pages
+    page = st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key=f'{key}_page')
+
+    offset = (page - 1) * page_size
+    rows = source.detail_page(filters, columns, sort_by, ascending, search or None, offset, page_size)
+    st.caption(f"Rows {offset + 1 if total else 0:,}-{offset + len(rows):,} of {total:,}")
+    st.dataframe(rows, use_container_width=True)
+
+    # Exports stream every matching row in chunks, and only when asked for
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        export_format = st.radio("Export format", list(EXPORT_FORMATS), horizontal=True, key=f'{key}_format')
+    with col2:
+        if st.button(f"Prepare {export_format} export of {total:,} rows", key=f'{key}_export'):
+            write, extension, mime = EXPORT_FORMATS[export_format]
+            data = write(source.detail_chunks(filters, columns, sort_by, ascending, search or None))
+            st.download_button(
+                f"Download {export_format}",
+                data=data,
+                file_name=f'enrollment_detail.{extension}',
+                mime=mime,
+                key=f'{key}_download'
+            )
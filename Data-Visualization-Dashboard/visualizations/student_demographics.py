@@ -1,98 +1,178 @@
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import seaborn as sns
-import matplotlib.pyplot as plt
 from pathlib import Path
 import sys
 
 # Add parent directory to path to import backend modules
 sys.path.append(str(Path(__file__).parent.parent))
 from backend.process_data import load_data, process_enrollment_data
+from backend.figure_data import downsample
+from backend.seat_fill import class_year_fill
+from visualizations.export import OUTPUT_DIR, dashboard_aggregates, export_figures
 
-def create_demographics_visualizations(enrollment_data):
+def term_enrollment_figure(term_enrollment):
     """
-    Create various visualizations for student demographics
+    Enrollment by Term (Line Chart)
     """
-    # Create a directory for saving visualizations
-    output_dir = Path(__file__).parent.parent / 'data' / 'visualizations'
-    output_dir.mkdir(exist_ok=True)
-    
-    # 1. Enrollment by Term (Line Chart)
-    term_enrollment = enrollment_data.groupby('term')['enrolled'].sum().reset_index()
-    fig_term = px.line(
-        term_enrollment,
+    return px.line(
+        downsample(term_enrollment, 'term', 'enrolled'),
         x='term',
         y='enrolled',
         title="Enrollment Trends by Term"
     )
-    fig_term.write_html(output_dir / 'term_enrollment.html')
-    
-    # 2. Department-wise Enrollment (Bar Chart)
-    dept_enrollment = enrollment_data.groupby('department_name')['enrolled'].sum().reset_index()
-    dept_enrollment = dept_enrollment.sort_values('enrolled', ascending=False)
-    fig_dept = px.bar(
+
+def department_enrollment_figure(dept_enrollment):
+    """
+    Department-wise Enrollment (Bar Chart)
+    """
+    return px.bar(
         dept_enrollment,
         x='department_name',
         y='enrolled',
         title="Enrollment by Department"
     )
-    fig_dept.write_html(output_dir / 'department_enrollment.html')
-    
-    # 3. Top Courses (Bar Chart)
-    top_courses = enrollment_data.groupby('course_name')['enrolled'].sum().reset_index()
-    top_courses = top_courses.sort_values('enrolled', ascending=False).head(10)
-    fig_courses = px.bar(
-        top_courses,
-        x='course_name',
+
+def top_courses_figure(course_enrollment):
+    """
+    Top Courses (Bar Chart)
+    """
+    return px.bar(
+        course_enrollment.head(10),
+        x='course_label',
         y='enrolled',
         title="Top 10 Courses by Enrollment"
     )
-    fig_courses.write_html(output_dir / 'top_courses.html')
-    
-    # 4. Instructor Workload (Bar Chart)
-    instructor_workload = enrollment_data.groupby('instructor_name')['enrolled'].sum().reset_index()
-    instructor_workload = instructor_workload.sort_values('enrolled', ascending=False).head(15)
-    fig_instructor = px.bar(
-        instructor_workload,
+
+def instructor_workload_figure(instructor_workload):
+    """
+    Instructor Workload (Bar Chart)
+    """
+    return px.bar(
+        instructor_workload.head(15),
         x='instructor_name',
         y='enrolled',
         title="Top 15 Instructors by Student Count"
     )
-    fig_instructor.write_html(output_dir / 'instructor_workload.html')
-    
-    # 5. Enrollment Rate Distribution (Histogram)
-    fig_dist = px.histogram(
-        enrollment_data,
+
+def enrollment_rate_distribution_figure(rate_histogram):
+    """
+    Enrollment Rate Distribution (Histogram of pre-binned counts)
+    """
+    fig = px.bar(
+        rate_histogram,
         x='enrollment_rate',
-        title="Distribution of Enrollment Rates",
-        nbins=30
+        y='sections',
+        title="Distribution of Enrollment Rates"
+    )
+    fig.update_layout(bargap=0)
+    return fig
+
+def enrollment_rate_by_department_figure(rate_box, rate_outliers):
+    """
+    Enrollment Rate by Department (Box Plot from precomputed quartiles)
+    """
+    fig = go.Figure()
+    fig.add_trace(
+        go.Box(
+            x=rate_box['department_name'],
+            q1=rate_box['q1'],
+            median=rate_box['median'],
+            q3=rate_box['q3'],
+            lowerfence=rate_box['lowerfence'],
+            upperfence=rate_box['upperfence'],
+            mean=rate_box['mean'],
+            name='enrollment_rate'
+        )
     )
-    fig_dist.write_html(output_dir / 'enrollment_rate_distribution.html')
     
-    # 6. Enrollment Rate by Department (Box Plot)
-    fig_box = px.box(
-        enrollment_data,
-        x='department_name',
-        y='enrollment_rate',
-        title="Enrollment Rate Distribution by Department"
+    # Only the most extreme outliers of each department are drawn
+    fig.add_trace(
+        go.Scatter(
+            x=rate_outliers['department_name'],
+            y=rate_outliers['enrollment_rate'],
+            mode='markers',
+            name='outliers'
+        )
+    )
+    fig.update_layout(
+        title="Enrollment Rate Distribution by Department",
+        xaxis_title='department_name',
+        yaxis_title='enrollment_rate',
+        showlegend=False
+    )
+    return fig
+
+def class_year_fill_figure(term_enrollment):
+    """
+    Seat Fill by Class Year (Line Chart)
+    """
+    fig = px.line(
+        downsample(class_year_fill(term_enrollment, 'term'), 'term', 'fill_rate', by='class_year'),
+        x='term',
+        y='fill_rate',
+        color='class_year',
+        markers=True,
+        title="Reserved Seat Fill Rate by Class Year and Term"
     )
-    fig_box.write_html(output_dir / 'enrollment_rate_by_department.html')
+    fig.update_yaxes(tickformat='.0%')
+    return fig
+
+def class_year_fill_by_department_figure(dept_enrollment):
+    """
+    Seat Fill by Class Year and Department (Heatmap)
+    """
+    return px.density_heatmap(
+        class_year_fill(dept_enrollment, 'department_name'),
+        x='class_year',
+        y='department_name',
+        z='fill_rate',
+        histfunc='avg',
+        title="Reserved Seat Fill Rate by Department and Class Year"
+    )
+
+def create_demographics_visualizations(enrollment_data, aggregates=None, output_dir=OUTPUT_DIR):
+    """
+    Create various visualizations for student demographics
+    """
+    # Aggregates come from the cube; the distribution plots get pre-binned rates
+    if aggregates is None:
+        aggregates = dashboard_aggregates(enrollment_data)
     
-    print(f"Visualizations saved to {output_dir}")
+    figures = {
+        'term_enrollment.html': (term_enrollment_figure, [aggregates['term']]),
+        'department_enrollment.html': (department_enrollment_figure, [aggregates['department']]),
+        'top_courses.html': (top_courses_figure, [aggregates['course'].head(10)]),
+        'instructor_workload.html': (instructor_workload_figure, [aggregates['instructor'].head(15)]),
+        'enrollment_rate_distribution.html': (enrollment_rate_distribution_figure, [aggregates['rate_histogram']]),
+        'enrollment_rate_by_department.html': (enrollment_rate_by_department_figure, [aggregates['rate_box'], aggregates['rate_outliers']]),
+        'class_year_fill.html': (class_year_fill_figure, [aggregates['term']]),
+        'class_year_fill_by_department.html': (class_year_fill_by_department_figure, [aggregates['department']]),
+    }
+    
+    # Figures whose aggregates are unchanged since the last export are skipped
+    export_figures(figures, output_dir)
 
 def main():
     """
     Main function to generate all visualizations
     """
-    # Load and process data
-    data = load_data()
-    enrollment_data = process_enrollment_data(data)
-    
-    # Create visualizations
-    create_demographics_visualizations(enrollment_data)
+    # Aggregates come from the aggregate API when it is running, so the
+    # pipeline is not re-run for every export; urllib is only loaded here
+    from backend.aggregate_client import connect
+    client = connect()
+    if client is not None:
+        print(f"Using aggregates from {client.base_url}")
+        create_demographics_visualizations(None, client.dashboard_aggregates())
+    else:
+        # Load and process data
+        data = load_data()
+        enrollment_data = process_enrollment_data(data)
+        
+        # Create visualizations
+        create_demographics_visualizations(enrollment_data)
     
     print("All visualizations generated successfully!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()